@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Async Data Extractor
+Fetches many subjects and articles concurrently with asyncio, reusing the
+parsers from the basic HTTP scraper.
+"""
+
+import asyncio
+import json
+import sys
+import time
+import argparse
+
+from grokipedia_scraper import GrokipediaScraper, SearchStrategyMemo, PARSER_BACKENDS, DEFAULT_STRATEGY_PATH
+from grokipedia_cache import PageCache, DEFAULT_CACHE_PATH, cache_key
+from grokipedia_index import ArticleIndex, DEFAULT_INDEX_PATH
+from grokipedia_ratelimit import RateLimiter, unlimited
+from grokipedia_retry import RetryPolicy, start_fetch_stats, parse_hedge
+from grokipedia_metrics import METRICS
+from grokipedia_snippets import DEFAULT_SNIPPET_WINDOW
+from grokipedia_replay import ReplayArchive, DEFAULT_ARCHIVE_PATH
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover - optional dependency
+    aiohttp = None
+
+
+class AsyncGrokipediaScraper(GrokipediaScraper):
+    def __init__(self, base_url="https://grokipedia.com/", concurrency=10, timeout=10,
+                 parser='html.parser', prefer_payload=False, cache=None, strategy_memo=None, index=None,
+                 limiter=None, retry_policy=None, snippet_window=DEFAULT_SNIPPET_WINDOW, recorder=None):
+        super().__init__(base_url, parser=parser, prefer_payload=prefer_payload, cache=cache,
+                         strategy_memo=strategy_memo, limiter=limiter, retry_policy=retry_policy,
+                         snippet_window=snippet_window, recorder=recorder)
+        self.concurrency = concurrency
+        # Optional ArticleIndex that scraped articles are added to
+        self.index = index
+        self.timeout = timeout
+        self.http = None
+        self._semaphore = None
+        self._started = None
+        self.stats = {
+            'pages': 0,
+            'errors': 0,
+            'bytes': 0
+        }
+
+    async def open(self):
+        """Create the pooled HTTP session (one keep-alive pool per host)"""
+        if aiohttp is None:
+            raise RuntimeError("aiohttp is required for the async scraper. Install with: pip install aiohttp")
+
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            limit_per_host=self.concurrency,
+            keepalive_timeout=30,
+            ttl_dns_cache=300
+        )
+        self.http = aiohttp.ClientSession(
+            connector=connector,
+            headers=dict(self.session.headers),
+            timeout=aiohttp.ClientTimeout(total=self.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._started = time.perf_counter()
+        return self
+
+    async def close(self):
+        """Close the HTTP session and its connection pool"""
+        if self.http:
+            await self.http.close()
+            self.http = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def fetch(self, method, url, **kwargs):
+        """
+        Fetch a URL, returning (status, text), with retries and hedging per
+        the retry policy if one is configured
+        """
+        if self.retry_policy is None:
+            return await self._fetch(method, url, **kwargs)
+        return await self.retry_policy.call_async(lambda: self._fetch(method, url, **kwargs),
+                                                  errors=(aiohttp.ClientError, asyncio.TimeoutError))
+
+    async def _fetch(self, method, url, **kwargs):
+        """
+        Fetch a URL within the concurrency limit, returning (status, text).
+        GETs are served from, and revalidated against, the page cache if set.
+        """
+        key = entry = None
+        if self.cache is not None and method == 'GET':
+            key = cache_key(url, kwargs.get('params'))
+            entry = self.cache.get(key)
+            if entry and self.cache.is_fresh(entry):
+                self.cache.stats['hits'] += 1
+                METRICS.incr('pages')
+                return 200, entry['body']
+            headers = dict(kwargs.pop('headers', None) or {})
+            headers.update(self.cache.conditional_headers(entry))
+            kwargs['headers'] = headers
+
+        limit = self.limiter.limit_async(url) if self.limiter is not None else unlimited(url)
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                async with limit as outcome, self.http.request(method, url, **kwargs) as response:
+                    body = await response.read()
+                    text = body.decode(response.get_encoding() or 'utf-8', errors='replace')
+                    outcome['status'] = response.status
+                    outcome['retry_after'] = response.headers.get('Retry-After')
+                    self.stats['pages'] += 1
+                    self.stats['bytes'] += len(body)
+                    if self.recorder is not None:
+                        self.recorder.put(method, str(response.url), response.status, response.headers,
+                                          body, kwargs.get('data'))
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                self.stats['errors'] += 1
+                METRICS.incr('errors')
+                raise
+            finally:
+                METRICS.observe('http_request', time.perf_counter() - started)
+        METRICS.incr('pages')
+        METRICS.incr('bytes', len(body))
+
+        if key is not None:
+            if response.status == 304 and entry:
+                self.cache.stats['revalidated'] += 1
+                self.cache.refresh(key)
+                return 200, entry['body']
+            self.cache.stats['misses'] += 1
+            if response.status == 200:
+                self.cache.put(key, text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response.status, text
+
+    async def _parse(self, func, *args):
+        """Run a (CPU-bound) parser off the event loop"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, func, *args)
+
+    async def search_subject(self, subject):
+        """
+        Search for a subject, adding 'fetch_stats' when retries or hedging are enabled
+        """
+        fetch_stats = start_fetch_stats()
+        result = await self._search_subject(subject)
+        if self.retry_policy is not None and self.retry_policy.reports_stats:
+            result['fetch_stats'] = fetch_stats
+        return result
+
+    async def _search_subject(self, subject):
+        """
+        Search for a subject, trying the same strategies as the blocking scraper
+        """
+        try:
+            if not self._known_strategy():
+                status, _ = await self.fetch('GET', self.base_url)
+                if status != 200:
+                    return {"error": f"Failed to load main page: {status}"}
+
+            headers = self._search_headers()
+            for name, label, method, url, kwargs, kind in self._ordered_strategies(subject):
+                status, text = await self.fetch(method, url, headers=headers, **kwargs)
+                self._record_strategy(name, status == 200)
+                if status == 200:
+                    return await self._parse(self._parse_search_response, kind, text, url, subject)
+
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {"error": f"Network error: {str(e) or type(e).__name__}"}
+
+        return {"error": "Could not find the requested subject"}
+
+    async def scrape_article(self, url):
+        """
+        Fetch and parse a single article page
+        """
+        try:
+            status, text = await self.fetch('GET', url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {"error": f"Network error: {str(e) or type(e).__name__}", 'url': url}
+
+        if status != 200:
+            return {"error": f"Failed to load article: {status}", 'url': url}
+
+        article = await self._parse(self.extract_article_data, text, url)
+        if self.index is not None:
+            await self._parse(self.index.add, article)
+        return article
+
+    async def search_many(self, subjects):
+        """Search several subjects concurrently, preserving input order"""
+        return await asyncio.gather(*(self.search_subject(subject) for subject in subjects))
+
+    async def scrape_articles(self, urls):
+        """Scrape several articles concurrently, preserving input order"""
+        return await asyncio.gather(*(self.scrape_article(url) for url in urls))
+
+    def get_stats(self):
+        """
+        Fetch counters plus elapsed time and pages/second since open()
+        """
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        stats = dict(self.stats)
+        stats['elapsed'] = round(elapsed, 3)
+        stats['pages_per_second'] = round(stats['pages'] / elapsed, 2) if elapsed else 0.0
+        return stats
+
+
+async def run(args):
+    cache = PageCache(args.cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    memo = SearchStrategyMemo(args.learn_search) if args.learn_search else None
+    index = ArticleIndex(args.index) if args.index else None
+    recorder = ReplayArchive(args.record) if args.record else None
+    limiter = RateLimiter(rate=args.rate, adaptive=args.adaptive,
+                          max_concurrency=args.concurrency) if args.rate or args.adaptive else None
+    retry_policy = RetryPolicy(retries=args.retries, timeout=args.timeout, hedge=args.hedge)
+    if cache:
+        METRICS.register_collector(cache.get_stats, 'cache')
+    async with AsyncGrokipediaScraper(base_url=args.base_url, concurrency=args.concurrency,
+                                      timeout=args.timeout, parser=args.parser,
+                                      prefer_payload=args.payload, cache=cache,
+                                      strategy_memo=memo, index=index, limiter=limiter,
+                                      retry_policy=retry_policy,
+                                      snippet_window=args.snippet_window,
+                                      recorder=recorder) as scraper:
+        searches = await scraper.search_many(args.subjects)
+
+        result = {'searches': []}
+        for subject, search_result in zip(args.subjects, searches):
+            entry = {'search_query': subject, 'search_results': search_result}
+            if args.scrape_articles and search_result.get('results'):
+                urls = [item['url'] for item in search_result['results'][:args.max_articles]]
+                entry['articles'] = await scraper.scrape_articles(urls)
+            result['searches'].append(entry)
+
+        if args.url:
+            result['articles'] = await scraper.scrape_articles(args.url)
+
+        result['stats'] = scraper.get_stats()
+        if cache:
+            result['stats']['cache'] = cache.get_stats()
+        if limiter:
+            result['stats']['rate_limit'] = limiter.get_stats()
+        if memo:
+            memo.save()
+            result['stats']['search_strategies'] = memo.get_stats(scraper.host)
+        return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Query many subjects on Grokipedia concurrently')
+    parser.add_argument('subjects', nargs='*', help='Subjects to search for')
+    parser.add_argument('--url', action='append', default=[],
+                       help='Article URL to scrape directly (can be repeated)')
+    parser.add_argument('-o', '--output', help='Output file (default: print to stdout)')
+    parser.add_argument('--base-url', default='https://grokipedia.com/',
+                       help='Site to query (e.g. a local stub server)')
+    parser.add_argument('-c', '--concurrency', type=int, default=10,
+                       help='Maximum concurrent requests (default: 10)')
+    parser.add_argument('--timeout', type=float, default=10,
+                       help='Per-attempt request timeout in seconds (default: 10)')
+    parser.add_argument('--retries', type=int, default=0,
+                       help='Retry failed requests (network errors, 429, 5xx) this many times with jittered backoff (default: 0)')
+    parser.add_argument('--hedge', nargs='?', const='p95', type=parse_hedge,
+                       help="Send a duplicate request when one takes longer than SECONDS, or than the recent p95 latency if no value is given")
+    parser.add_argument('--parser', choices=['auto'] + PARSER_BACKENDS, default='html.parser',
+                       help='HTML parser backend (default: html.parser; auto picks the fastest installed)')
+    parser.add_argument('--payload', action='store_true',
+                       help='Read pages from their embedded Next.js data, falling back to HTML parsing')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                       help=f'Cache pages on disk (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                       help='Seconds a cached page is used without revalidation (default: 3600)')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                       help='Size of the cache before least recently used entries are evicted, in MB (default: 256)')
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH,
+                       help=f'Add scraped articles to a local full-text index (default path: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--metrics', action='store_true',
+                       help='Print per-stage timings (requests, parsing, serialization) and counters to stderr')
+    parser.add_argument('--rate', type=float,
+                       help='Maximum requests per second per host (default: unlimited)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adapt concurrency per host up to --concurrency: back off on 429/5xx/timeouts, ramp up while responses stay fast')
+    parser.add_argument('--learn-search', nargs='?', const=DEFAULT_STRATEGY_PATH,
+                       help=f'Remember which search strategy works and try it first (default path: {DEFAULT_STRATEGY_PATH})')
+    parser.add_argument('--snippet-window', type=int, default=DEFAULT_SNIPPET_WINDOW,
+                       help=f'Maximum length of search result snippets (default: {DEFAULT_SNIPPET_WINDOW})')
+    parser.add_argument('--record', nargs='?', const=DEFAULT_ARCHIVE_PATH,
+                       help=f'Record every response into a replay archive (default path: {DEFAULT_ARCHIVE_PATH})')
+    parser.add_argument('--scrape-articles', action='store_true',
+                       help='Also scrape the articles found for each subject')
+    parser.add_argument('--max-articles', type=int, default=3,
+                       help='Maximum number of articles to scrape per subject (default: 3)')
+
+    args = parser.parse_args()
+
+    if not args.subjects and not args.url:
+        parser.error('give at least one subject or --url')
+
+    if aiohttp is None:
+        print("aiohttp is required for the async scraper.")
+        print("Install with: pip install -r requirements_async.txt")
+        sys.exit(1)
+
+    result = asyncio.run(run(args))
+    stats = result['stats']
+
+    with METRICS.timer('serialization'):
+        output = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+        print(f"Results saved to {args.output}")
+    else:
+        print(output)
+
+    print(f"Fetched {stats['pages']} pages in {stats['elapsed']}s "
+          f"({stats['pages_per_second']} pages/second, {stats['errors']} errors)", file=sys.stderr)
+    if args.metrics:
+        print(METRICS.summary(), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Batch Runner
+Processes a stream of subjects concurrently for the scraper CLIs, writing
+one JSON line per subject and journaling progress so an interrupted batch
+can resume without redoing finished subjects.
+"""
+
+import sys
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def iter_subjects(path):
+    """Yield non-empty, stripped lines from a file, or from stdin for '-'"""
+    stream = sys.stdin if path == '-' else open(path, encoding='utf-8')
+    try:
+        for line in stream:
+            subject = line.strip()
+            if subject:
+                yield subject
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def iter_completed(function, items, workers=4, max_pending=None):
+    """
+    Yield (item, future) as the calls function(item) complete, on up to
+    `workers` threads. At most max_pending items (default workers * 4) are
+    in flight, so items are drawn from the iterable only as results are
+    consumed and input of any length streams through in constant memory.
+    """
+    max_pending = max_pending or workers * 4
+    in_flight = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for item in items:
+            while len(in_flight) >= max_pending:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    yield in_flight.pop(future), future
+            in_flight[executor.submit(function, item)] = item
+
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield in_flight.pop(future), future
+
+
+class BatchJournal:
+    """
+    Append-only JSONL record of finished subjects and the article URLs they
+    scraped. Reloaded on start, so finished subjects are skipped and
+    articles are never scraped twice across subjects or runs.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.done = set()
+        self.urls = set()
+        self._claimed = set()
+        self._lock = threading.Lock()
+
+        try:
+            with open(path, encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A run killed mid-write can leave a partial last line
+                        continue
+                    if 'done' in record:
+                        self.done.add(record['done'])
+                        self.urls.update(record.get('urls', []))
+        except FileNotFoundError:
+            pass
+
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def is_done(self, subject):
+        return subject in self.done
+
+    def claim_url(self, url):
+        """Return True if url hasn't been scraped yet (or claimed by another subject in this run)"""
+        with self._lock:
+            if url in self.urls or url in self._claimed:
+                return False
+            self._claimed.add(url)
+            return True
+
+    def release_url(self, url):
+        """Give up a claim whose scrape failed, so another subject or a re-run can retry it"""
+        with self._lock:
+            self._claimed.discard(url)
+
+    def mark_done(self, subject, urls=()):
+        """Persist a finished subject together with the URLs it scraped"""
+        record = {'done': subject}
+        if urls:
+            record['urls'] = list(urls)
+        with self._lock:
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+            self.done.add(subject)
+            self.urls.update(urls)
+
+    def close(self):
+        self._file.close()
+
+
+def run_batch(subjects, process, journal, output, workers=4, max_pending=None):
+    """
+    Run process(subject) for every subject not yet in the journal, using up
+    to `workers` threads. Only a bounded window of subjects is in flight, so
+    input of any length streams through in constant memory.
+
+    process returns a dict; a '_urls' key, if present, lists article URLs to
+    journal with the subject and is stripped from the output. Each result is
+    written as one JSON line and then journaled. Subjects whose result has
+    an 'error' are written but not journaled, so a re-run retries them.
+    """
+    max_pending = max_pending or workers * 4
+    stats = {'done': 0, 'failed': 0, 'skipped': 0}
+    in_flight = {}
+    started = time.perf_counter()
+
+    def finish(future):
+        subject = in_flight.pop(future)
+        try:
+            result = future.result()
+        except Exception as e:
+            result = {'search_query': subject, 'error': f"Batch item failed: {str(e)}"}
+
+        urls = result.pop('_urls', [])
+        output.write(json.dumps(result, ensure_ascii=False) + '\n')
+        output.flush()
+
+        if 'error' in result:
+            stats['failed'] += 1
+        else:
+            journal.mark_done(subject, urls)
+            stats['done'] += 1
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        for subject in subjects:
+            if journal.is_done(subject) or subject in in_flight.values():
+                stats['skipped'] += 1
+                continue
+
+            while len(in_flight) >= max_pending:
+                finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    finish(future)
+
+            in_flight[executor.submit(process, subject)] = subject
+
+        while in_flight:
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in finished:
+                finish(future)
+
+    stats['elapsed'] = round(time.perf_counter() - started, 3)
+    return stats
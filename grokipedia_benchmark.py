@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Parser Benchmark
+Times the HTTP scraper's extractors on the bundled fixture pages with each
+installed HTML parser backend, and runs an offline suite that measures each
+extractor's throughput, peak memory and allocations on a corpus of recorded
+and synthetic pages, failing when it regresses against a stored baseline.
+"""
+
+import os
+import sys
+import json
+import html
+import time
+import argparse
+import platform
+import tracemalloc
+
+from grokipedia_scraper import GrokipediaScraper, PARSER_BACKENDS
+from grokipedia_merge import ResultMerger
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Recorded pages shipped with the repository: (file, subject)
+FIXTURE_PAGES = [
+    ('grokpage.txt', 'mars landing'),
+]
+
+# Recorded scraper output the synthetic pages are rendered from
+FIXTURE_RESULTS = [
+    'test_article_scrape.json',
+    'artificial_intelligence_results.json',
+]
+
+DEFAULT_BASELINE_PATH = os.path.join(PROJECT_DIR, 'benchmark_baseline.json')
+
+SUITE_CASES = ('parse', 'article', 'search', 'main', 'payload', 'json')
+
+
+def load_fixtures(paths=None):
+    """Read fixture pages as (name, html, subject) tuples"""
+    fixtures = []
+    for path, subject in (paths or FIXTURE_PAGES):
+        full_path = path if os.path.isabs(path) else os.path.join(PROJECT_DIR, path)
+        with open(full_path, encoding='utf-8') as f:
+            fixtures.append((os.path.basename(path), f.read(), subject))
+    return fixtures
+
+
+def read_results(name):
+    with open(os.path.join(PROJECT_DIR, name), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def render_article_page(article, scale=1):
+    """
+    An article page in the site's layout (title, table of contents, headings,
+    linked paragraphs, references) built from a recorded article; scale
+    repeats its body to make large pages.
+    """
+    e = html.escape
+    sections = article.get('sections') or [{'level': 1, 'text': article['title'], 'id': ''}]
+    content = article.get('content', '')
+    chunk = max(1, len(content) // len(sections))
+    parts = [
+        f"<html><head><title>{e(article['title'])} - Grokipedia</title>",
+        f'<meta name="description" content="{e(article.get("description", ""))}">',
+        f'<meta property="og:title" content="{e(article["title"])}">',
+        '</head><body><nav>'
+    ]
+    for entry in article.get('table_of_contents', []):
+        parts.append(f'<a href="#{e(entry.get("section_id", ""))}">{e(entry["text"])}</a>')
+    parts.append('</nav><article>')
+    for copy in range(scale):
+        for i, section in enumerate(sections):
+            level = min(6, max(1, section.get('level', 2)))
+            parts.append(f'<h{level} id="{e(section.get("id", ""))}-{copy}">{e(section["text"])}</h{level}>')
+            words = content[i * chunk:(i + 1) * chunk].split(' ')
+            # Link every twentieth word, like the article cross-references
+            for start in range(0, len(words), 20):
+                link = words[start].strip('.,;:()"') or 'Grokipedia'
+                parts.append(f'<p><a href="/page/{e(link)}">{e(link)}</a> {e(" ".join(words[start + 1:start + 20]))}</p>')
+    for reference in article.get('references', []):
+        parts.append(f'<sup>{e(reference)}</sup>')
+    parts.append('</article></body></html>')
+    return ''.join(parts)
+
+
+def render_search_page(search, scale=1):
+    """
+    A search page with the recorded hits embedded as JSON and rendered as
+    result cards; scale repeats the hits under distinct URLs.
+    """
+    e = html.escape
+    hits = []
+    for copy in range(scale):
+        for hit in search['results']:
+            url = hit['url'] if copy == 0 else f"{hit['url']}_{copy}"
+            hits.append({'title': hit['title'], 'url': url, 'snippet': hit.get('snippet', '')})
+    payload = json.dumps({'props': {'pageProps': {'results': hits}}})
+    parts = [
+        f"<html><head><title>Search results for {e(search['search_term'])}</title>",
+        f'<meta name="description" content="{e(search.get("page_info", {}).get("description", ""))}">',
+        f'</head><body><script type="application/json">{payload}</script>',
+        '<div class="search-results">'
+    ]
+    for hit in hits:
+        parts.append(f'<div class="result-item"><a href="{e(hit["url"])}">{e(hit["title"])}</a>'
+                     f'<p>{e(hit["snippet"])}</p></div>')
+    parts.append('</div></body></html>')
+    return ''.join(parts)
+
+
+def load_corpus(scale=10):
+    """
+    The benchmark corpus as (name, html, subject) tuples: the recorded pages
+    plus pages rendered from the recorded results, once at their natural
+    size and once scale times larger
+    """
+    corpus = load_fixtures()
+    for name in FIXTURE_RESULTS:
+        recorded = read_results(name)
+        stem = os.path.splitext(name)[0]
+        search = recorded['search_results']
+        for size in (1, scale):
+            corpus.append((f"{stem}.search.x{size}", render_search_page(search, size), search['search_term']))
+        for i, article in enumerate(recorded.get('articles', [])):
+            for size in (1, scale):
+                corpus.append((f"{stem}.article{i}.x{size}", render_article_page(article, size), article['title']))
+    return corpus
+
+
+def load_json_corpus(scale=10):
+    """
+    Documents for the embedded-JSON walker: the recorded results as they
+    are, and all of them nested under Next.js-style props scale times
+    """
+    documents = [read_results(name) for name in FIXTURE_RESULTS]
+    nested = {'props': {'pageProps': {'data': [
+        {'search': recorded['search_results'], 'articles': recorded.get('articles', [])}
+        for _ in range(scale) for recorded in documents
+    ]}}}
+    return documents + [nested]
+
+
+def suite_runs(scraper, corpus, json_corpus):
+    """Zero-argument callables per suite case, each processing the whole corpus once"""
+    trees = [(name, scraper.parse_html(page), subject) for name, page, subject in corpus]
+
+    def walk_json():
+        merger = ResultMerger(scraper.base_url)
+        for document in json_corpus:
+            scraper._extract_from_json(document, merger)
+        return merger.results()
+
+    return {
+        'parse': lambda: [scraper.parse_html(page) for _, page, _ in corpus],
+        'article': lambda: [scraper.extract_article_data(soup, name) for name, soup, _ in trees],
+        'search': lambda: [scraper.extract_search_results(soup, subject) for _, soup, subject in trees],
+        'main': lambda: [scraper.extract_main_page_data(soup, subject) for _, soup, subject in trees],
+        'payload': lambda: [scraper.extract_payload_data(page, subject=subject) for _, page, subject in corpus],
+        'json': walk_json
+    }
+
+
+def measure(run, repeat=5):
+    """
+    Best wall time over repeat runs (after one warm-up), then the peak
+    traced memory of one more run and the number of memory blocks still
+    allocated by what it returned
+    """
+    run()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        result = run()
+        _, peak = tracemalloc.get_traced_memory()
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+    finally:
+        tracemalloc.stop()
+    del result
+
+    return {'seconds': min(timings), 'peak_kb': round(peak / 1024), 'blocks': blocks}
+
+
+def run_suite(parser='html.parser', scale=10, repeat=5, cases=SUITE_CASES):
+    """Measure every case over the corpus. Returns a baseline-shaped dict"""
+    scraper = GrokipediaScraper(parser=parser)
+    corpus = load_corpus(scale)
+    json_corpus = load_json_corpus(scale)
+    page_bytes = sum(len(page.encode('utf-8')) for _, page, _ in corpus)
+    json_bytes = sum(len(json.dumps(document).encode('utf-8')) for document in json_corpus)
+
+    runs = suite_runs(scraper, corpus, json_corpus)
+    results = {}
+    for case in cases:
+        stats = measure(runs[case], repeat)
+        pages, size = (len(json_corpus), json_bytes) if case == 'json' else (len(corpus), page_bytes)
+        stats['pages_per_second'] = round(pages / stats['seconds'], 2) if stats['seconds'] else 0.0
+        stats['mb_per_second'] = round(size / stats['seconds'] / 1e6, 2) if stats['seconds'] else 0.0
+        stats['seconds'] = round(stats['seconds'], 5)
+        results[case] = stats
+
+    return {
+        'parser': scraper.parser,
+        'scale': scale,
+        'pages': len(corpus),
+        'python': platform.python_version(),
+        'cases': results
+    }
+
+
+def compare_to_baseline(suite, baseline, time_tolerance=None, memory_tolerance=0.10):
+    """
+    Regressions of suite against baseline as (case, metric, baseline, now)
+    tuples: peak memory or retained blocks over memory_tolerance larger, and,
+    only if a time_tolerance is given, wall time over it slower. Memory use is
+    close to deterministic; wall time only compares on the same machine.
+    """
+    limits = [('peak_kb', memory_tolerance), ('blocks', memory_tolerance)]
+    if time_tolerance is not None:
+        limits.append(('seconds', time_tolerance))
+
+    regressions = []
+    for case, now in suite['cases'].items():
+        before = baseline['cases'].get(case)
+        if not before:
+            continue
+        for metric, tolerance in limits:
+            if before[metric] and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append((case, metric, before[metric], now[metric]))
+    return regressions
+
+
+def print_suite(suite, baseline=None):
+    print(f"{suite['pages']} pages (scale {suite['scale']}), parser {suite['parser']}, Python {suite['python']}")
+    print(f"{'case':<10} {'best (s)':>10} {'pages/s':>10} {'MB/s':>8} {'peak KB':>9} {'blocks':>9} {'vs baseline':>12}")
+    for case, stats in suite['cases'].items():
+        change = ''
+        before = baseline['cases'].get(case) if baseline else None
+        if before and before['seconds']:
+            change = f"{(stats['seconds'] / before['seconds'] - 1) * 100:+.0f}%"
+        print(f"{case:<10} {stats['seconds']:>10} {stats['pages_per_second']:>10} {stats['mb_per_second']:>8} "
+              f"{stats['peak_kb']:>9} {stats['blocks']:>9} {change:>12}")
+
+
+def available_backends():
+    """Parser backends that are actually installed"""
+    from bs4.builder import builder_registry
+    return [name for name in PARSER_BACKENDS if builder_registry.lookup(name)]
+
+
+def benchmark_backend(backend, fixtures, repeat=5):
+    """
+    Parse every fixture once per repetition and run all three extractors on
+    the shared tree. Returns the best total time and throughput.
+    """
+    scraper = GrokipediaScraper(parser=backend)
+    total_bytes = sum(len(html.encode('utf-8')) for _, html, _ in fixtures)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for name, html, subject in fixtures:
+            soup = scraper.parse_html(html)
+            scraper.extract_article_data(soup, name)
+            scraper.extract_search_results(soup, subject)
+            scraper.extract_main_page_data(soup, subject)
+        timings.append(time.perf_counter() - start)
+
+    best = min(timings)
+    return {
+        'backend': backend,
+        'pages': len(fixtures),
+        'best_seconds': round(best, 4),
+        'mean_seconds': round(sum(timings) / len(timings), 4),
+        'pages_per_second': round(len(fixtures) / best, 2) if best else 0.0,
+        'mb_per_second': round(total_bytes / best / 1e6, 2) if best else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare HTML parser backends on fixture pages')
+    parser.add_argument('pages', nargs='*', help='Extra HTML files to include (default: bundled fixtures only)')
+    parser.add_argument('--subject', default='mars landing',
+                       help='Subject used for extra pages (default: mars landing)')
+    parser.add_argument('-n', '--repeat', type=int, default=5,
+                       help='Repetitions per backend (default: 5)')
+    parser.add_argument('--suite', action='store_true',
+                       help='Run the per-extractor suite (throughput, peak memory, allocations) instead')
+    parser.add_argument('--parser', choices=PARSER_BACKENDS, default='html.parser',
+                       help='Parser backend for the suite (default: html.parser)')
+    parser.add_argument('--scale', type=int, default=10,
+                       help='Size multiplier of the large synthetic pages (default: 10)')
+    parser.add_argument('--case', action='append', choices=SUITE_CASES,
+                       help='Only run this suite case (repeatable; default: all)')
+    parser.add_argument('--check', nargs='?', const=DEFAULT_BASELINE_PATH,
+                       help=f'Exit with status 1 if the suite regressed against a baseline (default path: {DEFAULT_BASELINE_PATH})')
+    parser.add_argument('--save-baseline', nargs='?', const=DEFAULT_BASELINE_PATH,
+                       help=f'Store the suite results as the new baseline (default path: {DEFAULT_BASELINE_PATH})')
+    parser.add_argument('--time-tolerance', type=float,
+                       help='Also fail --check on a slowdown of more than this fraction; only meaningful against '
+                            'a baseline recorded on the same machine (default: timings are not checked)')
+    parser.add_argument('--memory-tolerance', type=float, default=0.10,
+                       help='Allowed growth of peak memory and retained blocks before --check fails (default: 0.10)')
+
+    args = parser.parse_args()
+
+    if args.suite or args.check or args.save_baseline:
+        run_suite_mode(args)
+        return
+
+    fixtures = load_fixtures(FIXTURE_PAGES + [(path, args.subject) for path in args.pages])
+    backends = available_backends()
+    if not backends:
+        print("No HTML parser backends available")
+        sys.exit(1)
+
+    print(f"{'backend':<12} {'best (s)':>10} {'mean (s)':>10} {'pages/s':>10} {'MB/s':>8}")
+    for backend in backends:
+        stats = benchmark_backend(backend, fixtures, args.repeat)
+        print(f"{stats['backend']:<12} {stats['best_seconds']:>10} {stats['mean_seconds']:>10} "
+              f"{stats['pages_per_second']:>10} {stats['mb_per_second']:>8}")
+
+
+def run_suite_mode(args):
+    baseline = None
+    if args.check:
+        try:
+            with open(args.check, encoding='utf-8') as f:
+                baseline = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            print(f"Cannot read baseline {args.check}: {e}")
+            sys.exit(1)
+        if baseline.get('scale') != args.scale or baseline.get('parser') != args.parser:
+            print(f"Baseline was recorded with --scale {baseline.get('scale')} --parser {baseline.get('parser')}; "
+                  f"run with the same options")
+            sys.exit(1)
+        if baseline.get('python', '').rsplit('.', 1)[0] != platform.python_version().rsplit('.', 1)[0]:
+            print(f"Note: the baseline was recorded on Python {baseline.get('python')}; "
+                  f"memory figures differ between Python versions")
+
+    suite = run_suite(args.parser, args.scale, args.repeat, args.case or SUITE_CASES)
+    print_suite(suite, baseline)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w', encoding='utf-8') as f:
+            json.dump(suite, f, indent=2)
+            f.write('\n')
+        print(f"Baseline saved to {args.save_baseline}")
+
+    if baseline:
+        regressions = compare_to_baseline(suite, baseline, args.time_tolerance, args.memory_tolerance)
+        for case, metric, before, now in regressions:
+            print(f"REGRESSION {case} {metric}: {before} -> {now}")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == "__main__":
+    main()
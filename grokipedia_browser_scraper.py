@@ -7,7 +7,12 @@ Uses Selenium to interact with the JavaScript-based search interface.
 import json
 import sys
 import time
+import queue
 import argparse
+import threading
+from urllib.parse import quote, urljoin, urlparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import requests
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
@@ -15,10 +20,182 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
 
+from grokipedia_batch import BatchJournal, iter_subjects, run_batch
+from grokipedia_cache import PageCache, DEFAULT_CACHE_PATH
+from grokipedia_index import ArticleIndex, DEFAULT_INDEX_PATH
+from grokipedia_ratelimit import RateLimiter, limit_session
+from grokipedia_metrics import METRICS
+from grokipedia_merge import ResultMerger
+from grokipedia_snippets import SNIPPET_INDEX_JS, DEFAULT_SNIPPET_WINDOW
+from grokipedia_replay import ReplayArchive, DEFAULT_ARCHIVE_PATH
+from grokipedia_output import open_output, stream_writer
+from grokipedia_payload import extract_payload, payload_is_complete, browser_article_from_payload
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+# Resources the scrapers never read, blocked per category with CDP
+# Network.setBlockedURLs wildcards. Scripts are left alone except known
+# analytics, since the articles are rendered client-side.
+BLOCKABLE_RESOURCES = {
+    'images': ['png', 'jpg', 'jpeg', 'gif', 'webp', 'avif', 'svg', 'ico', '*/_next/image*'],
+    'media': ['mp4', 'webm', 'ogg', 'mp3', 'wav', 'm4a'],
+    'fonts': ['woff', 'woff2', 'ttf', 'otf', 'eot'],
+    'css': ['css'],
+    'analytics': ['*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*',
+                  '*plausible.io*', '*segment.io*', '*mixpanel.com*', '*sentry.io*', '*/cdn-cgi/rum*'],
+}
+DEFAULT_BLOCKED_RESOURCES = tuple(BLOCKABLE_RESOURCES)
+
+# Rough median transfer size per blocked resource type, used to estimate the
+# bandwidth saved (a blocked request never reports its real size)
+TYPICAL_RESOURCE_BYTES = {
+    'Image': 15000,
+    'Media': 250000,
+    'Font': 30000,
+    'Stylesheet': 12000,
+    'Script': 20000,
+    'XHR': 2000,
+    'Fetch': 2000,
+    'Ping': 500,
+}
+
+
+def parse_block_resources(value):
+    """argparse type for --block-resources: comma-separated categories"""
+    categories = tuple(name.strip() for name in value.split(',') if name.strip())
+    unknown = [name for name in categories if name not in BLOCKABLE_RESOURCES]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"unknown resource categories {unknown}; choose from {', '.join(BLOCKABLE_RESOURCES)}")
+    return categories
+
+
+def blocked_url_patterns(categories):
+    """URL wildcards for Network.setBlockedURLs; file extensions match with or without a query string"""
+    patterns = []
+    for category in categories:
+        for entry in BLOCKABLE_RESOURCES[category]:
+            if '*' in entry:
+                patterns.append(entry)
+            else:
+                patterns.extend([f'*.{entry}', f'*.{entry}?*'])
+    return patterns
+
+# Polled by the adaptive wait: one script call reports everything needed to
+# decide whether the page has settled.
+PAGE_STATE_SCRIPT = """
+return {
+    ready: document.readyState,
+    skeletons: document.querySelectorAll('.animate-pulse').length,
+    article: !!document.querySelector('article'),
+    results: document.querySelectorAll('article, .card, [class*="result" i]').length,
+    resources: performance.getEntriesByType('resource').length
+};
+"""
+
+# Collects everything scrape_article reads in a single round-trip. Mirrors the
+# WebDriver path, including stopping early when the meta description is missing.
+ARTICLE_EXTRACT_SCRIPT = """
+var text = function (el) { return el.innerText || ''; };
+var data = {};
+var title = document.querySelector('title');
+if (!title) { return JSON.stringify({error: 'no title element'}); }
+data.title = text(title);
+
+var desc = document.querySelector('meta[name="description"]');
+if (!desc) { data.error = 'no meta description'; return JSON.stringify(data); }
+data.description = desc.getAttribute('content');
+
+var author = document.querySelector('meta[name="author"]');
+if (author) { data.author = author.getAttribute('content'); }
+
+data.table_of_contents = [];
+document.querySelectorAll('nav a[href^="#"]').forEach(function (link) {
+    var label = text(link).trim();
+    if (label && link.href) {
+        data.table_of_contents.push({
+            text: label,
+            section_id: link.href.indexOf('#') >= 0 ? link.href.split('#').pop() : ''
+        });
+    }
+});
+
+data.sections = [];
+var article = document.querySelector('article');
+if (article) {
+    data.content = text(article);
+    article.querySelectorAll('h1, h2, h3, h4, h5, h6').forEach(function (heading) {
+        data.sections.push({
+            level: parseInt(heading.tagName.charAt(1), 10),
+            text: text(heading),
+            id: heading.id || ''
+        });
+    });
+} else {
+    data.content = text(document.body);
+}
+
+data.references = [];
+document.querySelectorAll('sup').forEach(function (sup) {
+    data.references.push(text(sup).trim());
+});
+return JSON.stringify(data);
+"""
+
+# Every link on the page with its text, href and snippet, in one round-trip
+LINKS_EXTRACT_SCRIPT = SNIPPET_INDEX_JS + """
+var snippet = snippetIndex(arguments[0]);
+var links = [];
+document.querySelectorAll('a').forEach(function (link) {
+    links.push({
+        text: link.innerText || '',
+        href: link.href || null,
+        context: snippet(link)
+    });
+});
+return JSON.stringify(links);
+"""
+
+# Snippets for a list of link elements (arguments[1]), in one round-trip
+LINK_SNIPPETS_SCRIPT = SNIPPET_INDEX_JS + """
+var snippet = snippetIndex(arguments[0]);
+return arguments[1].map(snippet);
+"""
+
 class GrokipediaBrowserScraper:
-    def __init__(self, headless=True):
+    def __init__(self, headless=True, wait_mode='fixed', max_wait=15, idle_time=0.5,
+                 extraction_mode='webdriver', payload_first=False, cache=None, index=None,
+                 limiter=None, snippet_window=DEFAULT_SNIPPET_WINDOW, base_url="https://grokipedia.com/",
+                 recorder=None, block_resources=None):
         self.headless = headless
+        # Resource categories (see BLOCKABLE_RESOURCES) the browser doesn't download
+        self.block_resources = tuple(block_resources or ())
+        # Site to scrape; point it at a replay stub to test offline
+        self.base_url = base_url
+        self.host = urlparse(base_url).netloc
+        # Optional ReplayArchive that rendered pages and HTTP responses are recorded into
+        self.recorder = recorder
         self.driver = None
+        # Try the page's embedded Next.js data over plain HTTP before loading it in Chrome
+        self.payload_first = payload_first
+        self.http = None
+        # Optional PageCache of scraped articles, revalidated against the live page
+        self.cache = cache
+        # Optional ArticleIndex that freshly scraped articles are added to
+        self.index = index
+        # Optional RateLimiter shared with other scrapers (page loads and HTTP requests)
+        self.limiter = limiter
+        # 'webdriver' reads each element with its own RPC; 'script' extracts the page in one call
+        self.extraction_mode = extraction_mode
+        # Maximum snippet length for search results found through plain links
+        self.snippet_window = snippet_window
+        # Links of the current page in WebDriver mode, for fetching their snippets together
+        self._links = []
+        # 'fixed' sleeps 3 seconds per page; 'adaptive' returns as soon as the DOM has settled
+        self.wait_mode = wait_mode
+        self.max_wait = max_wait
+        self.idle_time = idle_time
+        # When the current page finished loading; the time after it counts as extraction
+        self._page_ready = None
 
     def setup_driver(self):
         """Setup Chrome WebDriver with appropriate options"""
@@ -30,11 +207,20 @@ class GrokipediaBrowserScraper:
         chrome_options.add_argument('--disable-dev-shm-usage')
         chrome_options.add_argument('--disable-gpu')
         chrome_options.add_argument('--window-size=1920,1080')
-        chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+        chrome_options.add_argument(f'--user-agent={USER_AGENT}')
+        if self.block_resources:
+            # Network events are read back from the performance log to count blocked requests
+            chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
         try:
-            self.driver = webdriver.Chrome(options=chrome_options)
-            self.driver.implicitly_wait(10)
+            with METRICS.timer('driver_startup'):
+                self.driver = webdriver.Chrome(options=chrome_options)
+                if self.block_resources:
+                    self.driver.execute_cdp_cmd('Network.enable', {})
+                    self.driver.execute_cdp_cmd('Network.setBlockedURLs',
+                                                {'urls': blocked_url_patterns(self.block_resources)})
+            # Adaptive mode waits explicitly, so missing optional elements must fail fast
+            self.driver.implicitly_wait(0 if self.wait_mode == 'adaptive' else 10)
             return True
         except Exception as e:
             print(f"Error setting up Chrome driver: {e}")
@@ -52,17 +238,18 @@ class GrokipediaBrowserScraper:
 
         try:
             # Construct search URL directly (like https://grokipedia.com/search?q=quantum%20theory%20expansion)
-            from urllib.parse import quote
-            search_url = f"https://grokipedia.com/search?q={quote(subject)}"
+            search_url = urljoin(self.base_url, f"search?q={quote(subject)}")
 
             # Navigate directly to the search results page
-            self.driver.get(search_url)
+            self.load_page(search_url)
 
             # Wait for the page to load and search results to appear
-            time.sleep(3)
+            self.wait_for_page(search_url, 'search')
 
             # Extract search results from the loaded page
             results = self.extract_search_results(subject)
+            self._record_extraction()
+            METRICS.incr('searches')
 
             return results
 
@@ -71,17 +258,80 @@ class GrokipediaBrowserScraper:
 
     def scrape_article(self, url):
         """
-        Scrape the content of an individual article page
+        Scrape the content of an individual article page, reusing a cached
+        copy when the page hasn't changed
+        """
+        if self.cache is None:
+            return self._scraped(self._scrape_article(url))
+
+        key = f"article:{url}"
+        entry = self.cache.get_valid(self._http_session(), url, key)
+        if entry:
+            return json.loads(entry['body'])
+
+        article_data = self._scraped(self._scrape_article(url))
+        if 'error' not in article_data:
+            self.cache.put_derived(self._http_session(), url, key, json.dumps(article_data, ensure_ascii=False))
+        return article_data
+
+    def load_page(self, url):
         """
+        Navigate the driver to url. With a rate limiter the load waits for a
+        slot; loads that raise (e.g. time out) count as failures.
+        """
+        with METRICS.timer('navigation'):
+            if self.limiter is None:
+                self.driver.get(url)
+                return
+            with self.limiter.limit(url) as outcome:
+                self.driver.get(url)
+                outcome['status'] = 200
+
+    def _record_extraction(self):
+        if self._page_ready is not None:
+            METRICS.observe('extraction', time.perf_counter() - self._page_ready)
+            self._page_ready = None
+
+    def _scraped(self, article_data):
+        """Book-keeping for a freshly scraped article: metrics and the full-text index"""
+        self._record_extraction()
+        if 'error' in article_data:
+            METRICS.incr('errors')
+        else:
+            METRICS.incr('pages')
+        if self.index is not None:
+            self.index.add(article_data)
+        return article_data
+
+    def _http_session(self):
+        """Plain HTTP session for requests that don't need the browser"""
+        if self.http is None:
+            self.http = requests.Session()
+            self.http.headers.update({'User-Agent': USER_AGENT})
+            if self.limiter is not None:
+                limit_session(self.http, self.limiter)
+            if self.recorder is not None:
+                self.http.hooks['response'].append(self.recorder.record_response)
+        return self.http
+
+    def _scrape_article(self, url):
+        if self.payload_first:
+            article_data = self.scrape_article_payload(url)
+            if article_data:
+                return article_data
+
         if not self.driver:
             return {"error": "Driver not initialized"}
 
         try:
             # Navigate to the article page
-            self.driver.get(url)
+            self.load_page(url)
 
             # Wait for the page to load
-            time.sleep(3)
+            self.wait_for_page(url, 'article')
+
+            if self.extraction_mode == 'script':
+                return self.extract_article_script(url)
 
             article_data = {
                 'url': url,
@@ -160,6 +410,160 @@ class GrokipediaBrowserScraper:
         except Exception as e:
             return {"error": f"Article scraping failed: {str(e)}"}
 
+    def scrape_article_payload(self, url):
+        """
+        Fetch the article without the browser and build it from the page's
+        hydration payload. Returns None if the payload is incomplete.
+        """
+        try:
+            with METRICS.timer('http_request'):
+                response = self._http_session().get(url, timeout=10)
+        except requests.RequestException:
+            return None
+        if response.status_code != 200:
+            return None
+        METRICS.incr('bytes', len(response.content))
+
+        with METRICS.timer('parse'):
+            page, flight = extract_payload(response.text)
+        if not payload_is_complete(page, flight):
+            return None
+        return browser_article_from_payload(page, flight, url, self.base_url)
+
+    def extract_article_script(self, url):
+        """
+        Extract the loaded article with a single injected script.
+        Produces the same structure as the WebDriver path in scrape_article.
+        """
+        article_data = {
+            'url': url,
+            'title': '',
+            'description': '',
+            'author': '',
+            'content': '',
+            'sections': [],
+            'table_of_contents': [],
+            'references': []
+        }
+
+        try:
+            page = json.loads(self.driver.execute_script(ARTICLE_EXTRACT_SCRIPT))
+
+            for key in ('title', 'description', 'author', 'content', 'sections', 'table_of_contents'):
+                if key in page:
+                    article_data[key] = page[key]
+
+            for text in page.get('references', []):
+                if text and text.replace('[', '').replace(']', '').isdigit():
+                    article_data['references'].append(text)
+
+            if page.get('error'):
+                article_data['error'] = f"Content extraction failed: {page['error']}"
+
+        except Exception as e:
+            article_data['error'] = f"Content extraction failed: {str(e)}"
+
+        return article_data
+
+    def _page_links(self):
+        """
+        All links on the page as dicts with 'text' and 'href'. Script mode
+        fetches them (and their snippets) in one call; WebDriver mode keeps
+        the element for later snippet lookups.
+        """
+        if self.extraction_mode == 'script':
+            return json.loads(self.driver.execute_script(LINKS_EXTRACT_SCRIPT, self.snippet_window))
+
+        links = []
+        for link in self.driver.find_elements(By.TAG_NAME, 'a'):
+            links.append({'href': link.get_attribute('href'), 'text': link.text, 'element': link})
+        self._links = links
+        return links
+
+    def _link_context(self, link):
+        """
+        Snippet for a link from _page_links: its parent's text without the
+        link text. In WebDriver mode the first lookup fetches the snippets of
+        every link on the page in a single script call.
+        """
+        if 'context' not in link:
+            try:
+                elements = [page_link['element'] for page_link in self._links]
+                snippets = self.driver.execute_script(LINK_SNIPPETS_SCRIPT, self.snippet_window, elements)
+            except Exception:
+                snippets = []
+            for page_link, snippet in zip(self._links, snippets):
+                page_link['context'] = snippet or ''
+        return link.get('context', '')
+
+    def wait_for_page(self, url, kind):
+        """
+        Wait for a freshly loaded page, recording the wait in the page_wait
+        metric, and return the seconds waited. In adaptive mode the page
+        counts as settled once the document is complete, the skeleton
+        loaders are gone, the expected content is present and no new network
+        requests have started for idle_time.
+        """
+        start = time.perf_counter()
+
+        if self.wait_mode != 'adaptive':
+            time.sleep(3)
+        else:
+            last = {'resources': -1, 'since': start}
+
+            def settled(driver):
+                state = driver.execute_script(PAGE_STATE_SCRIPT)
+                now = time.perf_counter()
+                if state['resources'] != last['resources']:
+                    last['resources'] = state['resources']
+                    last['since'] = now
+                if state['ready'] != 'complete':
+                    return False
+                if kind == 'article':
+                    content_ready = state['skeletons'] == 0 and state['article']
+                else:
+                    content_ready = state['skeletons'] == 0 or state['results'] > 0
+                return content_ready and now - last['since'] >= self.idle_time
+
+            try:
+                WebDriverWait(self.driver, self.max_wait, poll_frequency=0.1).until(settled)
+            except TimeoutException:
+                # Continue anyway - the page may still be usable
+                pass
+
+        if self.block_resources:
+            self._count_resources()
+        if self.recorder is not None:
+            self.recorder.put_page(url, self.driver.page_source)
+
+        self._page_ready = time.perf_counter()
+        METRICS.observe('page_wait', self._page_ready - start)
+        return round(self._page_ready - start, 3)
+
+    def _count_resources(self):
+        """
+        Drain the performance log into the metrics: blocked requests (per
+        resource type, with an estimate of the bytes they would have cost)
+        and the bytes actually downloaded
+        """
+        try:
+            entries = self.driver.get_log('performance')
+        except Exception:
+            return
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError):
+                continue
+            params = message.get('params', {})
+            if message.get('method') == 'Network.loadingFailed' and params.get('blockedReason'):
+                kind = params.get('type', 'Other')
+                METRICS.incr('blocked_requests')
+                METRICS.incr(f"blocked_{kind.lower()}")
+                METRICS.incr('blocked_bytes_estimate', TYPICAL_RESOURCE_BYTES.get(kind, 0))
+            elif message.get('method') == 'Network.loadingFinished':
+                METRICS.incr('browser_bytes', int(params.get('encodedDataLength', 0)))
+
     def extract_search_results(self, subject):
         """
         Extract search results from the current page
@@ -169,6 +573,8 @@ class GrokipediaBrowserScraper:
             'results': [],
             'page_info': {}
         }
+        # De-duplicates on canonical URL across the link, text and fallback passes
+        merger = ResultMerger(self.base_url)
 
         try:
             # Get page title
@@ -206,12 +612,12 @@ class GrokipediaBrowserScraper:
             found_results = False
 
             # First, let's try to find ALL links on the page that might be results
-            all_links = self.driver.find_elements(By.TAG_NAME, 'a')
+            all_links = self._page_links()
 
             result_links = []
             for link in all_links:
-                href = link.get_attribute('href')
-                text = link.text.strip()
+                href = link['href']
+                text = link['text'].strip()
 
                 if text and len(text) > 2 and href:  # Lower threshold for link text
                     # Skip navigation/internal links
@@ -219,16 +625,14 @@ class GrokipediaBrowserScraper:
                         # Include links that look like they could be article titles
                         if ('/article/' in href or '/wiki/' in href or
                             not href.startswith(('http://', 'https://')) or
-                            'grokipedia.com' in href):
+                            self.host in href):
                             result_links.append((text, href))
 
             # If we found result links, add them to results
-            for text, href in result_links[:20]:  # Limit to first 20 results
-                results['results'].append({
-                    'title': text,
-                    'url': href if href.startswith('http') else f'https://grokipedia.com{href}',
-                    'snippet': ''
-                })
+            for text, href in result_links:
+                if len(merger) >= 20:  # Limit to first 20 results
+                    break
+                merger.add(text, href, '', 'links')
                 found_results = True
 
             # If no links found, try to extract results from text content
@@ -263,14 +667,10 @@ class GrokipediaBrowserScraper:
                                 # Replace spaces with underscores but keep original case
                                 clean_title = title.replace('(', '').replace(')', '').replace(',', '').strip()
                                 url_slug = clean_title.replace(' ', '_')
-                                potential_url = f"https://grokipedia.com/page/{url_slug}"
+                                potential_url = urljoin(self.base_url, f"page/{url_slug}")
 
-                                results['results'].append({
-                                    'title': title,
-                                    'url': potential_url,
-                                    'snippet': f"Search result for '{subject}'"
-                                })
-                                result_count += 1
+                                if merger.add(title, potential_url, f"Search result for '{subject}'", 'text'):
+                                    result_count += 1
 
                                 if result_count >= 20:  # Limit results
                                     break
@@ -280,19 +680,16 @@ class GrokipediaBrowserScraper:
             # If no structured results found, look for any relevant content
             if not found_results:
                 # Look for any links that might be articles
-                all_links = self.driver.find_elements(By.TAG_NAME, 'a')
                 for link in all_links:
-                    href = link.get_attribute('href')
-                    text = link.text.strip()
+                    href = link['href']
+                    text = link['text'].strip()
 
                     if (text and len(text) > 10 and href and
                         subject.lower() in text.lower() and
                         not any(skip in href.lower() for skip in ['legal', 'images', 'favicon', 'manifest', '#', 'javascript:'])):
-                        results['results'].append({
-                            'title': text,
-                            'url': href,
-                            'snippet': self.get_element_context(link)
-                        })
+                        merger.add(text, href, lambda link=link: self._link_context(link), 'links')
+
+            results['results'] = merger.results()
 
             # Extract page metadata
             try:
@@ -316,54 +713,317 @@ class GrokipediaBrowserScraper:
                 results['message'] = f'Found {len(results["results"])} search results'
 
         except Exception as e:
+            results['results'] = merger.results()
             results['error'] = f"Extraction failed: {str(e)}"
 
         return results
 
-    def get_element_context(self, element):
-        """
-        Get context around an element for snippet generation
-        """
+    def cleanup(self):
+        """Clean up the browser driver"""
+        if self.driver:
+            self.driver.quit()
+        if self.http:
+            self.http.close()
+
+class GrokipediaBrowserPool:
+    """
+    A pool of long-lived browser scrapers that search and article jobs are
+    dispatched to in parallel. Each driver is recycled after serving
+    max_pages_per_driver pages to cap Chrome's memory growth.
+    """
+
+    def __init__(self, size=2, headless=True, max_pages_per_driver=50, **scraper_options):
+        self.size = max(1, size)
+        self.headless = headless
+        self.max_pages_per_driver = max_pages_per_driver
+        # Extra keyword arguments for each GrokipediaBrowserScraper (e.g. wait_mode)
+        self.scraper_options = scraper_options
+        self._idle = queue.Queue()
+        self._pages = {}
+        self._alive = 0
+        self._lock = threading.Lock()
+        self._executor = None
+        self.stats = {
+            'drivers_started': 0,
+            'drivers_recycled': 0,
+            'pages': 0
+        }
+
+    def _launch(self):
+        """Start one scraper, returning it or None if the driver failed"""
+        scraper = GrokipediaBrowserScraper(headless=self.headless, **self.scraper_options)
+        if not scraper.setup_driver():
+            return None
+        with self._lock:
+            self._pages[id(scraper)] = 0
+            self._alive += 1
+            self.stats['drivers_started'] += 1
+        return scraper
+
+    def start(self):
+        """Launch all drivers in parallel. Returns True if at least one started."""
+        with ThreadPoolExecutor(max_workers=self.size) as launcher:
+            for scraper in launcher.map(lambda _: self._launch(), range(self.size)):
+                if scraper:
+                    self._idle.put(scraper)
+
+        if not self._alive:
+            return False
+
+        self._executor = ThreadPoolExecutor(max_workers=self._alive)
+        return True
+
+    def _checkout(self):
+        while True:
+            try:
+                return self._idle.get(timeout=1)
+            except queue.Empty:
+                if not self._alive:
+                    raise RuntimeError("No browser drivers available")
+
+    def _checkin(self, scraper):
+        with self._lock:
+            self._pages[id(scraper)] += 1
+            self.stats['pages'] += 1
+            worn_out = self._pages[id(scraper)] >= self.max_pages_per_driver
+
+        if worn_out:
+            self._retire(scraper)
+            scraper = self._launch()
+            with self._lock:
+                self.stats['drivers_recycled'] += 1
+            if not scraper:
+                return
+
+        self._idle.put(scraper)
+
+    def _retire(self, scraper):
+        scraper.cleanup()
+        with self._lock:
+            self._pages.pop(id(scraper), None)
+            self._alive -= 1
+
+    def run(self, method, *args):
+        """Run a scraper method on the next free driver (blocking)"""
+        scraper = self._checkout()
         try:
-            # Get text from parent element
-            parent = element.find_element(By.XPATH, '..')
-            context = parent.text
-            element_text = element.text
+            return getattr(scraper, method)(*args)
+        finally:
+            self._checkin(scraper)
+
+    def submit(self, method, *args):
+        """Queue a scraper method on the pool, returning a Future"""
+        return self._executor.submit(self.run, method, *args)
 
-            # Remove the element text to get context
-            if element_text in context:
-                context = context.replace(element_text, '').strip()
+    def search_subject(self, subject):
+        return self.run('search_subject', subject)
 
-            return context[:200] if len(context) > 200 else context
-        except:
-            return ""
+    def scrape_article(self, url):
+        return self.run('scrape_article', url)
+
+    def scrape_articles(self, urls, on_result=None, collect=True):
+        """
+        Scrape articles in parallel across the pool, preserving input order.
+        on_result(index, article_data) is called as each article finishes.
+        With collect=False articles are only passed to on_result and not
+        kept, so memory stays flat however many URLs are scraped.
+        """
+        futures = {self.submit('scrape_article', url): i for i, url in enumerate(urls)}
+        results = [None] * len(urls) if collect else None
+        for future in as_completed(futures):
+            i = futures.pop(future)
+            try:
+                article_data = future.result()
+            except Exception as e:
+                article_data = {"error": f"Article scraping failed: {str(e)}"}
+            if collect:
+                results[i] = article_data
+            if on_result:
+                on_result(i, article_data)
+        return results
 
     def cleanup(self):
-        """Clean up the browser driver"""
-        if self.driver:
-            self.driver.quit()
+        """Shut down the dispatcher and quit every driver"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.cleanup()
+
+def run_batch_mode(scraper, args):
+    """
+    Run every subject from --batch through the browser pool, writing one
+    JSON line per subject. Articles already scraped for an earlier subject
+    (in this run or a previous one) are listed under duplicate_urls instead
+    of being scraped again. Articles that fail are listed under failed_urls
+    and fail the subject, so a re-run retries them.
+    """
+    journal = BatchJournal(args.journal or f"{args.output or 'grokipedia_batch'}.journal")
+
+    def process(subject):
+        search_result = scraper.search_subject(subject)
+        result = {'search_query': subject, 'search_results': search_result}
+        if 'error' in search_result:
+            result['error'] = search_result['error']
+            return result
+
+        if args.scrape_articles and search_result.get('results'):
+            urls = [item['url'] for item in search_result['results'][:args.max_articles]]
+            new_urls = [url for url in urls if journal.claim_url(url)]
+            scraped = [scraper.scrape_article(url) for url in new_urls]
+            result['articles'] = [article for article in scraped if 'error' not in article]
+            result['duplicate_urls'] = [url for url in urls if url not in new_urls]
+            result['_urls'] = [article['url'] for article in result['articles']]
+
+            failed = [{'url': url, 'error': article['error']}
+                      for url, article in zip(new_urls, scraped) if 'error' in article]
+            if failed:
+                for item in failed:
+                    journal.release_url(item['url'])
+                result['failed_urls'] = failed
+                result['error'] = f"{len(failed)} of {len(new_urls)} articles failed to scrape"
+
+        result['scraped_at'] = str(time.time())
+        return result
+
+    output = open_output(args.output, args.compress, append=True)
+    try:
+        stats = run_batch(iter_subjects(args.batch), process, journal, output, workers=scraper.size)
+    finally:
+        journal.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Batch finished: {stats['done']} done, {stats['failed']} failed, "
+          f"{stats['skipped']} skipped in {stats['elapsed']}s", file=sys.stderr)
+
+def run_stream_mode(scraper, args):
+    """
+    Search one subject and write each search result and article as soon as
+    it is available instead of building the whole result first
+    """
+    writer = stream_writer(args.format, args.output, args.compress)
+    try:
+        search_result = scraper.search_subject(args.subject)
+        writer.search(args.subject, search_result)
+
+        if args.scrape_articles and search_result.get('results'):
+            urls = [item['url'] for item in search_result['results'][:args.max_articles]]
+
+            def emit(i, article_data):
+                if 'error' in article_data:
+                    print(f"Warning: Failed to scrape article {urls[i]}: {article_data['error']}", file=sys.stderr)
+                else:
+                    writer.article(article_data, args.subject)
+
+            scraper.scrape_articles(urls, on_result=emit, collect=False)
+    finally:
+        writer.close()
+
+    if args.output:
+        print(f"Results saved to {args.output}", file=sys.stderr)
 
 def main():
     parser = argparse.ArgumentParser(description='Query subjects on Grokipedia using browser automation')
-    parser.add_argument('subject', help='The subject to search for')
+    parser.add_argument('subject', nargs='?', help='The subject to search for')
+    parser.add_argument('--batch', metavar='FILE',
+                       help="Read subjects one per line from FILE ('-' for stdin) and write one JSON line per subject")
+    parser.add_argument('--journal',
+                       help='Batch progress journal used to resume interrupted runs (default: <output>.journal)')
     parser.add_argument('-o', '--output', help='Output file (default: print to stdout)')
     parser.add_argument('-f', '--format', choices=['json', 'text'], default='json',
                        help='Output format (default: json)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Write each search result and article as soon as it is scraped (JSON lines with -f json)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                       help='Compress the output file (default: from the .gz/.zst suffix of -o)')
     parser.add_argument('--visible', action='store_true',
                        help='Run browser in visible mode (not headless)')
     parser.add_argument('--scrape-articles', action='store_true',
                        help='Also scrape the full content of individual articles')
     parser.add_argument('--max-articles', type=int, default=3,
                        help='Maximum number of articles to scrape when using --scrape-articles (default: 3)')
+    parser.add_argument('--workers', type=int, default=1,
+                       help='Number of parallel browser drivers for article scraping, or for subjects in batch mode (default: 1)')
+    parser.add_argument('--recycle-after', type=int, default=50,
+                       help='Restart each browser driver after this many pages (default: 50)')
+    parser.add_argument('--extraction', choices=['webdriver', 'script'], default='webdriver',
+                       help='DOM extraction: one WebDriver call per element or a single injected script (default: webdriver)')
+    parser.add_argument('--payload-first', action='store_true',
+                       help='Read articles from their embedded Next.js data over HTTP, using the browser only as a fallback')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                       help=f'Cache scraped articles on disk (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                       help='Seconds a cached article is used without revalidation (default: 3600)')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                       help='Size of the cache before least recently used entries are evicted, in MB (default: 256)')
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH,
+                       help=f'Add scraped articles to a local full-text index (default path: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--rate', type=float,
+                       help='Maximum page loads per second (default: unlimited)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adapt the number of concurrent page loads up to --workers: back off on timeouts, ramp up while loads stay fast')
+    parser.add_argument('--metrics', action='store_true',
+                       help='Print per-stage timings (driver startup, navigation, wait, extraction, ...) and counters to stderr')
+    parser.add_argument('--wait-mode', choices=['fixed', 'adaptive'], default='fixed',
+                       help='Page wait strategy: fixed 3s sleep or adaptive readiness detection (default: fixed)')
+    parser.add_argument('--snippet-window', type=int, default=DEFAULT_SNIPPET_WINDOW,
+                       help=f'Maximum length of search result snippets (default: {DEFAULT_SNIPPET_WINDOW})')
+    parser.add_argument('--base-url', default='https://grokipedia.com/',
+                       help='Site to scrape, e.g. a local replay stub (default: https://grokipedia.com/)')
+    parser.add_argument('--record', nargs='?', const=DEFAULT_ARCHIVE_PATH,
+                       help=f'Record rendered pages and HTTP responses into a replay archive (default path: {DEFAULT_ARCHIVE_PATH})')
+    parser.add_argument('--block-resources', nargs='?', const=DEFAULT_BLOCKED_RESOURCES, type=parse_block_resources,
+                       help=f'Don\'t download these resource categories (default when given: {",".join(DEFAULT_BLOCKED_RESOURCES)})')
 
     args = parser.parse_args()
 
-    scraper = GrokipediaBrowserScraper(headless=not args.visible)
-
-    if not scraper.setup_driver():
+    if not args.subject and not args.batch:
+        parser.error('give a subject or --batch FILE')
+    if args.batch and args.format != 'json':
+        parser.error('--batch writes JSON lines; use -f json')
+
+    cache = PageCache(args.cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    index = ArticleIndex(args.index) if args.index else None
+    if args.batch:
+        workers = args.workers
+    else:
+        workers = min(args.workers, args.max_articles) if args.scrape_articles else 1
+    limiter = RateLimiter(rate=args.rate, adaptive=args.adaptive,
+                          max_concurrency=workers) if args.rate or args.adaptive else None
+    if cache:
+        METRICS.register_collector(cache.get_stats, 'cache')
+    scraper = GrokipediaBrowserPool(size=workers, headless=not args.visible,
+                                    max_pages_per_driver=args.recycle_after,
+                                    wait_mode=args.wait_mode,
+                                    extraction_mode=args.extraction,
+                                    payload_first=args.payload_first,
+                                    cache=cache, index=index, limiter=limiter,
+                                    snippet_window=args.snippet_window, base_url=args.base_url,
+                                    recorder=ReplayArchive(args.record) if args.record else None,
+                                    block_resources=args.block_resources)
+
+    if not scraper.start():
         sys.exit(1)
 
     try:
+        if args.batch:
+            run_batch_mode(scraper, args)
+            return
+
+        if args.stream:
+            run_stream_mode(scraper, args)
+            return
+
         # First, get search results
         search_result = scraper.search_subject(args.subject)
 
@@ -371,15 +1031,16 @@ def main():
             # Scrape individual articles
             print(f"Found {len(search_result['results'])} search results. Scraping up to {args.max_articles} articles...")
 
-            articles_data = []
-            for i, result_item in enumerate(search_result['results'][:args.max_articles]):
-                print(f"Scraping article {i+1}/{min(args.max_articles, len(search_result['results']))}: {result_item['title']}")
-                article_data = scraper.scrape_article(result_item['url'])
-                if 'error' not in article_data:
-                    articles_data.append(article_data)
-                else:
+            to_scrape = search_result['results'][:args.max_articles]
+
+            def report(i, article_data):
+                print(f"Scraped article {i+1}/{len(to_scrape)}: {to_scrape[i]['title']}")
+                if 'error' in article_data:
                     print(f"  Warning: Failed to scrape article: {article_data['error']}")
 
+            scraped = scraper.scrape_articles([item['url'] for item in to_scrape], on_result=report)
+            articles_data = [article for article in scraped if 'error' not in article]
+
             # Combine search results with article data
             result = {
                 'search_query': args.subject,
@@ -391,7 +1052,8 @@ def main():
             result = search_result
 
         if args.format == 'json':
-            output = json.dumps(result, indent=2, ensure_ascii=False)
+            with METRICS.timer('serialization'):
+                output = json.dumps(result, indent=2, ensure_ascii=False)
         else:
             # Simple text format
             output = f"Subject: {args.subject}\n"
@@ -429,14 +1091,21 @@ def main():
                         output += "-" * 30 + "\n\n"
 
         if args.output:
-            with open(args.output, 'w', encoding='utf-8') as f:
+            with open_output(args.output, args.compress) as f:
                 f.write(output)
             print(f"Results saved to {args.output}")
         else:
             print(output)
 
+        if cache:
+            stats = cache.get_stats()
+            print(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} misses",
+                  file=sys.stderr)
+
     finally:
         scraper.cleanup()
+        if args.metrics:
+            print(METRICS.summary(), file=sys.stderr)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Page Cache
+A persistent, size-bounded SQLite cache of fetched pages (and results derived
+from them) with TTL freshness and ETag/Last-Modified revalidation.
+"""
+
+import os
+import sys
+import time
+import zlib
+import sqlite3
+import argparse
+import threading
+
+import requests
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'grokipedia', 'pages.sqlite')
+
+
+def cache_key(url, params=None):
+    """Canonical cache key for a GET request (the fully encoded URL)"""
+    if not params:
+        return url
+    return requests.Request('GET', url, params=params).prepare().url
+
+
+class CachedResponse:
+    """The parts of a requests.Response the scrapers use, served from the cache"""
+
+    def __init__(self, url, entry):
+        self.url = url
+        self.status_code = 200
+        self.text = entry['body']
+        self.headers = {}
+        if entry['etag']:
+            self.headers['ETag'] = entry['etag']
+        if entry['last_modified']:
+            self.headers['Last-Modified'] = entry['last_modified']
+        self.from_cache = True
+
+
+class PageCache:
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=3600, max_bytes=256 * 1024 * 1024):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'revalidated': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+        # key -> (etag, last_modified) seen by get_valid's HEAD, for put_derived
+        self._validators = {}
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS pages (
+                key TEXT PRIMARY KEY,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        ''')
+        self.db.execute('CREATE INDEX IF NOT EXISTS pages_accessed ON pages (accessed_at)')
+        self.db.commit()
+
+    def get(self, key):
+        """Return the cached entry for key (fresh or not), or None"""
+        with self._lock:
+            row = self.db.execute(
+                'SELECT body, etag, last_modified, fetched_at FROM pages WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            self.db.execute('UPDATE pages SET accessed_at = ? WHERE key = ?', (time.time(), key))
+            self.db.commit()
+
+        return {
+            'body': zlib.decompress(row[0]).decode('utf-8'),
+            'etag': row[1],
+            'last_modified': row[2],
+            'fetched_at': row[3]
+        }
+
+    def _count(self, stat):
+        with self._lock:
+            self.stats[stat] += 1
+
+    def is_fresh(self, entry):
+        return time.time() - entry['fetched_at'] < self.ttl
+
+    def put(self, key, body, etag=None, last_modified=None):
+        """Store a compressed body with its validators, evicting LRU entries over max_bytes"""
+        blob = zlib.compress(body.encode('utf-8'))
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO pages (key, body, size, etag, last_modified, fetched_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (key, blob, len(blob), etag, last_modified, now, now)
+            )
+            self.stats['stores'] += 1
+            self._evict()
+            self.db.commit()
+
+    def refresh(self, key):
+        """Mark an entry fresh again after the server confirmed it is unchanged"""
+        with self._lock:
+            self.db.execute('UPDATE pages SET fetched_at = ? WHERE key = ?', (time.time(), key))
+            self.db.commit()
+
+    def _evict(self):
+        total = self.db.execute('SELECT COALESCE(SUM(size), 0) FROM pages').fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self.db.execute('SELECT key, size FROM pages ORDER BY accessed_at').fetchall():
+            self.db.execute('DELETE FROM pages WHERE key = ?', (key,))
+            self.stats['evictions'] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def conditional_headers(self, entry):
+        headers = {}
+        if entry and entry['etag']:
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry['last_modified']:
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def fetch(self, session, url, params=None, **kwargs):
+        """
+        GET a page through the cache. Fresh entries are served without a
+        request; stale ones are revalidated with a conditional GET.
+        Returns a requests.Response or a CachedResponse.
+        """
+        key = cache_key(url, params)
+        entry = self.get(key)
+        if entry and self.is_fresh(entry):
+            self._count('hits')
+            return CachedResponse(key, entry)
+
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers.update(self.conditional_headers(entry))
+        response = session.get(url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and entry:
+            self._count('revalidated')
+            self.refresh(key)
+            return CachedResponse(key, entry)
+
+        self._count('misses')
+        if response.status_code == 200:
+            self.put(key, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        return response
+
+    def get_valid(self, session, url, key, timeout=10):
+        """
+        Return a derived entry (e.g. a scraped article stored under key) if it
+        is fresh or the page at url is unchanged upstream, else None. The
+        validators of a changed page are kept for the put_derived that follows.
+        """
+        entry = self.get(key)
+        if entry is None:
+            self._count('misses')
+            return None
+        if self.is_fresh(entry):
+            self._count('hits')
+            return entry
+
+        headers = self.conditional_headers(entry)
+        if headers:
+            try:
+                response = session.head(url, headers=headers, timeout=timeout, allow_redirects=True)
+                if response.status_code == 304:
+                    self._count('revalidated')
+                    self.refresh(key)
+                    return entry
+                if response.status_code == 200:
+                    with self._lock:
+                        self._validators[key] = (response.headers.get('ETag'),
+                                                 response.headers.get('Last-Modified'))
+            except requests.RequestException:
+                pass
+
+        self._count('misses')
+        return None
+
+    def put_derived(self, session, url, key, body, timeout=10):
+        """
+        Store a derived entry with the page's validators: those get_valid
+        just saw, or else those from a HEAD of url
+        """
+        with self._lock:
+            validators = self._validators.pop(key, None)
+        if validators is None:
+            validators = (None, None)
+            try:
+                response = session.head(url, timeout=timeout, allow_redirects=True)
+                validators = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+            except requests.RequestException:
+                pass
+        self.put(key, body, *validators)
+
+    def get_stats(self):
+        """Hit/miss counters plus the cache's current size"""
+        with self._lock:
+            entries, total = self.db.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages').fetchone()
+            stats = dict(self.stats)
+        stats['entries'] = entries
+        stats['bytes'] = total
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self.db.execute('DELETE FROM pages')
+            self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect or clear the Grokipedia page cache')
+    parser.add_argument('--cache', default=DEFAULT_CACHE_PATH,
+                       help=f'Cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--clear', action='store_true', help='Delete every cached page')
+
+    args = parser.parse_args()
+
+    if not os.path.exists(args.cache):
+        print(f"No cache at {args.cache}")
+        sys.exit(1)
+
+    cache = PageCache(args.cache)
+    if args.clear:
+        cache.clear()
+        print(f"Cleared {args.cache}")
+    stats = cache.get_stats()
+    print(f"{args.cache}: {stats['entries']} entries, {stats['bytes']} bytes")
+    cache.close()
+
+if __name__ == "__main__":
+    main()
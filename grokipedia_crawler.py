@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Link Graph Crawler
+Breadth-first crawl of Grokipedia articles from seed subjects, following
+/page/ links and writing the link graph as an adjacency list (one JSON line
+per article).
+"""
+
+import sys
+import json
+import math
+import time
+import asyncio
+import hashlib
+import argparse
+from urllib.parse import urljoin, urlsplit, urlunsplit, unquote
+
+from grokipedia_async_scraper import AsyncGrokipediaScraper, aiohttp
+from grokipedia_cache import PageCache, DEFAULT_CACHE_PATH
+from grokipedia_index import ArticleIndex, DEFAULT_INDEX_PATH
+from grokipedia_ratelimit import RateLimiter
+from grokipedia_output import open_output
+from grokipedia_scraper import PARSER_BACKENDS
+
+
+def canonical_page_url(url, base_url):
+    """
+    Normalize an article link to its canonical URL on base_url's host, or
+    None if it isn't a /page/ link on that host. Query strings and fragments
+    are dropped and percent-escapes decoded, so variants of one article
+    collapse to a single node.
+    """
+    parts = urlsplit(urljoin(base_url, url))
+    base = urlsplit(base_url)
+    if parts.scheme not in ('http', 'https') or parts.netloc.lower() != base.netloc.lower():
+        return None
+    path = unquote(parts.path)
+    if not path.startswith('/page/') or len(path) <= len('/page/'):
+        return None
+    return urlunsplit((base.scheme, base.netloc, path.replace(' ', '_'), '', ''))
+
+
+def _url_hash(url):
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+class VisitedSet:
+    """Exact visited set storing a 64-bit hash per URL instead of the URL itself"""
+
+    def __init__(self):
+        self._hashes = set()
+
+    def add(self, url):
+        """Add url; return False if it was already present"""
+        h = _url_hash(url)
+        if h in self._hashes:
+            return False
+        self._hashes.add(h)
+        return True
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic visited set for very large crawls. Sized for
+    `capacity` URLs at `error_rate` false positives; a false positive means
+    an unvisited page is skipped, never that a page is fetched twice.
+    """
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, url):
+        digest = hashlib.blake2b(url.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, url):
+        """Add url; return False if it was (probably) already present"""
+        new = False
+        for pos in self._positions(url):
+            byte, bit = divmod(pos, 8)
+            if not self.bits[byte] & (1 << bit):
+                self.bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __len__(self):
+        return self.count
+
+
+class Politeness:
+    """Spaces out request starts so there is at least `delay` seconds between them"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self._next = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if self.delay <= 0:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            if self._next > now:
+                await asyncio.sleep(self._next - now)
+            self._next = max(now, self._next) + self.delay
+
+
+class GrokipediaCrawler:
+    """
+    Breadth-first crawler over an AsyncGrokipediaScraper. Pages are fetched
+    by `scraper.concurrency` workers from a FIFO frontier; every URL is
+    admitted to the frontier at most once, and only while fewer than
+    max_pages have been admitted and its depth is at most max_depth.
+    """
+
+    def __init__(self, scraper, max_depth=2, max_pages=100, delay=0.0, visited=None):
+        self.scraper = scraper
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.politeness = Politeness(delay)
+        self.visited = visited if visited is not None else VisitedSet()
+        self.frontier = None
+        self.stats = {
+            'pages': 0,
+            'edges': 0,
+            'errors': 0,
+            'max_frontier': 0
+        }
+
+    def _admit(self, url, depth):
+        if depth > self.max_depth or len(self.visited) >= self.max_pages:
+            return False
+        if not self.visited.add(url):
+            return False
+        self.frontier.put_nowait((url, depth))
+        self.stats['max_frontier'] = max(self.stats['max_frontier'], self.frontier.qsize())
+        return True
+
+    async def seed_urls(self, subjects):
+        """Resolve seed subjects to article URLs (the top search result of each)"""
+        urls = []
+        for subject, result in zip(subjects, await self.scraper.search_many(subjects)):
+            if 'error' in result:
+                print(f"Seed '{subject}': {result['error']}", file=sys.stderr)
+                continue
+            url = result['results'][0]['url'] if result.get('results') else result.get('url')
+            if not url:
+                continue
+            if canonical_page_url(url, self.scraper.base_url) is None:
+                print(f"Seed '{subject}': top result {url} is not an article page", file=sys.stderr)
+                continue
+            urls.append(url)
+        return urls
+
+    async def _visit(self, url, depth):
+        await self.politeness.wait()
+        article = await self.scraper.scrape_article(url)
+        if 'error' in article:
+            self.stats['errors'] += 1
+            return {'url': url, 'depth': depth, 'error': article['error']}
+
+        links = []
+        seen = set()
+        for link in article.get('links', []):
+            target = canonical_page_url(link['url'], self.scraper.base_url)
+            if target and target != url and target not in seen:
+                seen.add(target)
+                links.append(target)
+                self._admit(target, depth + 1)
+
+        self.stats['pages'] += 1
+        self.stats['edges'] += len(links)
+        return {'url': url, 'title': article.get('title', ''), 'depth': depth, 'links': links}
+
+    async def crawl(self, seed_urls, on_page):
+        """Crawl from seed_urls, calling on_page(record) for every fetched article"""
+        self.frontier = asyncio.Queue()
+        for url in seed_urls:
+            url = canonical_page_url(url, self.scraper.base_url)
+            if url:
+                self._admit(url, 0)
+
+        async def worker():
+            while True:
+                url, depth = await self.frontier.get()
+                try:
+                    try:
+                        record = await self._visit(url, depth)
+                    except Exception as e:
+                        self.stats['errors'] += 1
+                        record = {'url': url, 'depth': depth, 'error': f"Crawl failed: {str(e)}"}
+                    on_page(record)
+                except Exception as e:
+                    # A failing on_page (e.g. a closed output pipe) must not end
+                    # the worker, or frontier.join() would wait forever
+                    self.stats['errors'] += 1
+                    print(f"Could not report {url}: {str(e)}", file=sys.stderr)
+                finally:
+                    self.frontier.task_done()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(self.scraper.concurrency)]
+        try:
+            await self.frontier.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+
+async def run(args, output):
+    cache = PageCache(args.cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    index = ArticleIndex(args.index) if args.index else None
+    visited = BloomFilter(args.bloom) if args.bloom else VisitedSet()
+    limiter = RateLimiter(rate=args.rate, adaptive=args.adaptive,
+                          max_concurrency=args.concurrency) if args.rate or args.adaptive else None
+
+    async with AsyncGrokipediaScraper(base_url=args.base_url, concurrency=args.concurrency,
+                                      timeout=args.timeout, parser=args.parser,
+                                      prefer_payload=True, cache=cache, index=index,
+                                      limiter=limiter) as scraper:
+        crawler = GrokipediaCrawler(scraper, max_depth=args.depth, max_pages=args.max_pages,
+                                    delay=args.delay, visited=visited)
+        seeds = list(args.url)
+        if args.subjects:
+            seeds += await crawler.seed_urls(args.subjects)
+        if not seeds:
+            print("No seed articles found", file=sys.stderr)
+            return None
+
+        def write(record):
+            output.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+        started = time.perf_counter()
+        await crawler.crawl(seeds, write)
+        output.flush()
+
+        stats = dict(crawler.stats)
+        stats['elapsed'] = round(time.perf_counter() - started, 3)
+        stats['pages_per_second'] = round(stats['pages'] / stats['elapsed'], 2) if stats['elapsed'] else 0.0
+        stats['bytes'] = scraper.stats['bytes']
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Crawl the Grokipedia link graph breadth-first')
+    parser.add_argument('subjects', nargs='*', help='Seed subjects (their top search result starts the crawl)')
+    parser.add_argument('--url', action='append', default=[],
+                       help='Seed article URL (can be repeated)')
+    parser.add_argument('-o', '--output',
+                       help='Adjacency list output, one JSON line per article (default: stdout; .gz/.zst compress)')
+    parser.add_argument('--base-url', default='https://grokipedia.com/',
+                       help='Site to crawl (e.g. a local stub server)')
+    parser.add_argument('--depth', type=int, default=2,
+                       help='Maximum link depth from the seeds (default: 2)')
+    parser.add_argument('--max-pages', type=int, default=100,
+                       help='Maximum number of articles to fetch (default: 100)')
+    parser.add_argument('-c', '--concurrency', type=int, default=10,
+                       help='Maximum concurrent requests (default: 10)')
+    parser.add_argument('--delay', type=float, default=0.0,
+                       help='Minimum seconds between request starts, for politeness (default: 0)')
+    parser.add_argument('--rate', type=float,
+                       help='Maximum requests per second (default: unlimited; see also --delay)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adapt concurrency up to --concurrency: back off on 429/5xx/timeouts, ramp up while responses stay fast')
+    parser.add_argument('--bloom', type=int, metavar='CAPACITY',
+                       help='Track visited URLs in a Bloom filter sized for CAPACITY URLs instead of an exact set')
+    parser.add_argument('--timeout', type=float, default=10,
+                       help='Per-request timeout in seconds (default: 10)')
+    parser.add_argument('--parser', choices=['auto'] + PARSER_BACKENDS, default='html.parser',
+                       help='HTML parser backend for pages without embedded data (default: html.parser)')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                       help=f'Cache pages on disk (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                       help='Seconds a cached page is used without revalidation (default: 3600)')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                       help='Size of the cache before least recently used entries are evicted, in MB (default: 256)')
+
+    parser.add_argument('--index', nargs='?', const=DEFAULT_INDEX_PATH,
+                       help=f'Add crawled articles to a local full-text index (default path: {DEFAULT_INDEX_PATH})')
+
+    args = parser.parse_args()
+
+    if not args.subjects and not args.url:
+        parser.error('give at least one seed subject or --url')
+
+    if aiohttp is None:
+        print("aiohttp is required for the crawler.")
+        print("Install with: pip install -r requirements_async.txt")
+        sys.exit(1)
+
+    output = open_output(args.output)
+    try:
+        stats = asyncio.run(run(args, output))
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+    if stats is None:
+        sys.exit(1)
+    print(f"Crawled {stats['pages']} pages ({stats['edges']} links, {stats['errors']} errors) "
+          f"in {stats['elapsed']}s ({stats['pages_per_second']} pages/second)", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Incremental Re-scrape
+Re-checks previously scraped articles and reports only what changed. Each
+article's content hash and per-section hashes are kept in a small SQLite
+store; pages the server reports as unmodified (304), or whose content hash
+is unchanged, are skipped, and changed articles are emitted as section diffs.
+"""
+
+import os
+import sys
+import json
+import time
+import hashlib
+import sqlite3
+import argparse
+import itertools
+import threading
+
+import requests
+
+from grokipedia_scraper import GrokipediaScraper, PARSER_BACKENDS
+from grokipedia_batch import iter_subjects, iter_completed
+from grokipedia_output import open_output
+
+DEFAULT_STORE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'grokipedia', 'articles.sqlite')
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def split_sections(article):
+    """
+    Split an article's content into (heading, text) pairs at its section
+    headings. Text before the first heading is keyed ''; repeated headings
+    get a '#2', '#3'... suffix so every key is unique.
+    """
+    headings = [section['text'].strip() for section in article.get('sections', [])]
+    sections = []
+    key, lines = '', []
+    counts = {}
+    for line in article.get('content', '').split('\n'):
+        if headings and line.strip() == headings[0]:
+            sections.append((key, '\n'.join(lines).strip()))
+            heading = headings.pop(0)
+            counts[heading] = counts.get(heading, 0) + 1
+            key = heading if counts[heading] == 1 else f"{heading}#{counts[heading]}"
+            lines = []
+        else:
+            lines.append(line)
+    sections.append((key, '\n'.join(lines).strip()))
+    return [(key, text) for key, text in sections if key or text]
+
+
+def fingerprint(article):
+    """Content hash of the whole article plus a hash per section"""
+    sections = split_sections(article)
+    return {
+        'content_hash': content_hash(article.get('title', '') + '\n' + article.get('content', '')),
+        'sections': {key: content_hash(text) for key, text in sections}
+    }, sections
+
+
+class ArticleStore:
+    """SQLite table of article fingerprints and HTTP validators, keyed by URL"""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                sections TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                checked_at REAL NOT NULL,
+                changed_at REAL NOT NULL
+            )
+        ''')
+        self.db.commit()
+
+    def get(self, url):
+        with self._lock:
+            row = self.db.execute(
+                'SELECT content_hash, sections, etag, last_modified, changed_at FROM articles WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'content_hash': row[0],
+            'sections': json.loads(row[1]),
+            'etag': row[2],
+            'last_modified': row[3],
+            'changed_at': row[4]
+        }
+
+    def put(self, url, fp, etag=None, last_modified=None):
+        """Store a new or changed article's fingerprint"""
+        now = time.time()
+        with self._lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO articles '
+                '(url, content_hash, sections, etag, last_modified, checked_at, changed_at) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?)',
+                (url, fp['content_hash'], json.dumps(fp['sections'], ensure_ascii=False),
+                 etag, last_modified, now, now)
+            )
+            self.db.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Record that an unchanged article was checked, keeping any new validators"""
+        with self._lock:
+            self.db.execute(
+                'UPDATE articles SET checked_at = ?, etag = COALESCE(?, etag), '
+                'last_modified = COALESCE(?, last_modified) WHERE url = ?',
+                (time.time(), etag, last_modified, url)
+            )
+            self.db.commit()
+
+    def close(self):
+        self.db.close()
+
+
+class IncrementalScraper:
+    """
+    Checks articles against an ArticleStore using GrokipediaScraper sessions
+    and parsers; new_scraper() is called once per thread, since a requests
+    session must not be shared between threads. check(url) returns a record
+    whose 'type' is 'unchanged', 'new', 'changed' or 'error'.
+    """
+
+    def __init__(self, new_scraper, store, timeout=10):
+        self.new_scraper = new_scraper
+        self.store = store
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {
+            'not_modified': 0,
+            'same_hash': 0,
+            'new': 0,
+            'changed': 0,
+            'errors': 0
+        }
+
+    @property
+    def scraper(self):
+        """The calling thread's scraper"""
+        if not hasattr(self._local, 'scraper'):
+            self._local.scraper = self.new_scraper()
+        return self._local.scraper
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def check(self, url):
+        stored = self.store.get(url)
+        headers = {}
+        if stored and stored['etag']:
+            headers['If-None-Match'] = stored['etag']
+        if stored and stored['last_modified']:
+            headers['If-Modified-Since'] = stored['last_modified']
+
+        try:
+            response = self.scraper.session.get(url, headers=headers, timeout=self.timeout)
+        except requests.RequestException as e:
+            self._count('errors')
+            return {'type': 'error', 'url': url, 'error': f"Network error: {str(e)}"}
+
+        if response.status_code == 304 and stored:
+            self._count('not_modified')
+            self.store.touch(url)
+            return {'type': 'unchanged', 'url': url, 'checked_by': 'not_modified'}
+        if response.status_code != 200:
+            self._count('errors')
+            return {'type': 'error', 'url': url, 'error': f"Failed to load article: {response.status_code}"}
+
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        article = self.scraper.extract_article_data(response.text, url)
+        fp, sections = fingerprint(article)
+
+        if stored and stored['content_hash'] == fp['content_hash']:
+            self._count('same_hash')
+            self.store.touch(url, etag, last_modified)
+            return {'type': 'unchanged', 'url': url, 'checked_by': 'content_hash'}
+
+        self.store.put(url, fp, etag, last_modified)
+
+        if stored is None:
+            self._count('new')
+            record = {'type': 'new', 'content_hash': fp['content_hash']}
+            record.update(article)
+            return record
+
+        self._count('changed')
+        old = stored['sections']
+        return {
+            'type': 'changed',
+            'url': url,
+            'title': article.get('title', ''),
+            'content_hash': fp['content_hash'],
+            'changed_sections': [{'section': key, 'text': text} for key, text in sections
+                                 if key in old and old[key] != fp['sections'][key]],
+            'added_sections': [{'section': key, 'text': text} for key, text in sections if key not in old],
+            'removed_sections': [key for key in old if key not in fp['sections']]
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Re-scrape Grokipedia articles, emitting only what changed')
+    parser.add_argument('urls', nargs='*', help='Article URLs to check')
+    parser.add_argument('--urls', dest='url_file', metavar='FILE',
+                       help="File with one article URL per line ('-' for stdin)")
+    parser.add_argument('--store', default=DEFAULT_STORE_PATH,
+                       help=f'Article fingerprint database (default: {DEFAULT_STORE_PATH})')
+    parser.add_argument('-o', '--output', help='JSONL output of new and changed articles (default: stdout)')
+    parser.add_argument('--include-unchanged', action='store_true',
+                       help='Also write a record for every unchanged article')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Articles to check concurrently (default: 4)')
+    parser.add_argument('--base-url', default='https://grokipedia.com/',
+                       help='Site the articles belong to (used to resolve links)')
+    parser.add_argument('--parser', choices=['auto'] + PARSER_BACKENDS, default='html.parser',
+                       help='HTML parser backend for pages without embedded data (default: html.parser)')
+
+    args = parser.parse_args()
+
+    if not args.urls and not args.url_file:
+        parser.error('give at least one URL or --urls FILE')
+    urls = itertools.chain(args.urls, iter_subjects(args.url_file) if args.url_file else ())
+
+    store = ArticleStore(args.store)
+    checker = IncrementalScraper(
+        lambda: GrokipediaScraper(base_url=args.base_url, parser=args.parser, prefer_payload=True), store)
+
+    checked = 0
+    output = open_output(args.output)
+    try:
+        # URLs are read from the file only as fast as they are checked
+        for url, future in iter_completed(checker.check, urls, workers=args.workers):
+            checked += 1
+            try:
+                record = future.result()
+            except Exception as e:
+                checker._count('errors')
+                record = {'type': 'error', 'url': url, 'error': f"Check failed: {str(e)}"}
+            if record['type'] != 'unchanged' or args.include_unchanged:
+                output.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if output is not sys.stdout:
+            output.close()
+        store.close()
+
+    stats = checker.stats
+    print(f"Checked {checked} articles: {stats['new']} new, {stats['changed']} changed, "
+          f"{stats['not_modified'] + stats['same_hash']} unchanged "
+          f"({stats['not_modified']} not modified, {stats['same_hash']} same content), "
+          f"{stats['errors']} errors", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
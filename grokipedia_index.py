@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Article Index
+A local SQLite FTS5 full-text index of scraped articles. Scrapers add
+articles as they scrape them; searches are answered from the index
+offline, in the same shape as a site search.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import threading
+
+from grokipedia_output import is_article
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'grokipedia', 'index.sqlite')
+
+
+class ArticleIndex:
+    """
+    Full-text index over article dicts as returned by scrape_article /
+    extract_article_data. Re-adding a URL replaces its entry. Matches are
+    ranked by BM25 with title and heading hits weighted above body text.
+    """
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                article TEXT NOT NULL,
+                indexed_at REAL NOT NULL
+            )
+        ''')
+        try:
+            self.db.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                    title, headings, description, content, tokenize = 'porter unicode61'
+                )
+            ''')
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"The article index needs SQLite with FTS5 support: {e}")
+        self.db.commit()
+
+    def add(self, article):
+        """Index (or re-index) one article; articles without a URL or with an error are ignored"""
+        url = article.get('url')
+        if not url or 'error' in article:
+            return False
+
+        headings = ' \n'.join(section.get('text', '') for section in article.get('sections', []))
+        description = article.get('description') or article.get('metadata', {}).get('description', '')
+        with self._lock:
+            row = self.db.execute('SELECT id FROM articles WHERE url = ?', (url,)).fetchone()
+            if row:
+                self.db.execute('DELETE FROM articles_fts WHERE rowid = ?', (row[0],))
+                self.db.execute('DELETE FROM articles WHERE id = ?', (row[0],))
+            cursor = self.db.execute(
+                'INSERT INTO articles (url, article, indexed_at) VALUES (?, ?, ?)',
+                (url, json.dumps(article, ensure_ascii=False), time.time())
+            )
+            self.db.execute(
+                'INSERT INTO articles_fts (rowid, title, headings, description, content) VALUES (?, ?, ?, ?, ?)',
+                (cursor.lastrowid, article.get('title', ''), headings, description, article.get('content', ''))
+            )
+            self.db.commit()
+        return True
+
+    def add_many(self, articles):
+        return sum(1 for article in articles if self.add(article))
+
+    def _match(self, query, limit):
+        return self.db.execute(
+            "SELECT a.url, f.title, snippet(articles_fts, 3, '', '', '...', 24) "
+            "FROM articles_fts f JOIN articles a ON a.id = f.rowid "
+            "WHERE articles_fts MATCH ? ORDER BY bm25(articles_fts, 10.0, 4.0, 2.0, 1.0) LIMIT ?",
+            (query, limit)
+        ).fetchall()
+
+    def search(self, query, limit=10):
+        """
+        Search the index, returning {'search_query', 'results': [{'title',
+        'url', 'snippet'}], 'source': 'index'}. The query may use FTS5
+        syntax; anything that doesn't parse is searched as plain words.
+        """
+        with self._lock:
+            try:
+                rows = self._match(query, limit)
+            except sqlite3.OperationalError:
+                words = re.findall(r'\w+', query)
+                rows = self._match(' '.join(f'"{word}"' for word in words), limit) if words else []
+
+        return {
+            'search_query': query,
+            'results': [{'title': title, 'url': url, 'snippet': snippet} for url, title, snippet in rows],
+            'source': 'index'
+        }
+
+    def get(self, url):
+        """The full stored article for url, or None"""
+        with self._lock:
+            row = self.db.execute('SELECT article FROM articles WHERE url = ?', (url,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_stats(self):
+        with self._lock:
+            count = self.db.execute('SELECT COUNT(*) FROM articles').fetchone()[0]
+        return {'articles': count, 'path': self.path}
+
+    def close(self):
+        self.db.close()
+
+
+def iter_articles(obj):
+    """Find every article dict inside a saved scraper result (JSON or JSONL record)"""
+    if isinstance(obj, dict):
+        if is_article(obj) and obj.get('url') and 'content' in obj and 'error' not in obj:
+            yield obj
+            return
+        for value in obj.values():
+            yield from iter_articles(value)
+    elif isinstance(obj, list):
+        for value in obj:
+            yield from iter_articles(value)
+
+
+def load_result_file(path):
+    """Yield the articles in a saved .json result or .jsonl stream"""
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    try:
+        yield from iter_articles(json.loads(text))
+    except json.JSONDecodeError:
+        for line in text.splitlines():
+            if line.strip():
+                yield from iter_articles(json.loads(line))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Search scraped Grokipedia articles offline')
+    parser.add_argument('query', nargs='?', help='Search query (FTS5 syntax allowed)')
+    parser.add_argument('--index', default=DEFAULT_INDEX_PATH,
+                       help=f'Index database (default: {DEFAULT_INDEX_PATH})')
+    parser.add_argument('--add', action='append', metavar='FILE', default=[],
+                       help='Index the articles in saved .json/.jsonl scraper output (can be repeated)')
+    parser.add_argument('-n', '--limit', type=int, default=10,
+                       help='Maximum number of results (default: 10)')
+    parser.add_argument('-f', '--format', choices=['json', 'text'], default='text',
+                       help='Output format (default: text)')
+
+    args = parser.parse_args()
+
+    if not args.query and not args.add:
+        parser.error('give a query or --add FILE')
+
+    index = ArticleIndex(args.index)
+    for path in args.add:
+        count = index.add_many(load_result_file(path))
+        print(f"Indexed {count} articles from {path}", file=sys.stderr)
+
+    if args.query:
+        started = time.perf_counter()
+        result = index.search(args.query, args.limit)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        if args.format == 'json':
+            print(json.dumps(result, indent=2, ensure_ascii=False))
+        else:
+            for i, item in enumerate(result['results'], 1):
+                print(f"{i}. {item['title']}")
+                print(f"   URL: {item['url']}")
+                print(f"   {item['snippet']}")
+                print()
+        print(f"{len(result['results'])} results from {index.get_stats()['articles']} indexed articles "
+              f"in {elapsed:.2f} ms", file=sys.stderr)
+
+    index.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Scrape Jobs
+A small job subsystem for the web app: queued scrape jobs with IDs, a fixed
+set of worker threads that share warm scraping resources, a per-job event
+log that progress streams follow, and eviction of finished jobs after a TTL.
+Identical searches share one in-flight job, and finished results are kept
+in a size-bounded LRU cache.
+"""
+
+import json
+import time
+import hashlib
+import uuid
+import queue
+import threading
+from collections import OrderedDict
+
+
+def job_key(query, options=None):
+    """Cache/coalescing key: the case- and whitespace-normalized query plus its options"""
+    normalized = ' '.join(query.lower().split())
+    return json.dumps([normalized, sorted((options or {}).items())])
+
+
+class ResultCache:
+    """
+    In-memory LRU cache of finished job results, bounded by age (ttl
+    seconds) and by the total size of the results serialized as JSON.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=600):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'evictions': 0
+        }
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[2] >= self.ttl:
+                if entry is not None:
+                    self._drop(key)
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[0]
+
+    def put(self, key, result):
+        size = len(json.dumps(result, ensure_ascii=False).encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, size, time.time())
+            self.bytes += size
+            self.stats['stores'] += 1
+            while self.bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.stats['evictions'] += 1
+
+    def _drop(self, key):
+        result, size, stored_at = self._entries.pop(key)
+        self.bytes -= size
+
+    def get_stats(self):
+        with self._lock:
+            stats = dict(self.stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self.bytes
+        return stats
+
+
+class ScrapeJob:
+    """One search request and its progress, as shown by /progress/<id>"""
+
+    def __init__(self, query, options=None):
+        self.id = uuid.uuid4().hex[:12]
+        self.query = query
+        self.options = options or {}
+        self.key = job_key(query, self.options)
+        self.cached = False
+        self.state = 'queued'
+        self.progress = f'Queued search for "{query}"...'
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+        self._digest = None
+        self.events = []
+        # event index -> lightweight data replacing a full event on finish
+        self._light = {}
+        self._changed = threading.Condition()
+
+    @property
+    def is_running(self):
+        return self.state in ('queued', 'running')
+
+    def publish(self, event, data, full=None):
+        """
+        Append an event (e.g. 'progress', 'search', 'article') to the job's
+        event log. full is the event's complete data, streamed in place of
+        data while the job runs; once it finishes the result holds the same
+        payload, so only the lightweight data is kept.
+        """
+        with self._changed:
+            self.events.append((event, data if full is None else full))
+            if full is not None:
+                self._light[len(self.events) - 1] = data
+            self._changed.notify_all()
+
+    def update(self, progress):
+        self.progress = progress
+        self.publish('progress', {'progress': progress})
+
+    def finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        # The state change and its event must appear together, or a caught-up
+        # iter_events could see the job finished and stop before the event
+        with self._changed:
+            self.state = 'failed' if error else 'done'
+            self.finished_at = time.time()
+            for index, data in self._light.items():
+                self.events[index] = (self.events[index][0], data)
+            self._light.clear()
+            self.events.append((self.state, {'state': self.state, 'error': error}))
+            self._changed.notify_all()
+
+    def digest(self):
+        """Stable hash of the result, for ETags (computed once)"""
+        if self._digest is None and self.result is not None:
+            body = json.dumps(self.result, sort_keys=True, ensure_ascii=False).encode('utf-8')
+            self._digest = hashlib.sha1(body).hexdigest()[:20]
+        return self._digest
+
+    def iter_events(self, start=0, timeout=15):
+        """
+        Yield (index, event, data) from the event log starting at index
+        `start`, blocking for new events until the job finishes. Yields None
+        whenever `timeout` seconds pass without an event, so callers can
+        send keep-alives.
+        """
+        index = start
+        while True:
+            with self._changed:
+                if index >= len(self.events):
+                    if not self.is_running:
+                        return
+                    self._changed.wait(timeout)
+                pending = self.events[index:]
+
+            if not pending:
+                yield None
+                continue
+            for event, data in pending:
+                yield index, event, data
+                index += 1
+
+    def status(self):
+        """Progress dict in the shape the web UI polls for"""
+        return {
+            'id': self.id,
+            'query': self.query,
+            'state': self.state,
+            'cached': self.cached,
+            'is_running': self.is_running,
+            'progress': self.progress,
+            'result': self.result,
+            'error': self.error
+        }
+
+
+class JobManager:
+    """
+    Runs ScrapeJobs on `workers` threads from a bounded queue. runner(job)
+    does the actual scraping and reports through job.update(); finished jobs
+    are dropped once they are older than ttl seconds. Submitting a search
+    that is already queued or running returns that job, and with a
+    ResultCache a recently finished search is answered without running.
+    """
+
+    def __init__(self, runner, workers=3, max_queue=50, ttl=1800, cache=None):
+        self.runner = runner
+        self.ttl = ttl
+        self.cache = cache
+        self.jobs = {}
+        self._inflight = {}
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._threads = []
+        for i in range(workers):
+            thread = threading.Thread(target=self._work, name=f'scrape-worker-{i}')
+            thread.daemon = True
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, query, **options):
+        """
+        Return a job for the search: an identical in-flight job, a finished
+        job served from the result cache, or a newly queued one. Raises
+        queue.Full when the queue is at capacity.
+        """
+        self.evict_expired()
+        job = ScrapeJob(query, options)
+
+        with self._lock:
+            inflight = self._inflight.get(job.key)
+            if inflight is not None:
+                return inflight
+
+            result = self.cache.get(job.key) if self.cache else None
+            if result is not None:
+                job.cached = True
+                job.finish(result=result)
+            else:
+                self._queue.put_nowait(job)
+                self._inflight[job.key] = job
+            self.jobs[job.id] = job
+        return job
+
+    def get(self, job_id):
+        self.evict_expired()
+        with self._lock:
+            return self.jobs.get(job_id)
+
+    def remove(self, job_id):
+        with self._lock:
+            return self.jobs.pop(job_id, None)
+
+    def evict_expired(self):
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            for job_id in [job_id for job_id, job in self.jobs.items()
+                           if job.finished_at and job.finished_at < cutoff]:
+                del self.jobs[job_id]
+
+    def queue_size(self):
+        return self._queue.qsize()
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            job.state = 'running'
+            try:
+                self.runner(job)
+            except Exception as e:
+                job.finish(error=f'Search failed: {str(e)}')
+            finally:
+                if job.is_running:
+                    job.finish(result=job.result)
+                # Cache before leaving the in-flight table, so an identical
+                # submit in between finds one or the other
+                if self.cache and job.state == 'done' and job.result and 'error' not in job.result:
+                    self.cache.put(job.key, job.result)
+                with self._lock:
+                    self._inflight.pop(job.key, None)
+                self._queue.task_done()
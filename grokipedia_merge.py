@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Result Merging
+Combines search hits gathered from several sources on a page (embedded
+JSON, result containers, plain links, ...) into one de-duplicated list.
+URLs are canonicalized and hashed, so merging is linear in the number of
+candidates; a hit seen from a more trusted source overrides one seen from a
+weaker source, and results keep the order in which they were first seen.
+"""
+
+from urllib.parse import urljoin, urlsplit, urlunsplit, unquote, parse_qsl, urlencode
+
+# Lower is more trusted
+SOURCE_PRIORITY = {
+    'payload': 0,
+    'json': 1,
+    'container': 2,
+    'links': 3,
+    'text': 4,
+}
+
+DEFAULT_PORTS = {'http': '80', 'https': '443'}
+
+
+def canonical_url(url, base_url=None):
+    """
+    Canonical form of a URL for de-duplication: absolute, lower-case scheme
+    and host, no default port, fragment or trailing slash, sorted query
+    parameters, and /page/ paths percent-decoded with spaces as underscores.
+    """
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = parts.netloc.lower()
+    if ':' in host and host.rsplit(':', 1)[1] == DEFAULT_PORTS.get(scheme):
+        host = host.rsplit(':', 1)[0]
+
+    path = parts.path or '/'
+    if path.startswith('/page/'):
+        path = unquote(path).replace(' ', '_')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True))) if parts.query else ''
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+class ResultMerger:
+    """
+    Collects {'title', 'url', 'snippet'} hits keyed on their canonical URL.
+    snippet may be a zero-argument callable; it is only called when the
+    snippet is actually needed, so duplicates cost no context extraction.
+    """
+
+    def __init__(self, base_url=None):
+        self.base_url = base_url
+        self._entries = {}
+        # href -> (absolute URL, canonical key); pages repeat the same hrefs a lot
+        self._keys = {}
+
+    def _resolve(self, url):
+        resolved = self._keys.get(url)
+        if resolved is None:
+            absolute = urljoin(self.base_url, url) if self.base_url else url
+            resolved = self._keys[url] = (absolute, canonical_url(absolute))
+        return resolved
+
+    def add(self, title, url, snippet='', source='links'):
+        """Add a candidate; returns True if it was a new result"""
+        url, key = self._resolve(url)
+        priority = SOURCE_PRIORITY.get(source, len(SOURCE_PRIORITY))
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._entries[key] = {
+                'title': title,
+                'url': url,
+                'snippet': snippet() if callable(snippet) else snippet,
+                'priority': priority
+            }
+            return True
+
+        if priority < entry['priority']:
+            entry['title'] = title
+            entry['url'] = url
+            entry['priority'] = priority
+        if not entry['snippet'] and snippet:
+            entry['snippet'] = snippet() if callable(snippet) else snippet
+        return False
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, url):
+        return self._resolve(url)[1] in self._entries
+
+    def results(self):
+        return [{'title': entry['title'], 'url': entry['url'], 'snippet': entry['snippet']}
+                for entry in self._entries.values()]
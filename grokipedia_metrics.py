@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Metrics
+Lightweight, process-wide instrumentation: per-stage duration histograms
+(driver startup, navigation, page wait, extraction, HTTP requests, parsing,
+serialization, ...) and counters (pages, bytes, errors, ...). Exported as
+Prometheus text for the web app's /metrics route and as a plain-text
+summary for the CLIs.
+"""
+
+import time
+import threading
+from contextlib import contextmanager
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Metrics:
+    def __init__(self, prefix='grokipedia'):
+        self.prefix = prefix
+        self.stages = {}
+        self.counters = {}
+        self.collectors = []
+        self._lock = threading.Lock()
+
+    def observe(self, stage, seconds):
+        """Record one duration for a stage"""
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = {
+                    'count': 0,
+                    'sum': 0.0,
+                    'max': 0.0,
+                    'buckets': [0] * len(DURATION_BUCKETS)
+                }
+            entry['count'] += 1
+            entry['sum'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            for i, bound in enumerate(DURATION_BUCKETS):
+                if seconds <= bound:
+                    entry['buckets'][i] += 1
+
+    @contextmanager
+    def timer(self, stage):
+        """Time the enclosed block as one observation of stage (also when it raises)"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started)
+
+    def incr(self, counter, amount=1):
+        with self._lock:
+            self.counters[counter] = self.counters.get(counter, 0) + amount
+
+    def register_collector(self, collect, prefix):
+        """
+        Add a callable returning a stats dict (e.g. PageCache.get_stats) whose
+        numeric values are exported as gauges named <prefix>_<key>
+        """
+        self.collectors.append((prefix, collect))
+
+    def _gauges(self):
+        gauges = {}
+        for prefix, collect in self.collectors:
+            for name, value in collect().items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    gauges[f"{prefix}_{name}"] = value
+        return gauges
+
+    def snapshot(self):
+        with self._lock:
+            stages = {stage: dict(entry, buckets=list(entry['buckets'])) for stage, entry in self.stages.items()}
+            counters = dict(self.counters)
+        return {'stages': stages, 'counters': counters, 'gauges': self._gauges()}
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        p = self.prefix
+        lines = [
+            f'# HELP {p}_stage_seconds Time spent per scraping stage',
+            f'# TYPE {p}_stage_seconds histogram'
+        ]
+        for stage, entry in sorted(snapshot['stages'].items()):
+            for bound, count in zip(DURATION_BUCKETS, entry['buckets']):
+                lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'{p}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {entry["count"]}')
+            lines.append(f'{p}_stage_seconds_sum{{stage="{stage}"}} {entry["sum"]:.6f}')
+            lines.append(f'{p}_stage_seconds_count{{stage="{stage}"}} {entry["count"]}')
+
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f'# TYPE {p}_{name}_total counter')
+            lines.append(f'{p}_{name}_total {value}')
+
+        for name, value in sorted(snapshot['gauges'].items()):
+            lines.append(f'# TYPE {p}_{name} gauge')
+            lines.append(f'{p}_{name} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self):
+        """Human-readable per-stage timing table plus counters, for CLI output"""
+        snapshot = self.snapshot()
+        lines = [f"{'stage':<20} {'count':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9}"]
+        for stage, entry in sorted(snapshot['stages'].items(), key=lambda item: -item[1]['sum']):
+            mean = entry['sum'] / entry['count'] * 1000 if entry['count'] else 0.0
+            lines.append(f"{stage:<20} {entry['count']:>7} {entry['sum']:>9.3f} {mean:>9.1f} {entry['max'] * 1000:>9.1f}")
+        counters = dict(snapshot['counters'], **snapshot['gauges'])
+        if counters:
+            lines.append(', '.join(f"{name}={value}" for name, value in sorted(counters.items())))
+        return '\n'.join(lines)
+
+    def reset(self):
+        with self._lock:
+            self.stages.clear()
+            self.counters.clear()
+
+
+# Shared by every scraper in the process
+METRICS = Metrics()
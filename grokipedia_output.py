@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Streaming Output
+Writers that emit search results and articles as soon as they are scraped,
+one JSON line (or one text block) at a time, optionally compressed, and
+generators that render a finished result chunk by chunk for downloads.
+"""
+
+import io
+import sys
+import csv
+import gzip
+import json
+import zlib
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+COMPRESSION_SUFFIXES = {
+    '.gz': 'gzip',
+    '.zst': 'zstd',
+}
+
+
+def open_output(path=None, compression=None, append=False):
+    """
+    Open a text stream for output. None means stdout. Compression is taken
+    from the argument or else from the file suffix (.gz / .zst); appending
+    to a compressed file adds a new gzip member / zstd frame.
+    """
+    if path is None:
+        return sys.stdout
+
+    if compression is None:
+        for suffix, name in COMPRESSION_SUFFIXES.items():
+            if path.endswith(suffix):
+                compression = name
+
+    mode = 'at' if append else 'wt'
+    if compression == 'gzip':
+        return gzip.open(path, mode, encoding='utf-8')
+    if compression == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("zstd output requires the zstandard package. Install with: pip install zstandard")
+        return zstandard.open(path, mode, encoding='utf-8')
+    return open(path, mode[0], encoding='utf-8')
+
+
+def is_article(result):
+    """True if a scraper result is a single article rather than a search"""
+    return 'title' in result and 'results' not in result
+
+
+class JsonlStreamWriter:
+    """
+    Writes one JSON object per line, tagged with a 'type':
+    'search' (summary), 'result' (one search hit), 'article' or 'error'.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def _write(self, record):
+        self.stream.write(json.dumps(record, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def search(self, subject, search_result):
+        for record in search_records(subject, search_result):
+            self._write(record)
+
+    def article(self, article, subject=None):
+        self._write(article_record(article, subject))
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def article_record(article, subject=None):
+    record = {'type': 'article', 'search_query': subject}
+    record.update(article)
+    return record
+
+
+def search_records(subject, search_result):
+    """The typed JSONL records for one search result (or error / direct article)"""
+    if 'error' in search_result:
+        yield {'type': 'error', 'search_query': subject, 'error': search_result['error']}
+        return
+    if is_article(search_result):
+        yield article_record(search_result, subject)
+        return
+
+    summary = {key: value for key, value in search_result.items() if key != 'results'}
+    summary.update({'type': 'search', 'search_query': subject,
+                    'result_count': len(search_result.get('results', []))})
+    yield summary
+    for rank, item in enumerate(search_result.get('results', []), 1):
+        yield dict(item, type='result', search_query=subject, rank=rank)
+
+
+def result_records(result):
+    """
+    Typed records for a finished result: either a bare search result or a
+    {'search_query', 'search_results', 'articles'} bundle.
+    """
+    subject = result.get('search_query')
+    if 'search_results' in result:
+        yield from search_records(subject, result['search_results'])
+        for article in result.get('articles', []):
+            yield article_record(article, subject)
+    else:
+        yield from search_records(subject, result)
+
+
+def iter_json(result):
+    """The result as indented JSON, in chunks"""
+    return json.JSONEncoder(indent=2, ensure_ascii=False).iterencode(result)
+
+
+def iter_jsonl(result):
+    for record in result_records(result):
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+CSV_FIELDS = ['type', 'search_query', 'rank', 'title', 'url', 'snippet', 'description', 'content_length', 'error']
+
+
+def iter_csv(result):
+    """One CSV row per search hit, article or error, with a header row"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=CSV_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    for record in result_records(result):
+        if record['type'] == 'article':
+            record = dict(record, content_length=len(record.get('content', '')))
+        writer.writerow(record)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+def iter_gzip(chunks):
+    """Gzip a stream of text chunks incrementally"""
+    compressor = zlib.compressobj(wbits=31)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode('utf-8'))
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+DOWNLOAD_FORMATS = {
+    'json': (iter_json, 'application/json', '.json'),
+    'jsonl': (iter_jsonl, 'application/x-ndjson', '.jsonl'),
+    'csv': (iter_csv, 'text/csv', '.csv'),
+}
+
+
+class TextStreamWriter:
+    """The CLIs' human-readable text format, written incrementally"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.articles = 0
+
+    def _write(self, text):
+        self.stream.write(text)
+        self.stream.flush()
+
+    def search(self, subject, search_result):
+        output = f"Subject: {subject}\n"
+        output += "=" * 50 + "\n"
+
+        if 'error' in search_result:
+            output += f"Error: {search_result['error']}\n"
+        elif is_article(search_result):
+            output += self._format_page(search_result)
+        else:
+            results = search_result.get('results', [])
+            output += f"Search Results found: {len(results)}\n\n"
+            for i, res in enumerate(results, 1):
+                output += f"{i}. {res['title']}\n"
+                output += f"   URL: {res['url']}\n"
+                if res.get('snippet'):
+                    output += f"   Snippet: {res['snippet']}\n"
+                output += "\n"
+
+        self._write(output)
+
+    def _format_page(self, result):
+        output = f"Title: {result['title']}\n"
+        output += f"URL: {result['url']}\n\n"
+        content = result.get('content', '')
+        output += f"Content:\n{content[:1000]}{'...' if len(content) > 1000 else ''}\n\n"
+
+        if result.get('sections'):
+            output += "Sections:\n"
+            for section in result['sections']:
+                output += f"  {'#' * section['level']} {section['text']}\n"
+            output += "\n"
+
+        if result.get('links'):
+            output += "Links:\n"
+            for link in result['links'][:10]:  # Limit to first 10 links
+                output += f"  {link['text']}: {link['url']}\n"
+        return output
+
+    def article(self, article, subject=None):
+        output = ""
+        if not self.articles:
+            output += "\n" + "=" * 50 + "\n"
+            output += "SCRAPED ARTICLES:\n"
+            output += "=" * 50 + "\n\n"
+        self.articles += 1
+
+        output += f"ARTICLE {self.articles}: {article.get('title', 'Unknown')}\n"
+        output += f"URL: {article.get('url', '')}\n"
+        if article.get('description'):
+            output += f"Description: {article.get('description', '')}\n"
+        if article.get('author'):
+            output += f"Author: {article.get('author', '')}\n"
+        output += f"Content Length: {len(article.get('content', ''))} characters\n"
+        output += f"Sections: {len(article.get('sections', []))}\n"
+        output += f"References: {len(article.get('references', []))}\n"
+        output += "-" * 30 + "\n\n"
+        self._write(output)
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+def stream_writer(output_format, path=None, compression=None):
+    """Create the streaming writer for a CLI -f/--format choice"""
+    stream = open_output(path, compression)
+    if output_format == 'text':
+        return TextStreamWriter(stream)
+    return JsonlStreamWriter(stream)
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Hydration Payload Extractor
+Pulls article and search data straight out of the Next.js data embedded in
+a page (React flight chunks pushed via self.__next_f, or __NEXT_DATA__),
+so a plain HTTP fetch can stand in for the browser for most pages.
+"""
+
+import re
+import json
+import sys
+import argparse
+from urllib.parse import urljoin
+
+# <script>self.__next_f.push([1,"..."])</script> chunks, in document order
+FLIGHT_PUSH_RE = re.compile(r'self\.__next_f\.push\((\[.*?\])\)</script>', re.S)
+NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>', re.S)
+
+# Markdown constructs used in article bodies
+MD_LINK_RE = re.compile(r'\[([^\]]*)\]\(((?:\\.|[^)\s\\])+)(?:\s+"(?:\\.|[^"\\])*")?\)')
+MD_HEADING_RE = re.compile(r'^(#{1,6})\s+(.+?)\s*#*$', re.M)
+MD_CITATION_RE = re.compile(r'\[(\d+)\](?!\()')
+MD_EMPHASIS_RE = re.compile(r'(\*\*|__|\*|_)(?=\S)(.+?)(?<=\S)\1')
+MD_ESCAPE_RE = re.compile(r'\\([\\`*_{}\[\]()#+\-.!"])')
+
+
+class FlightPayloadParser:
+    """
+    Incremental parser for the React Server Components ("flight") stream.
+    Chunks are fed as they are found in the page and complete rows are
+    decoded immediately; text rows (ID:T<hex byte length>,<text>) are
+    kept as strings and other JSON rows as Python objects.
+    """
+
+    def __init__(self):
+        self.rows = {}
+        self._buffer = b''
+        self._pos = 0
+
+    def feed(self, chunk):
+        """Add a chunk of the stream and decode every row it completes; returns the new rows' IDs"""
+        self._buffer = self._buffer[self._pos:] + chunk.encode('utf-8')
+        self._pos = 0
+        new_rows = []
+        self._drain(new_rows)
+        return new_rows
+
+    def _drain(self, new_rows):
+        buf = self._buffer
+        while True:
+            colon = buf.find(b':', self._pos)
+            if colon < 0:
+                return
+            row_id = buf[self._pos:colon].decode('ascii', errors='replace')
+
+            if buf[colon + 1:colon + 2] == b'T':
+                comma = buf.find(b',', colon)
+                if comma < 0:
+                    return
+                try:
+                    length = int(buf[colon + 2:comma], 16)
+                except ValueError:
+                    length = None
+                if length is not None:
+                    end = comma + 1 + length
+                    if len(buf) < end:
+                        return
+                    self.rows[row_id] = buf[comma + 1:end].decode('utf-8', errors='replace')
+                    new_rows.append(row_id)
+                    self._pos = end
+                    continue
+
+            newline = buf.find(b'\n', colon)
+            if newline < 0:
+                return
+            if self._store(row_id, buf[colon + 1:newline].decode('utf-8', errors='replace')):
+                new_rows.append(row_id)
+            self._pos = newline + 1
+
+    def _store(self, row_id, payload):
+        # Only plain JSON rows carry data; I[...] imports and HL[...] hints are skipped
+        if not row_id or not payload or payload[0] not in '[{"':
+            return False
+        try:
+            self.rows[row_id] = json.loads(payload)
+        except json.JSONDecodeError:
+            return False
+        return True
+
+    def resolve(self, value):
+        """Resolve a "$<row id>" reference to the row it points at"""
+        if isinstance(value, str) and value.startswith('$') and value[1:] in self.rows:
+            return self.rows[value[1:]]
+        return value
+
+
+def iter_flight_chunks(html_content):
+    """Yield flight stream chunks from the page without building a DOM"""
+    for match in FLIGHT_PUSH_RE.finditer(html_content):
+        try:
+            push = json.loads(match.group(1))
+        except json.JSONDecodeError:
+            continue
+        if len(push) > 1 and isinstance(push[1], str):
+            yield push[1]
+
+
+def find_page_object(obj):
+    """
+    Find the article record (a dict with slug, title and content) in a
+    decoded payload
+    """
+    if isinstance(obj, dict):
+        if 'slug' in obj and 'title' in obj and 'content' in obj:
+            return obj
+        values = obj.values()
+    elif isinstance(obj, list):
+        values = obj
+    else:
+        return None
+
+    for value in values:
+        found = find_page_object(value)
+        if found is not None:
+            return found
+    return None
+
+
+def find_search_items(obj, items=None):
+    """
+    Collect search hits (dicts with a title and a page slug) from a
+    decoded payload. Citations carry a title and url but no slug, so they
+    are not mistaken for hits.
+    """
+    if items is None:
+        items = []
+    if isinstance(obj, list):
+        for value in obj:
+            if isinstance(value, dict) and value.get('title') and value.get('slug'):
+                if 'content' not in value:
+                    items.append(value)
+                    continue
+            find_search_items(value, items)
+    elif isinstance(obj, dict):
+        for value in obj.values():
+            find_search_items(value, items)
+    return items
+
+
+def extract_payload(html_content):
+    """
+    Decode the page's hydration data. Returns (page record or None, parser).
+    Parsing stops as soon as the article record and its content are complete.
+    """
+    parser = FlightPayloadParser()
+    page = None
+
+    for chunk in iter_flight_chunks(html_content):
+        new_rows = parser.feed(chunk)
+        if page is None:
+            # Rows from earlier chunks were already searched
+            for row_id in new_rows:
+                row = parser.rows[row_id]
+                if not isinstance(row, str):
+                    page = find_page_object(row)
+                    if page is not None:
+                        break
+        if payload_is_complete(page, parser):
+            break
+
+    if page is None:
+        match = NEXT_DATA_RE.search(html_content)
+        if match:
+            try:
+                next_data = json.loads(match.group(1))
+                parser.rows['__NEXT_DATA__'] = next_data
+                page = find_page_object(next_data)
+            except json.JSONDecodeError:
+                pass
+
+    return page, parser
+
+
+def payload_is_complete(page, parser):
+    """True when the record has a title and fully resolved article text"""
+    if not page or not page.get('title'):
+        return False
+    content = parser.resolve(page.get('content'))
+    return isinstance(content, str) and bool(content) and not content.startswith('$')
+
+
+def markdown_to_text(markdown):
+    """Strip the markdown used in article bodies down to plain text"""
+    text = MD_LINK_RE.sub(r'\1', markdown)
+    text = MD_HEADING_RE.sub(r'\2', text)
+    text = MD_EMPHASIS_RE.sub(r'\2', text)
+    return MD_ESCAPE_RE.sub(r'\1', text)
+
+
+def _page_url(target, base_url):
+    target = MD_ESCAPE_RE.sub(r'\1', target)
+    if target.startswith(('http://', 'https://', '#', 'javascript:')):
+        return target
+    return urljoin(base_url, f"page/{target}")
+
+
+def article_from_payload(page, parser, url, base_url="https://grokipedia.com/"):
+    """
+    Build an article dict in the shape produced by
+    GrokipediaScraper.extract_article_data
+    """
+    markdown = parser.resolve(page.get('content')) or ''
+
+    data = {
+        'url': url,
+        'title': page.get('title', ''),
+        'content': markdown_to_text(markdown).strip(),
+        'sections': [],
+        'links': [],
+        'metadata': {}
+    }
+
+    for hashes, text in MD_HEADING_RE.findall(markdown):
+        data['sections'].append({'level': len(hashes), 'text': markdown_to_text(text)})
+
+    for text, target in MD_LINK_RE.findall(markdown):
+        data['links'].append({'text': markdown_to_text(text).strip(), 'url': _page_url(target, base_url)})
+
+    description = page.get('description') or ''
+    # The payload description repeats the title as its first line
+    if data['title'] and description.startswith(data['title'] + '\n'):
+        description = description[len(data['title']):].strip()
+    if description:
+        data['metadata']['description'] = description
+    for key, value in (page.get('metadata') or {}).items():
+        if isinstance(value, (str, int, float, bool)):
+            data['metadata'][key] = value
+
+    return data
+
+
+def browser_article_from_payload(page, parser, url, base_url="https://grokipedia.com/"):
+    """
+    Build an article dict in the shape produced by
+    GrokipediaBrowserScraper.scrape_article
+    """
+    markdown = parser.resolve(page.get('content')) or ''
+    article = article_from_payload(page, parser, url, base_url)
+
+    sections = []
+    for section in article['sections']:
+        section_id = re.sub(r'[^a-z0-9]+', '-', section['text'].lower()).strip('-')
+        sections.append({'level': section['level'], 'text': section['text'], 'id': section_id})
+
+    return {
+        'url': url,
+        'title': article['title'],
+        'description': article['metadata'].get('description', ''),
+        'author': '',
+        'content': article['content'],
+        'sections': sections,
+        'table_of_contents': [{'text': s['text'], 'section_id': s['id']} for s in sections],
+        'references': [f"[{n}]" for n in MD_CITATION_RE.findall(markdown)]
+    }
+
+
+def search_results_from_payload(parser, subject, base_url="https://grokipedia.com/"):
+    """
+    Search hits found anywhere in the decoded payload, in the shape of
+    GrokipediaScraper.extract_search_results' 'results' list
+    """
+    results = []
+    seen = set()
+    for row in parser.rows.values():
+        if isinstance(row, str):
+            continue
+        for item in find_search_items(row):
+            url = _page_url(item['slug'], base_url)
+            if url in seen:
+                continue
+            seen.add(url)
+            results.append({
+                'title': item['title'],
+                'url': url,
+                'snippet': item.get('snippet', item.get('description', ''))
+            })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Extract article data from a saved Grokipedia page')
+    parser.add_argument('page', help='Saved HTML page (e.g. grokpage.txt)')
+    parser.add_argument('--url', default='', help='URL the page was fetched from')
+
+    args = parser.parse_args()
+
+    with open(args.page, encoding='utf-8') as f:
+        html_content = f.read()
+
+    page, flight = extract_payload(html_content)
+    if not payload_is_complete(page, flight):
+        print("No complete article payload found in page")
+        sys.exit(1)
+
+    print(json.dumps(article_from_payload(page, flight, args.url), indent=2, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
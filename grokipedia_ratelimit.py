@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Rate Limiting
+A per-host token bucket (requests/second with a burst allowance) and an
+AIMD concurrency controller that halves the number of requests in flight
+when the site throttles or fails (429, 5xx, timeouts) and grows it by one
+per window of healthy responses. RateLimiter combines the two per host and
+plugs into a requests.Session, the async scraper and browser page loads.
+"""
+
+import time
+import asyncio
+import threading
+from contextlib import contextmanager, asynccontextmanager
+from urllib.parse import urlparse
+
+from requests.adapters import HTTPAdapter
+
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+
+
+class TokenBucket:
+    """Allows `rate` requests per second on average and bursts of up to `burst`"""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Take a token, returning how many seconds the caller must wait before using it"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(wait, self.paused_until - now)
+
+    def pause(self, seconds):
+        """Hold every request for `seconds` (e.g. a 429's Retry-After)"""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def acquire(self):
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class AIMDController:
+    """
+    Adaptive concurrency limit. Failures multiply the limit by `decrease`
+    (at most once per `cooldown` seconds, so one burst of errors counts
+    once); every `limit` successes with latency under `latency_factor` times
+    the best seen add one, up to `maximum`.
+    """
+
+    def __init__(self, initial=4, minimum=1, maximum=32, decrease=0.5, latency_factor=3.0, cooldown=1.0):
+        self.limit = float(initial)
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.in_flight = 0
+        self.best_latency = None
+        self.last_decrease = 0.0
+        self._changed = threading.Condition()
+        self.stats = {
+            'increases': 0,
+            'decreases': 0,
+            'throttled': 0
+        }
+
+    def try_acquire(self):
+        with self._changed:
+            if self.in_flight < int(self.limit):
+                self.in_flight += 1
+                return True
+            return False
+
+    def acquire(self):
+        with self._changed:
+            while self.in_flight >= int(self.limit):
+                self._changed.wait()
+            self.in_flight += 1
+
+    async def acquire_async(self):
+        while not self.try_acquire():
+            await asyncio.sleep(0.01)
+
+    def release(self, failed=False, latency=None):
+        with self._changed:
+            self.in_flight -= 1
+            now = time.monotonic()
+            if failed:
+                self.stats['throttled'] += 1
+                if now - self.last_decrease >= self.cooldown:
+                    self.limit = max(self.minimum, self.limit * self.decrease)
+                    self.last_decrease = now
+                    self.stats['decreases'] += 1
+            elif latency is not None:
+                if self.best_latency is None or latency < self.best_latency:
+                    self.best_latency = latency
+                if latency <= self.best_latency * self.latency_factor and self.limit < self.maximum:
+                    before = int(self.limit)
+                    self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+                    if int(self.limit) > before:
+                        self.stats['increases'] += 1
+            self._changed.notify_all()
+
+
+class RateLimiter:
+    """
+    Per-host TokenBucket and/or AIMDController. Either part can be turned
+    off: rate=None disables the bucket, adaptive=False the controller.
+    """
+
+    def __init__(self, rate=None, burst=None, adaptive=True, initial_concurrency=4, max_concurrency=32):
+        self.rate = rate
+        self.burst = burst
+        self.adaptive = adaptive
+        self.initial_concurrency = initial_concurrency
+        self.max_concurrency = max_concurrency
+        self.buckets = {}
+        self.controllers = {}
+        self._lock = threading.Lock()
+        self.stats = {
+            'requests': 0,
+            'failures': 0,
+            'waited': 0.0
+        }
+
+    def _for_host(self, url):
+        host = urlparse(url).netloc
+        with self._lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(self.rate, self.burst) if self.rate else None
+                self.controllers[host] = AIMDController(
+                    initial=min(self.initial_concurrency, self.max_concurrency),
+                    maximum=self.max_concurrency
+                ) if self.adaptive else None
+            return self.buckets[host], self.controllers[host]
+
+    def _finish(self, bucket, controller, started, status, retry_after=None):
+        failed = status is None or status in THROTTLE_STATUSES
+        with self._lock:
+            self.stats['requests'] += 1
+            if failed:
+                self.stats['failures'] += 1
+        if bucket and status == 429 and retry_after:
+            try:
+                bucket.pause(float(retry_after))
+            except ValueError:
+                pass
+        if controller:
+            controller.release(failed, time.monotonic() - started)
+
+    def _waited(self, seconds):
+        with self._lock:
+            self.stats['waited'] += seconds
+
+    @contextmanager
+    def limit(self, url):
+        """
+        Hold a rate/concurrency slot for one request to url. Set the
+        yielded dict's 'status' (and 'retry_after') from the response; a
+        request that raises or leaves status unset counts as a failure.
+        """
+        bucket, controller = self._for_host(url)
+        if controller:
+            controller.acquire()
+        if bucket:
+            self._waited(bucket.acquire())
+        outcome = {'status': None, 'retry_after': None}
+        started = time.monotonic()
+        try:
+            yield outcome
+        finally:
+            self._finish(bucket, controller, started, outcome['status'], outcome['retry_after'])
+
+    @asynccontextmanager
+    async def limit_async(self, url):
+        """Async version of limit(), waiting without blocking the event loop"""
+        bucket, controller = self._for_host(url)
+        if controller:
+            await controller.acquire_async()
+        if bucket:
+            wait = bucket.reserve()
+            self._waited(wait)
+            if wait > 0:
+                await asyncio.sleep(wait)
+        outcome = {'status': None, 'retry_after': None}
+        started = time.monotonic()
+        try:
+            yield outcome
+        finally:
+            self._finish(bucket, controller, started, outcome['status'], outcome['retry_after'])
+
+    def get_stats(self):
+        """Request/failure counts, time spent waiting and each host's current concurrency limit"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats['waited'] = round(stats['waited'], 3)
+            stats['hosts'] = {
+                host: {
+                    'concurrency_limit': int(controller.limit),
+                    'decreases': controller.stats['decreases'],
+                    'increases': controller.stats['increases']
+                }
+                for host, controller in self.controllers.items() if controller
+            }
+        return stats
+
+
+@asynccontextmanager
+async def unlimited(url=None):
+    """Stand-in for RateLimiter.limit_async when no limiter is configured"""
+    yield {'status': None, 'retry_after': None}
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """requests transport adapter that sends every request through a RateLimiter"""
+
+    def __init__(self, limiter, **kwargs):
+        self.limiter = limiter
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        with self.limiter.limit(request.url) as outcome:
+            response = super().send(request, **kwargs)
+            outcome['status'] = response.status_code
+            outcome['retry_after'] = response.headers.get('Retry-After')
+            return response
+
+
+def limit_session(session, limiter):
+    """Route all of a requests.Session's HTTP(S) traffic through limiter"""
+    adapter = RateLimitedAdapter(limiter)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Record/Replay
+Record mode stores the HTTP responses (and rendered browser pages) a
+scraper receives in an SQLite archive. Replay mode serves that archive from
+a local stub server with injected latency, errors and bandwidth limits, so
+concurrency, caching and rate limiting can be load-tested offline and
+repeatably: point any scraper's --base-url (or GROKIPEDIA_BASE_URL for the
+web app) at the stub.
+"""
+
+import os
+import sys
+import json
+import time
+import zlib
+import random
+import sqlite3
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, unquote, parse_qsl, urlencode
+
+DEFAULT_ARCHIVE_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'grokipedia', 'replay.sqlite')
+
+# Response headers worth replaying; the body is stored decoded, so no
+# Content-Encoding, Content-Length or Transfer-Encoding
+REPLAY_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Cache-Control', 'Location')
+
+STATS_PATH = '/_replay/stats'
+
+
+def _body_digest(body):
+    """Short digest of a request body, order-insensitive for form data"""
+    if not body:
+        return ''
+    if isinstance(body, dict):
+        pairs = [(str(key), str(value)) for key, value in body.items()]
+    else:
+        if isinstance(body, bytes):
+            body = body.decode('utf-8', errors='replace')
+        pairs = parse_qsl(body, keep_blank_values=True)
+    canonical = urlencode(sorted(pairs)) if pairs else body
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:16]
+
+
+def archive_key(method, url, body=None):
+    """
+    Host-independent key of a request: method, decoded path, sorted query
+    and, for requests with a body, its digest. Recordings of
+    https://grokipedia.com/ therefore replay under any stub base URL.
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    key = f"{method.upper()} {unquote(parts.path) or '/'}"
+    if query:
+        key += f"?{query}"
+    digest = _body_digest(body) if method.upper() != 'GET' else ''
+    if digest:
+        key += f" #{digest}"
+    return key
+
+
+class ReplayArchive:
+    """Recorded responses keyed by archive_key, bodies zlib-compressed"""
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.stats = {
+            'recorded': 0,
+            'hits': 0,
+            'misses': 0
+        }
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('''
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                recorded_at REAL NOT NULL
+            )
+        ''')
+        self.db.commit()
+
+    def put(self, method, url, status, headers, body, request_body=None):
+        """
+        Record a response. HEAD requests and 304s carry no body and would
+        overwrite the recorded page; throttling and server errors (429, 5xx)
+        are skipped too, since the replay server injects those on purpose.
+        """
+        if method.upper() == 'HEAD' or status == 304 or status == 429 or status >= 500:
+            return False
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        kept = {name: headers[name] for name in REPLAY_HEADERS if headers.get(name)}
+        with self._lock:
+            self.db.execute(
+                'INSERT OR REPLACE INTO responses (key, url, status, headers, body, recorded_at) '
+                'VALUES (?, ?, ?, ?, ?, ?)',
+                (archive_key(method, url, request_body), url, status, json.dumps(kept),
+                 zlib.compress(body), time.time())
+            )
+            self.db.commit()
+            self.stats['recorded'] += 1
+        return True
+
+    def put_page(self, url, html):
+        """Record a page as rendered by the browser"""
+        return self.put('GET', url, 200, {'Content-Type': 'text/html; charset=utf-8'}, html)
+
+    def record_response(self, response, *args, **kwargs):
+        """requests response hook: session.hooks['response'].append(archive.record_response)"""
+        request = response.request
+        self.put(request.method, response.url, response.status_code, response.headers,
+                 response.content, request.body)
+        return response
+
+    def get(self, method, url, request_body=None):
+        """The recorded response as a dict with 'status', 'headers' and 'body' (bytes), or None"""
+        with self._lock:
+            row = self.db.execute(
+                'SELECT url, status, headers, body FROM responses WHERE key = ?',
+                (archive_key(method, url, request_body),)
+            ).fetchone()
+            self.stats['hits' if row else 'misses'] += 1
+        if row is None:
+            return None
+        return {
+            'url': row[0],
+            'status': row[1],
+            'headers': json.loads(row[2]),
+            'body': zlib.decompress(row[3])
+        }
+
+    def entries(self):
+        """(key, url, status, compressed size) of every recording"""
+        with self._lock:
+            return self.db.execute(
+                'SELECT key, url, status, LENGTH(body) FROM responses ORDER BY key'
+            ).fetchall()
+
+    def get_stats(self):
+        with self._lock:
+            entries, total = self.db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM responses'
+            ).fetchone()
+            stats = dict(self.stats)
+        stats['entries'] = entries
+        stats['bytes'] = total
+        return stats
+
+    def close(self):
+        self.db.close()
+
+
+class FaultInjector:
+    """
+    Per-response latency (fixed plus uniform jitter), a share of injected
+    error statuses and a bandwidth cap in bytes/second. Seeded, so the same
+    sequence of requests meets the same faults on every run.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, error_rate=0.0, error_status=503, bandwidth=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.bandwidth = bandwidth
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def plan(self):
+        """(delay before responding, injected status or None) for the next response"""
+        with self._lock:
+            delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+            failed = self.error_rate and self._random.random() < self.error_rate
+        return delay, self.error_status if failed else None
+
+    def transfer_time(self, size):
+        return size / self.bandwidth if self.bandwidth else 0.0
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self._replay('GET')
+
+    def do_HEAD(self):
+        self._replay('HEAD')
+
+    def do_POST(self):
+        self._replay('POST')
+
+    def _replay(self, method):
+        server = self.server
+        length = int(self.headers.get('Content-Length') or 0)
+        request_body = self.rfile.read(length) if length else b''
+        if self.path == STATS_PATH:
+            self._send(200, {'Content-Type': 'application/json'}, json.dumps(server.get_stats()).encode('utf-8'))
+            return
+
+        server.started()
+        try:
+            delay, error = server.faults.plan()
+            if delay:
+                time.sleep(delay)
+            if error:
+                server.count('injected_errors')
+                self._send(error, {'Retry-After': '1'} if error == 429 else {}, b'')
+                return
+
+            entry = server.archive.get('GET' if method == 'HEAD' else method, self.path, request_body)
+            if entry is None:
+                server.count('misses')
+                self._send(404, {'Content-Type': 'text/plain'}, b'Not in replay archive\n')
+                return
+
+            etag = entry['headers'].get('ETag')
+            if etag and self.headers.get('If-None-Match') == etag:
+                server.count('not_modified')
+                self._send(304, {'ETag': etag}, b'')
+                return
+
+            server.count('served')
+            self._send(entry['status'], entry['headers'], b'' if method == 'HEAD' else entry['body'],
+                       length=len(entry['body']))
+        finally:
+            server.finished()
+
+    def _send(self, status, headers, body, length=None):
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body) if length is None else length))
+        self.end_headers()
+        if body:
+            self._write(body)
+
+    def _write(self, body, chunk_size=16384):
+        """Write the body, paced to the configured bandwidth"""
+        faults = self.server.faults
+        for start in range(0, len(body), chunk_size):
+            chunk = body[start:start + chunk_size]
+            self.wfile.write(chunk)
+            pause = faults.transfer_time(len(chunk))
+            if pause:
+                time.sleep(pause)
+        self.server.count('bytes', len(body))
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Stub site serving a ReplayArchive through a FaultInjector"""
+
+    daemon_threads = True
+
+    def __init__(self, archive, faults=None, host='127.0.0.1', port=8700, verbose=False):
+        super().__init__((host, port), ReplayHandler)
+        self.archive = archive
+        self.faults = faults or FaultInjector()
+        self.verbose = verbose
+        self._thread = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.stats = {
+            'requests': 0,
+            'served': 0,
+            'misses': 0,
+            'not_modified': 0,
+            'injected_errors': 0,
+            'bytes': 0,
+            'max_in_flight': 0
+        }
+
+    @property
+    def base_url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.stats[name] += amount
+
+    def started(self):
+        with self._lock:
+            self.stats['requests'] += 1
+            self.in_flight += 1
+            self.stats['max_in_flight'] = max(self.stats['max_in_flight'], self.in_flight)
+
+    def finished(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def get_stats(self):
+        with self._lock:
+            return dict(self.stats, in_flight=self.in_flight)
+
+    def start(self):
+        """Serve from a background thread; returns the stub's base URL"""
+        self._thread = threading.Thread(target=self.serve_forever, name='replay-server', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve recorded Grokipedia responses from a local stub with injected faults')
+    parser.add_argument('--archive', default=DEFAULT_ARCHIVE_PATH,
+                       help=f'Replay archive written by a scraper\'s --record (default: {DEFAULT_ARCHIVE_PATH})')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8700, help='Port to listen on (default: 8700)')
+    parser.add_argument('--latency', type=float, default=0.0,
+                       help='Seconds to wait before each response (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0,
+                       help='Extra random latency of up to this many seconds (default: 0)')
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                       help='Fraction of requests answered with --error-status (default: 0)')
+    parser.add_argument('--error-status', type=int, default=503,
+                       help='Status code of injected errors, e.g. 429 or 503 (default: 503)')
+    parser.add_argument('--bandwidth', type=float,
+                       help='Bytes per second per response (default: unlimited)')
+    parser.add_argument('--seed', type=int, help='Random seed for repeatable latency and errors')
+    parser.add_argument('--add', nargs=2, action='append', metavar=('URL', 'FILE'),
+                       help='Record FILE as the page at URL before serving (repeatable)')
+    parser.add_argument('--list', action='store_true', help='List the recorded responses and exit')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Log every request')
+
+    args = parser.parse_args()
+
+    archive = ReplayArchive(args.archive)
+    for url, path in args.add or []:
+        with open(path, encoding='utf-8') as f:
+            archive.put_page(url, f.read())
+        print(f"Recorded {path} as {url}")
+
+    if args.list:
+        for key, url, status, size in archive.entries():
+            print(f"{status} {size:>9} {key}")
+        stats = archive.get_stats()
+        print(f"{args.archive}: {stats['entries']} responses, {stats['bytes']} bytes")
+        archive.close()
+        return
+
+    faults = FaultInjector(latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                           error_status=args.error_status, bandwidth=args.bandwidth, seed=args.seed)
+    server = ReplayServer(archive, faults, args.host, args.port, args.verbose)
+    print(f"Replaying {archive.get_stats()['entries']} responses from {args.archive} at {server.base_url}")
+    print(f"Stats: {server.base_url.rstrip('/')}{STATS_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.get_stats()), file=sys.stderr)
+        archive.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Retries and Hedged Requests
+A RetryPolicy retries failed requests (network errors and 429/5xx) with
+jittered exponential backoff and a per-attempt timeout, and can hedge slow
+attempts by firing a duplicate request once the first has taken longer
+than the recent p95 latency (or a fixed delay), using whichever answers
+first. Attempt counts for the current subject are kept in a context
+variable so they can be reported with its result.
+"""
+
+import time
+import random
+import asyncio
+import argparse
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import requests
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_fetch_stats = contextvars.ContextVar('grokipedia_fetch_stats', default=None)
+
+
+def start_fetch_stats():
+    """Begin counting attempts for the current subject (per thread / asyncio task)"""
+    stats = {'attempts': 0, 'retries': 0, 'hedged': 0}
+    _fetch_stats.set(stats)
+    return stats
+
+
+def current_fetch_stats():
+    stats = _fetch_stats.get()
+    return stats if stats is not None else {'attempts': 0, 'retries': 0, 'hedged': 0}
+
+
+def parse_hedge(value):
+    """argparse type for --hedge: 'p95' (adaptive) or a positive delay in seconds"""
+    if value == 'p95':
+        return value
+    try:
+        delay = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"--hedge takes 'p95' or a number of seconds, not {value!r}")
+    if delay <= 0:
+        raise argparse.ArgumentTypeError(f"--hedge delay must be more than 0 seconds, not {value!r}")
+    return delay
+
+
+def _discard(future):
+    """Cancel a losing hedged request, or close its response once it arrives"""
+    if not future.cancel():
+        future.add_done_callback(_close_response)
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        close = getattr(future.result(), 'close', None)
+        if close is not None:
+            close()
+
+
+class LatencyTracker:
+    """Rolling window of recent request latencies"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+        self._lock = threading.Lock()
+
+    def add(self, seconds):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def percentile(self, p):
+        """The p-th percentile latency, or None until min_samples have been seen"""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return None
+            ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+class RetryPolicy:
+    """
+    retries: extra attempts after the first. timeout: per-attempt timeout
+    in seconds. backoff/max_backoff: the n-th retry sleeps a random time in
+    [0, min(max_backoff, backoff * 2**n)]. hedge: None, 'p95' or seconds.
+    """
+
+    def __init__(self, retries=2, timeout=10, backoff=0.5, max_backoff=8.0, hedge=None, min_hedge_delay=0.05):
+        self.retries = retries
+        self.timeout = timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.min_hedge_delay = min_hedge_delay
+        self.latency = LatencyTracker()
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def reports_stats(self):
+        """Whether attempt counts are worth adding to results"""
+        return bool(self.retries or self.hedge)
+
+    def backoff_delay(self, retry):
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** retry))
+
+    def hedge_delay(self):
+        if self.hedge is None:
+            return None
+        if self.hedge == 'p95':
+            delay = self.latency.percentile(95)
+            return None if delay is None else max(self.min_hedge_delay, delay)
+        return self.hedge
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='hedge')
+            return self._executor
+
+    def call(self, send, errors=(requests.RequestException,), status=lambda response: response.status_code):
+        """
+        Call send() until it returns a response whose status isn't retryable
+        or the retries run out (the last response is then returned, or the
+        last error raised).
+        """
+        stats = current_fetch_stats()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                stats['retries'] += 1
+                time.sleep(self.backoff_delay(attempt - 1))
+            stats['attempts'] += 1
+            try:
+                response = self._attempt(send, stats)
+            except errors:
+                if attempt == self.retries:
+                    raise
+                continue
+            if status(response) not in RETRY_STATUSES or attempt == self.retries:
+                return response
+
+    def _attempt(self, send, stats):
+        delay = self.hedge_delay()
+        started = time.monotonic()
+        if delay is None:
+            response = send()
+            self.latency.add(time.monotonic() - started)
+            return response
+
+        pending = {self._pool().submit(send)}
+        done, _ = wait(pending, timeout=delay)
+        if not done:
+            stats['hedged'] += 1
+            pending.add(self._pool().submit(send))
+
+        error = None
+        try:
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        self.latency.add(time.monotonic() - started)
+                        return future.result()
+                    error = future.exception()
+            raise error
+        finally:
+            for future in pending:
+                _discard(future)
+
+    async def call_async(self, send, errors=(), status=lambda response: response[0]):
+        """Async version of call(); send is a coroutine function"""
+        stats = current_fetch_stats()
+        for attempt in range(self.retries + 1):
+            if attempt:
+                stats['retries'] += 1
+                await asyncio.sleep(self.backoff_delay(attempt - 1))
+            stats['attempts'] += 1
+            try:
+                response = await self._attempt_async(send, stats)
+            except errors:
+                if attempt == self.retries:
+                    raise
+                continue
+            if status(response) not in RETRY_STATUSES or attempt == self.retries:
+                return response
+
+    async def _attempt_async(self, send, stats):
+        delay = self.hedge_delay()
+        started = time.monotonic()
+        if delay is None:
+            response = await send()
+            self.latency.add(time.monotonic() - started)
+            return response
+
+        pending = {asyncio.ensure_future(send())}
+        done, _ = await asyncio.wait(pending, timeout=delay)
+        if not done:
+            stats['hedged'] += 1
+            pending.add(asyncio.ensure_future(send()))
+
+        error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        self.latency.add(time.monotonic() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
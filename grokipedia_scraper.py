@@ -4,90 +4,309 @@ Grokipedia Data Extractor
 A script to query subjects on grokipedia.com and extract data.
 """
 
+import os
 import requests
 from bs4 import BeautifulSoup
 import json
 import sys
 import argparse
-from urllib.parse import urljoin, quote
+import atexit
+import threading
+from urllib.parse import urljoin, quote, urlparse
 import time
 
+from grokipedia_batch import BatchJournal, iter_subjects, run_batch
+from grokipedia_cache import PageCache, DEFAULT_CACHE_PATH
+from grokipedia_output import open_output, stream_writer
+from grokipedia_payload import extract_payload, payload_is_complete, article_from_payload, search_results_from_payload
+from grokipedia_ratelimit import RateLimiter, limit_session
+from grokipedia_retry import RetryPolicy, start_fetch_stats, parse_hedge
+from grokipedia_metrics import METRICS
+from grokipedia_merge import ResultMerger
+from grokipedia_snippets import SnippetIndex, DEFAULT_SNIPPET_WINDOW
+from grokipedia_replay import ReplayArchive, DEFAULT_ARCHIVE_PATH
+
+# BeautifulSoup tree builders in order of preference for parser='auto'
+PARSER_BACKENDS = ['lxml', 'html.parser', 'html5lib']
+
+DEFAULT_STRATEGY_PATH = os.path.join(os.path.expanduser('~'), '.cache', 'grokipedia', 'search_strategies.json')
+
+
+def resolve_parser(parser):
+    """
+    Pick the BeautifulSoup tree builder to use. 'auto' selects the fastest
+    installed backend; an explicit name that isn't installed falls back to
+    the standard library parser.
+    """
+    from bs4.builder import builder_registry
+
+    if parser == 'auto':
+        for name in PARSER_BACKENDS:
+            if builder_registry.lookup(name):
+                return name
+    if builder_registry.lookup(parser):
+        return parser
+    print(f"HTML parser '{parser}' is not installed, using html.parser", file=sys.stderr)
+    return 'html.parser'
+
+
+class SearchStrategyMemo:
+    """
+    Remembers, per host, which search strategy last succeeded so it can be
+    tried first next time, and keeps attempt/success counts per strategy.
+    State is persisted as JSON so it carries over between runs.
+    """
+
+    def __init__(self, path=DEFAULT_STRATEGY_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self.hosts = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    self.hosts = json.load(f)
+            except (OSError, json.JSONDecodeError):
+                self.hosts = {}
+
+    def _host(self, host):
+        return self.hosts.setdefault(host, {'preferred': None, 'strategies': {}})
+
+    def preferred(self, host):
+        return self.hosts.get(host, {}).get('preferred')
+
+    def order(self, host, strategies):
+        """Put the host's last successful strategy first, keeping the rest of the ladder in order"""
+        preferred = self.preferred(host)
+        first = [s for s in strategies if s[0] == preferred]
+        return first + [s for s in strategies if s[0] != preferred]
+
+    def record(self, host, name, success):
+        """Count an attempt; a success on a new strategy makes it the preferred one and is saved"""
+        with self._lock:
+            entry = self._host(host)
+            stats = entry['strategies'].setdefault(name, {'attempts': 0, 'successes': 0})
+            stats['attempts'] += 1
+            if success:
+                stats['successes'] += 1
+                if entry['preferred'] != name:
+                    entry['preferred'] = name
+                    self._save()
+
+    def get_stats(self, host=None):
+        if host is not None:
+            return self.hosts.get(host, {})
+        return self.hosts
+
+    def save(self):
+        with self._lock:
+            self._save()
+
+    def _save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.hosts, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+
 class GrokipediaScraper:
-    def __init__(self, base_url="https://grokipedia.com/"):
+    def __init__(self, base_url="https://grokipedia.com/", parser='html.parser', prefer_payload=False,
+                 cache=None, strategy_memo=None, limiter=None, retry_policy=None,
+                 snippet_window=DEFAULT_SNIPPET_WINDOW, recorder=None):
         self.base_url = base_url
+        self.parser = resolve_parser(parser)
+        # Read pages from their embedded Next.js data before falling back to the DOM
+        self.prefer_payload = prefer_payload
+        # Optional PageCache; GET requests are served from and revalidated against it
+        self.cache = cache
+        # Optional SearchStrategyMemo so search_subject tries the last working strategy first
+        self.strategy_memo = strategy_memo
+        self.host = urlparse(base_url).netloc
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Optional RateLimiter shared by every request this session makes
+        self.limiter = limiter
+        if limiter is not None:
+            limit_session(self.session, limiter)
+        # Optional RetryPolicy: retries with backoff, per-attempt timeout and hedging
+        self.retry_policy = retry_policy
+        # Maximum length of search result snippets
+        self.snippet_window = snippet_window
+        # Optional ReplayArchive every response received over the network is recorded into
+        self.recorder = recorder
+        if recorder is not None:
+            self.session.hooks['response'].append(recorder.record_response)
 
     def search_subject(self, subject):
+        """
+        Search for a subject on Grokipedia, adding the request attempt counts
+        as 'fetch_stats' when retries or hedging are enabled
+        """
+        fetch_stats = start_fetch_stats()
+        result = self._search_subject(subject)
+        if self.retry_policy is not None and self.retry_policy.reports_stats:
+            result['fetch_stats'] = fetch_stats
+        return result
+
+    def _search_subject(self, subject):
         """
         Search for a subject on Grokipedia using the search form
         """
         try:
             # First, get the main page to understand the search mechanism
-            response = self.session.get(self.base_url, timeout=10)
-            if response.status_code != 200:
-                return {"error": f"Failed to load main page: {response.status_code}"}
-
-            # Try to search by simulating form submission
-            # Based on the HTML, this appears to be a Next.js app with client-side search
-            search_data = {
-                'query': subject,  # Try different parameter names
-            }
-
-            # Try POST to main page (common for Next.js apps)
-            headers = {
-                'Content-Type': 'application/x-www-form-urlencoded',
-                'Referer': self.base_url,
-                'Origin': self.base_url.rstrip('/'),
-            }
+            # (skipped once a working strategy for this host is known)
+            if not self._known_strategy():
+                response = self._request('GET', self.base_url, timeout=10)
+                if response.status_code != 200:
+                    return {"error": f"Failed to load main page: {response.status_code}"}
 
             # Update session headers for search
-            self.session.headers.update(headers)
+            self.session.headers.update(self._search_headers())
 
-            # Try posting to the main page (Next.js apps often handle search this way)
-            response = self.session.post(self.base_url, data=search_data, timeout=10)
-            if response.status_code == 200:
-                return self.extract_search_results(response.text, subject)
+            for name, label, method, url, kwargs, kind in self._ordered_strategies(subject):
+                if label:
+                    print(label, file=sys.stderr)
+                response = self._request(method, url, timeout=10, **kwargs)
+                self._record_strategy(name, response.status_code == 200)
+                if response.status_code == 200:
+                    return self._parse_search_response(kind, response.text, url, subject)
 
-            # Try GET with query parameter
-            search_url = f"{self.base_url}?q={quote(subject)}"
-            print(f"Trying search URL: {search_url}")
-            response = self.session.get(search_url, timeout=10)
-            if response.status_code == 200:
-                return self.extract_search_results(response.text, subject)
+        except requests.RequestException as e:
+            return {"error": f"Network error: {str(e)}"}
 
-            # Try /search endpoint
-            search_endpoint = urljoin(self.base_url, "search")
-            search_params = {'q': subject}
-            print(f"Trying search endpoint: {search_endpoint}")
-            response = self.session.get(search_endpoint, params=search_params, timeout=10)
-            if response.status_code == 200:
-                return self.extract_search_results(response.text, subject)
+        return {"error": "Could not find the requested subject"}
 
-            # Try POST to /search
-            response = self.session.post(search_endpoint, data={'q': subject}, timeout=10)
-            if response.status_code == 200:
-                return self.extract_search_results(response.text, subject)
+    def _request(self, method, url, **kwargs):
+        """
+        Issue a request, retrying and hedging it per the retry policy if one
+        is configured
+        """
+        if self.retry_policy is None:
+            return self._send(method, url, **kwargs)
+        kwargs['timeout'] = self.retry_policy.timeout
+        return self.retry_policy.call(lambda: self._send(method, url, **kwargs))
 
+    def _send(self, method, url, **kwargs):
+        """
+        Issue a request through the session, routing GETs through the page
+        cache when one is configured
+        """
+        try:
+            with METRICS.timer('http_request'):
+                if self.cache is not None and method == 'GET':
+                    response = self.cache.fetch(self.session, url, **kwargs)
+                else:
+                    response = self.session.request(method, url, **kwargs)
+        except requests.RequestException:
+            METRICS.incr('errors')
+            raise
+
+        METRICS.incr('pages')
+        if not getattr(response, 'from_cache', False):
+            METRICS.incr('bytes', len(response.content))
+        return response
+
+    def _search_headers(self):
+        """
+        Headers sent with search attempts (form posts to a Next.js app)
+        """
+        return {
+            'Content-Type': 'application/x-www-form-urlencoded',
+            'Referer': self.base_url,
+            'Origin': self.base_url.rstrip('/'),
+        }
+
+    def _search_strategies(self, subject):
+        """
+        Ordered search attempts as (name, progress label or None, method, url,
+        request kwargs, kind). Shared by the blocking and async scrapers so
+        both try the same ladder.
+        """
+        search_url = f"{self.base_url}?q={quote(subject)}"
+        search_endpoint = urljoin(self.base_url, "search")
+        direct_url = urljoin(self.base_url, f"wiki/{quote(subject.replace(' ', '_'))}")
+        return [
+            # Try posting to the main page (Next.js apps often handle search this way)
+            ('post_base', None, 'POST', self.base_url, {'data': {'query': subject}}, 'search'),
+            # Try GET with query parameter
+            ('get_query', f"Trying search URL: {search_url}", 'GET', search_url, {}, 'search'),
+            # Try /search endpoint
+            ('get_search', f"Trying search endpoint: {search_endpoint}", 'GET', search_endpoint,
+             {'params': {'q': subject}}, 'search'),
+            # Try POST to /search
+            ('post_search', None, 'POST', search_endpoint, {'data': {'q': subject}}, 'search'),
             # Fallback: try direct wiki URL pattern (just in case)
-            direct_url = urljoin(self.base_url, f"wiki/{quote(subject.replace(' ', '_'))}")
-            print(f"Trying direct URL: {direct_url}")
-            response = self.session.get(direct_url, timeout=10)
-            if response.status_code == 200:
-                return self.extract_article_data(response.text, direct_url)
+            ('direct_wiki', f"Trying direct URL: {direct_url}", 'GET', direct_url, {}, 'article'),
+        ]
 
-        except requests.RequestException as e:
-            return {"error": f"Network error: {str(e)}"}
+    def _known_strategy(self):
+        return self.strategy_memo is not None and self.strategy_memo.preferred(self.host) is not None
 
-        return {"error": "Could not find the requested subject"}
+    def _ordered_strategies(self, subject):
+        """The search ladder, with the host's last successful strategy first"""
+        strategies = self._search_strategies(subject)
+        if self.strategy_memo is None:
+            return strategies
+        return self.strategy_memo.order(self.host, strategies)
+
+    def _record_strategy(self, name, success):
+        if self.strategy_memo is not None:
+            self.strategy_memo.record(self.host, name, success)
+
+    def _parse_search_response(self, kind, html_content, url, subject):
+        """
+        Run the extractor matching a search strategy's kind
+        """
+        if kind == 'article':
+            return self.extract_article_data(html_content, url)
+        return self.extract_search_results(html_content, subject)
+
+    def parse_html(self, html_content):
+        """
+        Parse a page with the configured backend. Extractors accept either
+        raw HTML or an already parsed tree, so each page is parsed only once.
+        """
+        if isinstance(html_content, BeautifulSoup):
+            return html_content
+        with METRICS.timer('parse'):
+            return BeautifulSoup(html_content, self.parser)
+
+    def extract_payload_data(self, html_content, url=None, subject=None):
+        """
+        Extract an article (or, given a subject, search hits) from the page's
+        hydration payload. Returns None when the payload is incomplete so the
+        caller can fall back to DOM extraction.
+        """
+        if isinstance(html_content, BeautifulSoup):
+            return None
+
+        with METRICS.timer('parse'):
+            page, flight = extract_payload(html_content)
+        if payload_is_complete(page, flight):
+            page_url = url or urljoin(self.base_url, f"page/{page['slug']}")
+            return article_from_payload(page, flight, page_url, self.base_url)
+
+        if subject is not None:
+            hits = search_results_from_payload(flight, subject, self.base_url)
+            if hits:
+                return {'search_term': subject, 'results': hits, 'page_info': {}}
+
+        return None
 
     def extract_article_data(self, html_content, url):
         """
         Extract data from an article page
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if self.prefer_payload:
+            data = self.extract_payload_data(html_content, url)
+            if data:
+                return data
+
+        soup = self.parse_html(html_content)
 
         data = {
             'url': url,
@@ -146,7 +365,12 @@ class GrokipediaScraper:
         """
         Extract search results from a search page (Next.js application)
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        if self.prefer_payload:
+            data = self.extract_payload_data(html_content, subject=subject)
+            if data:
+                return data
+
+        soup = self.parse_html(html_content)
 
         results = {
             'search_term': subject,
@@ -158,7 +382,15 @@ class GrokipediaScraper:
         title_tag = soup.find('title')
         if title_tag and subject.lower() not in title_tag.get_text().lower():
             # Might be an article page, try to extract article data instead
-            return self.extract_article_data(html_content, soup.find('meta', property='og:url')['content'] if soup.find('meta', property='og:url') else self.base_url)
+            og_url = soup.find('meta', property='og:url')
+            return self.extract_article_data(soup, og_url['content'] if og_url else self.base_url)
+
+        # Candidates from every source below are merged on their canonical
+        # URL; JSON beats result containers, which beat plain links
+        merger = ResultMerger(self.base_url)
+        # Link snippets are cut from one text/offset index of the whole page
+        with METRICS.timer('snippets'):
+            snippets = SnippetIndex(soup, self.snippet_window)
 
         # Look for search results in various formats
         # Check for JSON data in script tags (Next.js often embeds data)
@@ -169,7 +401,7 @@ class GrokipediaScraper:
                     json_data = json.loads(script.string)
                     # Look for search results in the JSON data
                     if isinstance(json_data, dict):
-                        self._extract_from_json(json_data, results)
+                        self._extract_from_json(json_data, merger)
             except (json.JSONDecodeError, TypeError):
                 continue
 
@@ -182,13 +414,7 @@ class GrokipediaScraper:
                 href = link['href']
                 text = link.get_text().strip()
                 if text and len(text) > 3:  # Filter out very short links
-                    if not href.startswith(('http://', 'https://')):
-                        href = urljoin(self.base_url, href)
-                    results['results'].append({
-                        'title': text,
-                        'url': href,
-                        'snippet': self._get_link_context(link)
-                    })
+                    merger.add(text, href, lambda link=link: snippets.snippet(link), 'container')
 
         # Look for any links that might be articles
         all_links = soup.find_all('a', href=True)
@@ -199,15 +425,9 @@ class GrokipediaScraper:
             if (text and len(text) > 10 and
                 not href.startswith(('#', 'javascript:', 'mailto:')) and
                 not any(skip in href.lower() for skip in ['/legal/', '/images/', '/favicon', '/manifest'])):
-                if not href.startswith(('http://', 'https://')):
-                    href = urljoin(self.base_url, href)
-                # Avoid duplicates
-                if not any(r['url'] == href for r in results['results']):
-                    results['results'].append({
-                        'title': text,
-                        'url': href,
-                        'snippet': self._get_link_context(link)
-                    })
+                merger.add(text, href, lambda link=link: snippets.snippet(link), 'links')
+
+        results['results'] = merger.results()
 
         # Extract page metadata
         meta_desc = soup.find('meta', {'name': 'description'})
@@ -220,9 +440,9 @@ class GrokipediaScraper:
 
         return results
 
-    def _extract_from_json(self, json_data, results):
+    def _extract_from_json(self, json_data, merger):
         """
-        Extract search results from JSON data embedded in the page
+        Extract search results from JSON data embedded in the page into a ResultMerger
         """
         def recursive_search(obj, path=""):
             if isinstance(obj, dict):
@@ -234,12 +454,8 @@ class GrokipediaScraper:
                                 if isinstance(item, dict):
                                     title = item.get('title', item.get('name', ''))
                                     url = item.get('url', item.get('link', ''))
-                                    if title and url:
-                                        results['results'].append({
-                                            'title': title,
-                                            'url': url,
-                                            'snippet': item.get('description', item.get('snippet', ''))
-                                        })
+                                    if title and url and isinstance(url, str):
+                                        merger.add(title, url, item.get('description', item.get('snippet', '')), 'json')
                     recursive_search(value, new_path)
             elif isinstance(obj, list):
                 for i, item in enumerate(obj):
@@ -247,26 +463,11 @@ class GrokipediaScraper:
 
         recursive_search(json_data)
 
-    def _get_link_context(self, link_element):
-        """
-        Get context around a link element for snippet generation
-        """
-        context = ""
-        # Get text from parent elements
-        parent = link_element.parent
-        if parent:
-            context = parent.get_text().strip()
-            # Remove the link text itself to avoid duplication
-            link_text = link_element.get_text().strip()
-            if link_text in context:
-                context = context.replace(link_text, '').strip()
-        return context[:200] if len(context) > 200 else context
-
     def extract_main_page_data(self, html_content, subject):
         """
         Extract data from the main page related to a subject
         """
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = self.parse_html(html_content)
 
         data = {
             'subject': subject,
@@ -301,20 +502,139 @@ class GrokipediaScraper:
 
         return data
 
+def run_batch_mode(args, cache=None, memo=None, limiter=None, retry_policy=None, recorder=None):
+    """
+    Search every subject from --batch with a scraper per worker thread,
+    writing one JSON line per subject
+    """
+    journal = BatchJournal(args.journal or f"{args.output or 'grokipedia_batch'}.journal")
+    local = threading.local()
+
+    def process(subject):
+        if not hasattr(local, 'scraper'):
+            local.scraper = GrokipediaScraper(base_url=args.base_url, parser=args.parser,
+                                              prefer_payload=args.payload, cache=cache, strategy_memo=memo,
+                                              limiter=limiter, retry_policy=retry_policy,
+                                              snippet_window=args.snippet_window, recorder=recorder)
+        search_result = local.scraper.search_subject(subject)
+        result = {'search_query': subject, 'search_results': search_result, 'scraped_at': str(time.time())}
+        if 'error' in search_result:
+            result['error'] = search_result['error']
+        return result
+
+    output = open_output(args.output, args.compress, append=True)
+    try:
+        stats = run_batch(iter_subjects(args.batch), process, journal, output, workers=args.workers)
+    finally:
+        journal.close()
+        if output is not sys.stdout:
+            output.close()
+
+    print(f"Batch finished: {stats['done']} done, {stats['failed']} failed, "
+          f"{stats['skipped']} skipped in {stats['elapsed']}s", file=sys.stderr)
+
 def main():
     parser = argparse.ArgumentParser(description='Query subjects on Grokipedia and extract data')
-    parser.add_argument('subject', help='The subject to search for')
+    parser.add_argument('subject', nargs='?', help='The subject to search for')
+    parser.add_argument('--batch', metavar='FILE',
+                       help="Read subjects one per line from FILE ('-' for stdin) and write one JSON line per subject")
+    parser.add_argument('--journal',
+                       help='Batch progress journal used to resume interrupted runs (default: <output>.journal)')
+    parser.add_argument('--workers', type=int, default=4,
+                       help='Concurrent subjects in batch mode (default: 4)')
     parser.add_argument('-o', '--output', help='Output file (default: print to stdout)')
     parser.add_argument('-f', '--format', choices=['json', 'text'], default='json',
                        help='Output format (default: json)')
+    parser.add_argument('--stream', action='store_true',
+                       help='Write results incrementally (one JSON line per search result with -f json)')
+    parser.add_argument('--compress', choices=['gzip', 'zstd'],
+                       help='Compress the output file (default: from the .gz/.zst suffix of -o)')
+    parser.add_argument('--parser', choices=['auto'] + PARSER_BACKENDS, default='html.parser',
+                       help='HTML parser backend (default: html.parser; auto picks the fastest installed)')
+    parser.add_argument('--payload', action='store_true',
+                       help='Read pages from their embedded Next.js data, falling back to HTML parsing')
+    parser.add_argument('--cache', nargs='?', const=DEFAULT_CACHE_PATH,
+                       help=f'Cache pages on disk (default path: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--cache-ttl', type=int, default=3600,
+                       help='Seconds a cached page is used without revalidation (default: 3600)')
+    parser.add_argument('--cache-max-mb', type=int, default=256,
+                       help='Size of the cache before least recently used entries are evicted, in MB (default: 256)')
+    parser.add_argument('--learn-search', nargs='?', const=DEFAULT_STRATEGY_PATH,
+                       help=f'Remember which search strategy works and try it first (default path: {DEFAULT_STRATEGY_PATH})')
+    parser.add_argument('--timeout', type=float, default=10,
+                       help='Per-attempt request timeout in seconds (default: 10)')
+    parser.add_argument('--retries', type=int, default=0,
+                       help='Retry failed requests (network errors, 429, 5xx) this many times with jittered backoff (default: 0)')
+    parser.add_argument('--hedge', nargs='?', const='p95', type=parse_hedge,
+                       help="Send a duplicate request when one takes longer than SECONDS, or than the recent p95 latency if no value is given")
+    parser.add_argument('--metrics', action='store_true',
+                       help='Print per-stage timings (requests, parsing, serialization) and counters to stderr')
+    parser.add_argument('--rate', type=float,
+                       help='Maximum requests per second per host (default: unlimited)')
+    parser.add_argument('--adaptive', action='store_true',
+                       help='Adapt concurrency per host: back off on 429/5xx/timeouts, ramp up while responses stay fast')
+    parser.add_argument('--snippet-window', type=int, default=DEFAULT_SNIPPET_WINDOW,
+                       help=f'Maximum length of search result snippets (default: {DEFAULT_SNIPPET_WINDOW})')
+    parser.add_argument('--base-url', default='https://grokipedia.com/',
+                       help='Site to scrape, e.g. a local replay stub (default: https://grokipedia.com/)')
+    parser.add_argument('--record', nargs='?', const=DEFAULT_ARCHIVE_PATH,
+                       help=f'Record every response into a replay archive (default path: {DEFAULT_ARCHIVE_PATH})')
 
     args = parser.parse_args()
 
-    scraper = GrokipediaScraper()
+    if not args.subject and not args.batch:
+        parser.error('give a subject or --batch FILE')
+    if args.batch and args.format != 'json':
+        parser.error('--batch writes JSON lines; use -f json')
+
+    cache = PageCache(args.cache, ttl=args.cache_ttl, max_bytes=args.cache_max_mb * 1024 * 1024) if args.cache else None
+    memo = SearchStrategyMemo(args.learn_search) if args.learn_search else None
+    limiter = RateLimiter(rate=args.rate, adaptive=args.adaptive,
+                          max_concurrency=args.workers) if args.rate or args.adaptive else None
+    retry_policy = RetryPolicy(retries=args.retries, timeout=args.timeout, hedge=args.hedge)
+    recorder = ReplayArchive(args.record) if args.record else None
+    if cache:
+        METRICS.register_collector(cache.get_stats, 'cache')
+    if args.metrics:
+        atexit.register(lambda: print(METRICS.summary(), file=sys.stderr))
+
+    if args.batch:
+        run_batch_mode(args, cache, memo, limiter, retry_policy, recorder)
+        if memo:
+            memo.save()
+        return
+    scraper = GrokipediaScraper(base_url=args.base_url, parser=args.parser, prefer_payload=args.payload,
+                                cache=cache, strategy_memo=memo, limiter=limiter, retry_policy=retry_policy,
+                                snippet_window=args.snippet_window, recorder=recorder)
+
+    if args.stream:
+        writer = stream_writer(args.format, args.output, args.compress)
+        try:
+            writer.search(args.subject, scraper.search_subject(args.subject))
+        finally:
+            writer.close()
+        if memo:
+            memo.save()
+        return
+
     result = scraper.search_subject(args.subject)
 
+    if memo:
+        memo.save()
+
+    if cache:
+        stats = cache.get_stats()
+        print(f"Cache: {stats['hits']} hits, {stats['revalidated']} revalidated, {stats['misses']} misses",
+              file=sys.stderr)
+
+    if limiter:
+        stats = limiter.get_stats()
+        print(f"Rate limit: {stats['requests']} requests, {stats['failures']} throttled/failed, "
+              f"{stats['waited']}s waiting", file=sys.stderr)
+
     if args.format == 'json':
-        output = json.dumps(result, indent=2, ensure_ascii=False)
+        with METRICS.timer('serialization'):
+            output = json.dumps(result, indent=2, ensure_ascii=False)
     else:
         # Simple text format
         output = f"Subject: {args.subject}\n"
@@ -342,7 +662,7 @@ def main():
             output += json.dumps(result, indent=2, ensure_ascii=False)
 
     if args.output:
-        with open(args.output, 'w', encoding='utf-8') as f:
+        with open_output(args.output, args.compress) as f:
             f.write(output)
         print(f"Results saved to {args.output}")
     else:
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Grokipedia Link Snippets
+Search-result snippets are the text of a link's parent element without the
+link's own text. Instead of re-reading every parent's text per link, the
+page text is concatenated once and each element's [start, end) offsets into
+it are recorded, so any link's snippet is a couple of bounded slices. The
+same index is built in the browser by SNIPPET_INDEX_JS.
+"""
+
+from bs4.element import Tag, NavigableString, CData
+
+DEFAULT_SNIPPET_WINDOW = 200
+
+# String types BeautifulSoup's get_text() includes (not comments, scripts or styles)
+TEXT_TYPES = (NavigableString, CData)
+
+
+def cut_snippet(text, parent_span, own_span, window=DEFAULT_SNIPPET_WINDOW):
+    """
+    Up to window characters of text[parent_span] with text[own_span] cut
+    out and the ends stripped. Only O(window) characters are copied, however
+    long the parent's text is.
+    """
+    head = text[parent_span[0]:own_span[0]].lstrip()
+    if len(head) >= window:
+        return head[:window]
+    tail = text[own_span[1]:min(parent_span[1], own_span[1] + window)]
+    return (head + tail).strip()[:window]
+
+
+class SnippetIndex:
+    """
+    One-pass text/offset index of a BeautifulSoup tree. snippet(link) is the
+    link's parent text minus the link text, cut to window characters.
+    """
+
+    def __init__(self, root, window=DEFAULT_SNIPPET_WINDOW):
+        self.window = window
+        self.spans = {}
+        chunks = []
+        length = 0
+        # (element, start offset) of the open elements, innermost last
+        stack = [(root, 0)]
+        for node in root.descendants:
+            while stack[-1][0] is not node.parent:
+                element, start = stack.pop()
+                self.spans[id(element)] = (start, length)
+            if isinstance(node, Tag):
+                stack.append((node, length))
+            elif type(node) in TEXT_TYPES:
+                chunks.append(node)
+                length += len(node)
+        while stack:
+            element, start = stack.pop()
+            self.spans[id(element)] = (start, length)
+        self.text = ''.join(chunks)
+
+    def snippet(self, link, window=None):
+        own_span = self.spans.get(id(link))
+        parent_span = self.spans.get(id(link.parent)) if link.parent is not None else None
+        if own_span is None or parent_span is None:
+            return ''
+        return cut_snippet(self.text, parent_span, own_span, window or self.window)
+
+
+# Defines snippetIndex(window) in the page, returning a function from a link
+# element to its snippet; the DOM is walked once however many links there are
+SNIPPET_INDEX_JS = """
+function snippetIndex(window) {
+    var chunks = [], length = 0, spans = new Map();
+    function walk(node) {
+        if (node.nodeType === Node.TEXT_NODE) {
+            chunks.push(node.nodeValue);
+            length += node.nodeValue.length;
+            return;
+        }
+        if (node.nodeType !== Node.ELEMENT_NODE || node.tagName === 'SCRIPT' || node.tagName === 'STYLE') {
+            return;
+        }
+        var start = length;
+        for (var child = node.firstChild; child; child = child.nextSibling) {
+            walk(child);
+        }
+        spans.set(node, [start, length]);
+    }
+    walk(document.documentElement);
+    var text = chunks.join('');
+    return function (link) {
+        var own = spans.get(link), parent = spans.get(link.parentElement);
+        if (!own || !parent) {
+            return '';
+        }
+        var head = text.slice(parent[0], own[0]).replace(/^\\s+/, '');
+        if (head.length >= window) {
+            return head.slice(0, window);
+        }
+        return (head + text.slice(own[1], Math.min(parent[1], own[1] + window))).trim().slice(0, window);
+    };
+}
+"""
@@ -7,27 +7,169 @@ A Flask web application providing a user-friendly interface to the Grokipedia sc
 import os
 import json
 import time
-from flask import Flask, render_template, request, jsonify, send_file, flash, redirect, url_for
+from flask import Flask, render_template, request, jsonify, flash, redirect, url_for, session, Response, stream_with_context, g
 from werkzeug.utils import secure_filename
-import tempfile
 import threading
-
-# Get the project directory
-PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+import atexit
+import queue
 
 # Import our scraper
-from grokipedia_browser_scraper import GrokipediaBrowserScraper
+from grokipedia_browser_scraper import GrokipediaBrowserPool, DEFAULT_BLOCKED_RESOURCES, parse_block_resources
+from grokipedia_cache import PageCache
+from grokipedia_index import ArticleIndex
+from grokipedia_ratelimit import RateLimiter
+from grokipedia_jobs import JobManager, ResultCache
+from grokipedia_output import DOWNLOAD_FORMATS, iter_gzip
+from grokipedia_metrics import METRICS
+from grokipedia_replay import ReplayArchive
+
+# Warm browser drivers shared by all searches
+BROWSER_WORKERS = int(os.environ.get('GROKIPEDIA_BROWSER_WORKERS', 3))
+
+# Page wait strategy for the browsers: 'fixed' or 'adaptive'
+BROWSER_WAIT_MODE = os.environ.get('GROKIPEDIA_WAIT_MODE', 'fixed')
+
+# DOM extraction for the browsers: 'webdriver' or 'script'
+BROWSER_EXTRACTION = os.environ.get('GROKIPEDIA_EXTRACTION', 'webdriver')
+
+# Read articles from their Next.js payload over HTTP before using the browser
+PAYLOAD_FIRST = os.environ.get('GROKIPEDIA_PAYLOAD_FIRST', '').lower() in ('1', 'true', 'yes')
+
+# Resource categories the browsers don't download: '1' for all of them, or a list such as 'images,fonts'
+BLOCK_RESOURCES = os.environ.get('GROKIPEDIA_BLOCK_RESOURCES', '')
+if BLOCK_RESOURCES.lower() in ('1', 'true', 'yes'):
+    BLOCK_RESOURCES = DEFAULT_BLOCKED_RESOURCES
+else:
+    BLOCK_RESOURCES = parse_block_resources(BLOCK_RESOURCES) if BLOCK_RESOURCES else None
+
+# Shared on-disk article cache, enabled by pointing GROKIPEDIA_CACHE at a database file
+PAGE_CACHE = PageCache(os.environ['GROKIPEDIA_CACHE']) if os.environ.get('GROKIPEDIA_CACHE') else None
+# Page loads per second across all searches (unset: unlimited), and whether to adapt concurrency to the site's health
+BROWSER_RATE = float(os.environ['GROKIPEDIA_RATE']) if os.environ.get('GROKIPEDIA_RATE') else None
+BROWSER_ADAPTIVE = os.environ.get('GROKIPEDIA_ADAPTIVE', '').lower() in ('1', 'true', 'yes')
+RATE_LIMITER = RateLimiter(rate=BROWSER_RATE, adaptive=BROWSER_ADAPTIVE,
+                           max_concurrency=BROWSER_WORKERS) if BROWSER_RATE or BROWSER_ADAPTIVE else None
+# Optional full-text index that scraped articles are added to and /index/search answers from
+ARTICLE_INDEX = ArticleIndex(os.environ['GROKIPEDIA_INDEX']) if os.environ.get('GROKIPEDIA_INDEX') else None
+# Site the browsers scrape (e.g. a local replay stub for load tests), and an optional archive to record pages into
+BASE_URL = os.environ.get('GROKIPEDIA_BASE_URL', 'https://grokipedia.com/')
+RECORDER = ReplayArchive(os.environ['GROKIPEDIA_RECORD']) if os.environ.get('GROKIPEDIA_RECORD') else None
+
+# Concurrent searches, queued searches allowed, and how long finished results are kept (seconds)
+JOB_WORKERS = int(os.environ.get('GROKIPEDIA_JOB_WORKERS', BROWSER_WORKERS))
+JOB_QUEUE_SIZE = int(os.environ.get('GROKIPEDIA_JOB_QUEUE_SIZE', 50))
+JOB_TTL = int(os.environ.get('GROKIPEDIA_JOB_TTL', 1800))
+# Repeated searches are answered from memory for this many seconds (0 disables)
+RESULT_CACHE_TTL = int(os.environ.get('GROKIPEDIA_RESULT_CACHE_TTL', 600))
+RESULT_CACHE_MB = int(os.environ.get('GROKIPEDIA_RESULT_CACHE_MB', 64))
 
 app = Flask(__name__)
 app.secret_key = 'grokipedia_scraper_secret_key_2024'
 
-# Global variables to track scraping progress
-current_scraping_status = {
-    'is_running': False,
-    'progress': '',
-    'result': None,
-    'error': None
-}
+# Browser pool shared by every job, started on first use
+browser_pool = None
+browser_pool_lock = threading.Lock()
+
+def get_browser_pool():
+    """Return the shared browser pool, starting it if needed (None if Chrome fails to start)"""
+    global browser_pool
+    with browser_pool_lock:
+        if browser_pool is None:
+            pool = GrokipediaBrowserPool(size=BROWSER_WORKERS, headless=True, wait_mode=BROWSER_WAIT_MODE,
+                                         extraction_mode=BROWSER_EXTRACTION,
+                                         payload_first=PAYLOAD_FIRST,
+                                         cache=PAGE_CACHE, index=ARTICLE_INDEX,
+                                         limiter=RATE_LIMITER, base_url=BASE_URL, recorder=RECORDER,
+                                         block_resources=BLOCK_RESOURCES)
+            if not pool.start():
+                return None
+            browser_pool = pool
+        return browser_pool
+
+@atexit.register
+def shutdown_browser_pool():
+    if browser_pool:
+        browser_pool.cleanup()
+
+def run_scraping(job):
+    """Run one search job (and its article scraping) on the shared browser pool"""
+    search_query = job.query
+    scrape_articles = job.options.get('scrape_articles', False)
+    max_articles = job.options.get('max_articles', 3)
+
+    job.update(f'Initializing browser for "{search_query}"...')
+
+    scraper = get_browser_pool()
+    if scraper is None:
+        job.finish(error='Failed to initialize browser. Make sure Chrome is installed.')
+        return
+
+    job.update(f'Searching for "{search_query}"...')
+
+    # Get search results
+    search_result = scraper.search_subject(search_query)
+    job.publish('search', {'count': len(search_result.get('results', []))}, full=search_result)
+
+    if scrape_articles and 'results' in search_result and search_result['results']:
+        job.update(f'Found {len(search_result["results"])} results. Scraping up to {max_articles} articles...')
+
+        urls = [item['url'] for item in search_result['results'][:max_articles]]
+        done = []
+
+        def report(i, article_data):
+            done.append(i)
+            job.publish('article', {'index': i, 'url': urls[i]},
+                        full={'index': i, 'url': urls[i], 'article': article_data})
+            job.update(f'Scraped article {len(done)}/{len(urls)}...')
+
+        scraped = scraper.scrape_articles(urls, on_result=report)
+        articles_data = [article for article in scraped if 'error' not in article]
+
+        # Combine results
+        result = {
+            'search_query': search_query,
+            'search_results': search_result,
+            'articles': articles_data,
+            'scraped_at': str(time.time())
+        }
+    else:
+        result = search_result
+
+    job.update('Search completed successfully!')
+    job.finish(result=result)
+    METRICS.incr('web_searches')
+
+result_cache = ResultCache(max_bytes=RESULT_CACHE_MB * 1024 * 1024, ttl=RESULT_CACHE_TTL) if RESULT_CACHE_TTL > 0 else None
+jobs = JobManager(run_scraping, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE, ttl=JOB_TTL,
+                  cache=result_cache)
+
+METRICS.register_collector(lambda: {'queued': jobs.queue_size(), 'tracked': len(jobs.jobs)}, 'jobs')
+if result_cache:
+    METRICS.register_collector(result_cache.get_stats, 'result_cache')
+if PAGE_CACHE:
+    METRICS.register_collector(PAGE_CACHE.get_stats, 'cache')
+if RATE_LIMITER:
+    METRICS.register_collector(RATE_LIMITER.get_stats, 'rate_limit')
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_time(response):
+    started = g.pop('request_started', None)
+    if started is not None and request.endpoint:
+        METRICS.observe(f"web_{request.endpoint}", time.perf_counter() - started)
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Stage timings and counters in the Prometheus text format"""
+    return Response(METRICS.prometheus_text(), mimetype='text/plain; version=0.0.4')
+
+def find_job(job_id=None):
+    """Look up a job by ID, defaulting to this browser session's latest search"""
+    return jobs.get(job_id or session.get('job_id', ''))
 
 @app.route('/')
 def home():
@@ -37,12 +179,6 @@ def home():
 @app.route('/search', methods=['POST'])
 def search():
     """Handle search requests"""
-    global current_scraping_status
-
-    if current_scraping_status['is_running']:
-        flash('A search is already in progress. Please wait.', 'warning')
-        return redirect(url_for('home'))
-
     # Get form data
     search_query = request.form.get('query', '').strip()
     scrape_articles = 'scrape_articles' in request.form
@@ -53,124 +189,136 @@ def search():
         flash('Please enter a search query.', 'error')
         return redirect(url_for('home'))
 
-    # Start scraping in background thread
-    current_scraping_status = {
-        'is_running': True,
-        'progress': f'Starting search for "{search_query}"...',
-        'result': None,
-        'error': None
-    }
-
-    # Run scraping in background
-    def run_scraping():
-        global current_scraping_status
-        try:
-            current_scraping_status['progress'] = f'Initializing browser for "{search_query}"...'
-
-            scraper = GrokipediaBrowserScraper(headless=True)
-
-            if not scraper.setup_driver():
-                current_scraping_status['error'] = 'Failed to initialize browser. Make sure Chrome is installed.'
-                current_scraping_status['is_running'] = False
-                return
-
-            current_scraping_status['progress'] = f'Searching for "{search_query}"...'
-
-            # Get search results
-            search_result = scraper.search_subject(search_query)
-
-            if scrape_articles and 'results' in search_result and search_result['results']:
-                current_scraping_status['progress'] = f'Found {len(search_result["results"])} results. Scraping up to {max_articles} articles...'
-
-                articles_data = []
-                for i, result_item in enumerate(search_result['results'][:max_articles]):
-                    current_scraping_status['progress'] = f'Scraping article {i+1}/{min(max_articles, len(search_result["results"]))}...'
-                    article_data = scraper.scrape_article(result_item['url'])
-                    if 'error' not in article_data:
-                        articles_data.append(article_data)
-
-                # Combine results
-                result = {
-                    'search_query': search_query,
-                    'search_results': search_result,
-                    'articles': articles_data,
-                    'scraped_at': str(time.time())
-                }
-            else:
-                result = search_result
-
-            current_scraping_status['progress'] = 'Search completed successfully!'
-            current_scraping_status['result'] = result
-            current_scraping_status['is_running'] = False
-
-            scraper.cleanup()
-
-        except Exception as e:
-            current_scraping_status['error'] = f'Search failed: {str(e)}'
-            current_scraping_status['is_running'] = False
-
-    # Start background thread
-    thread = threading.Thread(target=run_scraping)
-    thread.daemon = True
-    thread.start()
-
-    return redirect(url_for('results'))
+    # Queue the search for the background workers
+    try:
+        job = jobs.submit(search_query, scrape_articles=scrape_articles, max_articles=max_articles)
+    except queue.Full:
+        flash('Too many searches are in progress. Please try again shortly.', 'warning')
+        return redirect(url_for('home'))
+
+    session['job_id'] = job.id
+    return redirect(url_for('results', job_id=job.id))
 
 @app.route('/progress')
-def get_progress():
-    """Get current scraping progress"""
-    return jsonify(current_scraping_status)
+@app.route('/progress/<job_id>')
+def get_progress(job_id=None):
+    """Get a search's scraping progress"""
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({'is_running': False, 'progress': '', 'result': None, 'error': 'Unknown or expired search'}), 404
+    return jsonify(job.status())
+
+@app.route('/events')
+@app.route('/events/<job_id>')
+def stream_events(job_id=None):
+    """Stream a search's progress, search results and each scraped article as server-sent events"""
+    job = find_job(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired search'}), 404
+
+    # Resume after the last event a reconnecting EventSource saw
+    try:
+        start = max(0, int(request.headers.get('Last-Event-ID', -1)) + 1)
+    except ValueError:
+        start = 0
+
+    def generate():
+        for item in job.iter_events(start):
+            if item is None:
+                yield ': keep-alive\n\n'
+                continue
+            index, event, data = item
+            yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
 
 @app.route('/results')
-def results():
+@app.route('/results/<job_id>')
+def results(job_id=None):
     """Display search results"""
-    if current_scraping_status['error']:
-        flash(current_scraping_status['error'], 'error')
+    job = find_job(job_id)
+    if job is None:
+        flash('No results available. Please try a search first.', 'warning')
         return redirect(url_for('home'))
 
-    if current_scraping_status['is_running']:
-        return render_template('loading.html')
+    if job.error:
+        flash(job.error, 'error')
+        return redirect(url_for('home'))
+
+    if job.is_running:
+        return render_template('loading.html', job_id=job.id)
 
-    if not current_scraping_status['result']:
+    if not job.result:
         flash('No results available. Please try a search first.', 'warning')
         return redirect(url_for('home'))
 
-    return render_template('results.html', result=current_scraping_status['result'])
+    return render_template('results.html', result=job.result, job_id=job.id)
 
 @app.route('/download')
-def download():
-    """Download results as JSON file"""
-    if not current_scraping_status['result']:
+@app.route('/download/<job_id>')
+def download(job_id=None):
+    """
+    Download results, streamed from memory. ?format=json|jsonl|csv picks
+    the format and ?compress=gzip gzips it; repeat downloads of an unchanged
+    result are answered 304 via the ETag.
+    """
+    job = find_job(job_id)
+    if job is None or not job.result:
         flash('No results available to download.', 'error')
         return redirect(url_for('home'))
 
-    # Save file to project directory
-    search_query = current_scraping_status['result'].get('search_query', 'grokipedia_results')
-    filename = f"{search_query.replace(' ', '_')}_results.json"
-    filepath = os.path.join(PROJECT_DIR, filename)
-
-    # Write the file
-    with open(filepath, 'w', encoding='utf-8') as f:
-        json.dump(current_scraping_status['result'], f, indent=2, ensure_ascii=False)
-
-    # Send file for download
-    return send_file(filepath, as_attachment=True, download_name=filename)
+    output_format = request.args.get('format', 'json')
+    if output_format not in DOWNLOAD_FORMATS:
+        flash(f'Unknown download format: {output_format}', 'error')
+        return redirect(url_for('results', job_id=job.id))
+    compress = request.args.get('compress') == 'gzip'
+    render, mimetype, suffix = DOWNLOAD_FORMATS[output_format]
+
+    etag = f"{job.digest()}-{output_format}{'-gz' if compress else ''}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+        response.set_etag(etag)
+        return response
+
+    search_query = job.result.get('search_query') or 'grokipedia'
+    filename = f"{secure_filename(search_query) or 'grokipedia'}_results{suffix}"
+    chunks = render(job.result)
+    if compress:
+        chunks = iter_gzip(chunks)
+        mimetype = 'application/gzip'
+        filename += '.gz'
+
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.set_etag(etag)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+@app.route('/index/search')
+def index_search():
+    """Search previously scraped articles offline from the local index"""
+    if ARTICLE_INDEX is None:
+        return jsonify({'error': 'No article index configured (set GROKIPEDIA_INDEX)'}), 404
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing query parameter q'}), 400
+    return jsonify(ARTICLE_INDEX.search(query, limit=request.args.get('limit', 10, type=int)))
 
 @app.route('/clear')
 def clear_results():
     """Clear current results"""
-    global current_scraping_status
-    current_scraping_status = {
-        'is_running': False,
-        'progress': '',
-        'result': None,
-        'error': None
-    }
+    # Jobs can be shared by identical searches, so only forget this session's
+    # reference and let the job expire on its own
+    session.pop('job_id', None)
     flash('Results cleared.', 'info')
     return redirect(url_for('home'))
 
-if __name__ == '__main__':
+def main():
     print("Starting Grokipedia Web Scraper...")
     print("Open your browser and go to: http://localhost:5000")
     print("Press Ctrl+C to stop the server")
     app.run(debug=True, host='0.0.0.0', port=5000)
+
+if __name__ == '__main__':
+    main()
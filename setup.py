@@ -40,12 +40,20 @@ setup(
         "flask>=2.0.0",
     ],
     extras_require={
+        "async": ["aiohttp>=3.8.0"],
+        "fast": ["lxml>=4.6.0"],
+        "zstd": ["zstandard>=0.15.0"],
         "dev": ["pytest", "black", "flake8"],
     },
     entry_points={
         "console_scripts": [
             "grokipedia-scraper=grokipedia_browser_scraper:main",
             "grokipedia-web=grokipedia_web_app:main",
+            "grokipedia-async=grokipedia_async_scraper:main",
+            "grokipedia-crawl=grokipedia_crawler:main",
+            "grokipedia-rescrape=grokipedia_incremental:main",
+            "grokipedia-index=grokipedia_index:main",
+            "grokipedia-replay=grokipedia_replay:main",
         ],
     },
     include_package_data=True,
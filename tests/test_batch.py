@@ -0,0 +1,98 @@
+import io
+import json
+from types import SimpleNamespace
+
+from grokipedia_batch import BatchJournal, iter_completed, run_batch
+from grokipedia_browser_scraper import run_batch_mode
+
+
+def test_journal_claims_each_url_once_and_resumes(tmp_path):
+    path = str(tmp_path / 'batch.journal')
+    journal = BatchJournal(path)
+    assert journal.claim_url('https://grokipedia.com/page/A')
+    assert not journal.claim_url('https://grokipedia.com/page/A')
+    journal.mark_done('a', ['https://grokipedia.com/page/A'])
+    journal.close()
+
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"done": "partial')
+
+    journal = BatchJournal(path)
+    assert journal.is_done('a')
+    assert not journal.claim_url('https://grokipedia.com/page/A')
+    journal.close()
+
+
+def test_released_url_can_be_claimed_again(tmp_path):
+    journal = BatchJournal(str(tmp_path / 'batch.journal'))
+    assert journal.claim_url('u')
+    journal.release_url('u')
+    assert journal.claim_url('u')
+    journal.close()
+
+
+def test_run_batch_skips_done_subjects_and_retries_errors(tmp_path):
+    journal = BatchJournal(str(tmp_path / 'batch.journal'))
+    journal.mark_done('done')
+    output = io.StringIO()
+
+    def process(subject):
+        if subject == 'bad':
+            raise RuntimeError('boom')
+        return {'search_query': subject, '_urls': [subject + '-url']}
+
+    stats = run_batch(iter(['done', 'good', 'bad', 'good']), process, journal, output, workers=2)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert stats['skipped'] == 2
+    assert stats['done'] == 1 and stats['failed'] == 1
+    assert all('_urls' not in line for line in lines)
+    assert journal.is_done('good') and not journal.is_done('bad')
+    journal.close()
+
+
+class FailingScraper:
+    size = 1
+
+    def search_subject(self, subject):
+        return {'results': [{'url': 'https://grokipedia.com/page/Good'},
+                            {'url': 'https://grokipedia.com/page/Bad'}]}
+
+    def scrape_article(self, url):
+        if url.endswith('Bad'):
+            return {'url': url, 'error': 'timed out'}
+        return {'url': url, 'title': 'Good'}
+
+
+def test_failed_article_is_reported_and_retried(tmp_path):
+    args = SimpleNamespace(batch=str(tmp_path / 'subjects.txt'), output=str(tmp_path / 'out.jsonl'),
+                           journal=str(tmp_path / 'batch.journal'), compress=None,
+                           scrape_articles=True, max_articles=2)
+    with open(args.batch, 'w', encoding='utf-8') as f:
+        f.write('ai\n')
+
+    run_batch_mode(FailingScraper(), args)
+
+    with open(args.output, encoding='utf-8') as f:
+        result = json.loads(f.readline())
+    assert result['failed_urls'] == [{'url': 'https://grokipedia.com/page/Bad', 'error': 'timed out'}]
+    assert 'error' in result
+
+    journal = BatchJournal(args.journal)
+    assert not journal.is_done('ai')
+    assert journal.claim_url('https://grokipedia.com/page/Bad')
+    journal.close()
+
+
+def test_iter_completed_draws_items_as_results_are_consumed():
+    drawn = []
+
+    def items():
+        for i in range(100):
+            drawn.append(i)
+            yield i
+
+    results = iter_completed(lambda i: i * 2, items(), workers=2, max_pending=4)
+    item, future = next(results)
+    assert future.result() == item * 2
+    assert len(drawn) <= 5
+    assert sorted([item] + [item for item, future in results]) == list(range(100))
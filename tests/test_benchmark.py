@@ -0,0 +1,19 @@
+from grokipedia_benchmark import compare_to_baseline
+
+BASELINE = {'cases': {'parse': {'seconds': 1.0, 'peak_kb': 1000, 'blocks': 500}}}
+
+
+def suite(seconds, peak_kb, blocks):
+    return {'cases': {'parse': {'seconds': seconds, 'peak_kb': peak_kb, 'blocks': blocks},
+                      'new': {'seconds': 9.0, 'peak_kb': 9000, 'blocks': 9000}}}
+
+
+def test_timings_are_only_checked_on_request():
+    assert compare_to_baseline(suite(3.0, 1000, 500), BASELINE) == []
+    assert compare_to_baseline(suite(3.0, 1000, 500), BASELINE, time_tolerance=0.25) == [
+        ('parse', 'seconds', 1.0, 3.0)]
+
+
+def test_memory_growth_is_a_regression():
+    assert compare_to_baseline(suite(1.0, 1200, 505), BASELINE) == [('parse', 'peak_kb', 1000, 1200)]
+    assert compare_to_baseline(suite(1.0, 1200, 505), BASELINE, memory_tolerance=0.5) == []
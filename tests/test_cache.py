@@ -0,0 +1,69 @@
+import os
+
+from grokipedia_cache import PageCache
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeSession:
+    def __init__(self, etag='"v1"'):
+        self.etag = etag
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, **kwargs):
+        self.requests.append(('GET', headers))
+        if headers and headers.get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, 'page', {'ETag': self.etag})
+
+    def head(self, url, headers=None, **kwargs):
+        self.requests.append(('HEAD', headers))
+        if headers and headers.get('If-None-Match') == self.etag:
+            return FakeResponse(304)
+        return FakeResponse(200, headers={'ETag': self.etag})
+
+
+def test_fetch_serves_fresh_pages_and_revalidates_stale_ones(tmp_path):
+    cache = PageCache(str(tmp_path / 'pages.sqlite'), ttl=3600)
+    session = FakeSession()
+    assert cache.fetch(session, 'u').text == 'page'
+    assert cache.fetch(session, 'u').from_cache
+    assert len(session.requests) == 1
+
+    cache.ttl = 0
+    assert cache.fetch(session, 'u').from_cache
+    assert session.requests[-1] == ('GET', {'If-None-Match': '"v1"'})
+    assert {k: cache.get_stats()[k] for k in ('hits', 'misses', 'revalidated')} == \
+        {'hits': 1, 'misses': 1, 'revalidated': 1}
+
+
+def test_evicts_least_recently_used_over_max_bytes(tmp_path):
+    cache = PageCache(str(tmp_path / 'pages.sqlite'), max_bytes=1200)
+    for key in 'abc':
+        cache.put(key, os.urandom(500).hex())
+    assert cache.get('a') is None
+    assert cache.get('c') is not None
+    assert cache.get_stats()['evictions'] >= 1
+
+
+def test_put_derived_reuses_the_validators_get_valid_saw(tmp_path):
+    cache = PageCache(str(tmp_path / 'pages.sqlite'), ttl=0)
+    session = FakeSession()
+    assert cache.get_valid(session, 'u', 'article:u') is None
+    cache.put_derived(session, 'u', 'article:u', '{}')
+    assert [method for method, headers in session.requests] == ['HEAD']
+
+    session.etag = '"v2"'
+    session.requests.clear()
+    assert cache.get_valid(session, 'u', 'article:u') is None
+    cache.put_derived(session, 'u', 'article:u', '{"new": 1}')
+    assert [method for method, headers in session.requests] == ['HEAD']
+    assert cache.get('article:u')['etag'] == '"v2"'
+
+    session.requests.clear()
+    assert cache.get_valid(session, 'u', 'article:u')['body'] == '{"new": 1}'
@@ -0,0 +1,74 @@
+import asyncio
+
+from grokipedia_crawler import BloomFilter, GrokipediaCrawler, VisitedSet, canonical_page_url
+
+BASE = 'https://grokipedia.com/'
+
+
+def test_canonical_page_url_collapses_variants():
+    expected = 'https://grokipedia.com/page/Neural_network'
+    assert canonical_page_url('/page/Neural%20network?x=1#top', BASE) == expected
+    assert canonical_page_url('https://GROKIPEDIA.com/page/Neural_network', BASE) == expected
+
+
+def test_canonical_page_url_rejects_non_articles():
+    assert canonical_page_url('/search?q=ai', BASE) is None
+    assert canonical_page_url('/page/', BASE) is None
+    assert canonical_page_url('https://example.com/page/AI', BASE) is None
+    assert canonical_page_url('mailto:someone@grokipedia.com', BASE) is None
+
+
+def test_bloom_filter_reports_new_and_repeated_urls():
+    bloom = BloomFilter(1000)
+    urls = [f'{BASE}page/{i}' for i in range(1000)]
+    assert all(bloom.add(url) for url in urls[:500])
+    assert not any(bloom.add(url) for url in urls[:500])
+    assert len(bloom) == 500
+
+
+def test_visited_set():
+    visited = VisitedSet()
+    assert visited.add('a')
+    assert not visited.add('a')
+    assert len(visited) == 1
+
+
+class FakeScraper:
+    base_url = BASE
+    concurrency = 2
+
+    async def scrape_article(self, url):
+        if url.endswith('Broken'):
+            raise ConnectionResetError('connection reset')
+        if url.endswith('Seed'):
+            links = ['Broken', 'Unwritable', 'Leaf']
+        else:
+            links = []
+        return {'title': url.rsplit('/', 1)[1], 'links': [{'url': f'/page/{link}'} for link in links]}
+
+    async def search_many(self, subjects):
+        return [{'results': [{'url': f'{BASE}search?q={subject}'}]} for subject in subjects]
+
+
+def test_failing_pages_do_not_stop_the_crawl():
+    crawler = GrokipediaCrawler(FakeScraper(), max_depth=1)
+    records = []
+
+    def on_page(record):
+        if record['url'].endswith('Unwritable'):
+            raise BrokenPipeError('broken pipe')
+        records.append(record)
+
+    asyncio.run(asyncio.wait_for(crawler.crawl([f'{BASE}page/Seed'], on_page), timeout=5))
+
+    by_url = {record['url'].rsplit('/', 1)[1]: record for record in records}
+    assert set(by_url) == {'Seed', 'Broken', 'Leaf'}
+    assert 'connection reset' in by_url['Broken']['error']
+    assert by_url['Broken']['depth'] == 1
+    assert crawler.stats['errors'] == 2
+
+
+def test_seed_that_is_not_an_article_is_reported(capsys):
+    crawler = GrokipediaCrawler(FakeScraper())
+    assert asyncio.run(crawler.seed_urls(['ai'])) == []
+    assert 'not an article page' in capsys.readouterr().err
@@ -0,0 +1,49 @@
+import threading
+
+from grokipedia_incremental import ArticleStore, IncrementalScraper, split_sections
+
+
+class FakeResponse:
+    def __init__(self, status_code, text='', headers=None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+
+class FakeScraper:
+    pages = {}
+
+    def __init__(self):
+        self.session = self
+
+    def get(self, url, headers=None, timeout=None):
+        if headers and headers.get('If-None-Match') == 'v1':
+            return FakeResponse(304)
+        return FakeResponse(200, self.pages[url], {'ETag': 'v1'})
+
+    def extract_article_data(self, html, url):
+        return {'url': url, 'title': 'AI', 'content': html, 'sections': [{'text': 'History'}]}
+
+
+def test_split_sections_keys_repeated_headings():
+    article = {'content': 'Intro\nHistory\nold\nHistory\nnew', 'sections': [{'text': 'History'}, {'text': 'History'}]}
+    assert split_sections(article) == [('', 'Intro'), ('History', 'old'), ('History#2', 'new')]
+
+
+def test_check_reports_new_then_unchanged(tmp_path):
+    FakeScraper.pages = {'u': 'Intro\nHistory\nold'}
+    checker = IncrementalScraper(FakeScraper, ArticleStore(str(tmp_path / 'store.sqlite')))
+    assert checker.check('u')['type'] == 'new'
+    assert checker.check('u') == {'type': 'unchanged', 'url': 'u', 'checked_by': 'not_modified'}
+
+
+def test_each_thread_gets_its_own_scraper(tmp_path):
+    checker = IncrementalScraper(FakeScraper, ArticleStore(str(tmp_path / 'store.sqlite')))
+    scrapers = []
+    threads = [threading.Thread(target=lambda: scrapers.append(checker.scraper)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(scraper) for scraper in scrapers}) == 3
+    assert checker.scraper is checker.scraper
@@ -0,0 +1,33 @@
+import json
+import sys
+
+import grokipedia_index
+from grokipedia_index import ArticleIndex
+
+ARTICLE = {
+    'url': 'https://grokipedia.com/page/Neural_network',
+    'title': 'Neural network',
+    'content': 'A neural network is a model inspired by biological neurons.',
+    'sections': [{'heading': 'Training', 'content': 'Backpropagation adjusts the weights.'}]
+}
+
+
+def test_index_search_ranks_title_matches(tmp_path):
+    index = ArticleIndex(str(tmp_path / 'index.sqlite'))
+    index.add(ARTICLE)
+    index.add({'url': 'https://grokipedia.com/page/Brain', 'title': 'Brain',
+               'content': 'The brain contains a biological neural network.'})
+    urls = [item['url'] for item in index.search('neural network')['results']]
+    assert urls[0] == ARTICLE['url']
+    index.close()
+
+
+def test_add_option_leaves_the_query_positional(tmp_path, monkeypatch, capsys):
+    saved = tmp_path / 'a.json'
+    saved.write_text(json.dumps({'articles': [ARTICLE]}), encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['grokipedia_index.py', '--index', str(tmp_path / 'index.sqlite'),
+                                      '--add', str(saved), 'neural network', '-f', 'json'])
+    grokipedia_index.main()
+    output = capsys.readouterr()
+    assert 'Indexed 1 articles' in output.err
+    assert json.loads(output.out)['results'][0]['url'] == ARTICLE['url']
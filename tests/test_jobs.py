@@ -0,0 +1,60 @@
+import threading
+
+from grokipedia_jobs import JobManager, ResultCache, ScrapeJob, job_key
+
+
+def test_job_key_normalizes_case_and_whitespace():
+    assert job_key('  Neural   Network ') == job_key('neural network')
+    assert job_key('ai', {'b': 1, 'a': 2}) == job_key('AI', {'a': 2, 'b': 1})
+    assert job_key('ai', {'max_articles': 3}) != job_key('ai', {'max_articles': 5})
+
+
+def test_result_cache_evicts_least_recently_used_by_size():
+    cache = ResultCache(max_bytes=40, ttl=60)
+    cache.put('a', {'x': 'a' * 10})
+    cache.put('b', {'x': 'b' * 10})
+    assert cache.get('a') is not None
+    cache.put('c', {'x': 'c' * 10})
+    assert cache.get('b') is None
+    assert cache.get('a') is not None
+    assert cache.get_stats()['evictions'] == 1
+
+
+def test_result_cache_expires_entries():
+    cache = ResultCache(ttl=0)
+    cache.put('a', {'x': 1})
+    assert cache.get('a') is None
+
+
+def test_identical_submit_while_caching_joins_the_finished_job():
+    joined = []
+
+    class ProbingCache(ResultCache):
+        def put(self, key, result):
+            # An identical search arriving while the result is being cached
+            joined.append(manager.submit('ai'))
+            super().put(key, result)
+
+    done = threading.Event()
+
+    def runner(job):
+        job.finish(result={'results': [1]})
+        done.set()
+
+    manager = JobManager(runner, workers=1, cache=ProbingCache())
+    job = manager.submit('ai')
+    manager._queue.join()
+    assert done.is_set()
+    assert joined == [job]
+    assert manager.queue_size() == 0
+    assert manager.submit('AI').cached
+
+
+def test_finished_job_keeps_only_lightweight_events():
+    job = ScrapeJob('ai')
+    article = {'title': 'AI', 'content': 'x' * 1000}
+    job.publish('article', {'index': 0}, full={'index': 0, 'article': article})
+    assert job.events[0] == ('article', {'index': 0, 'article': article})
+    job.finish(result={'articles': [article]})
+    assert job.events[0] == ('article', {'index': 0})
+    assert [event for index, event, data in job.iter_events()] == ['article', 'done']
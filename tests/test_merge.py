@@ -0,0 +1,35 @@
+from grokipedia_merge import ResultMerger, canonical_url
+
+
+def test_canonical_url():
+    assert canonical_url('HTTPS://Grokipedia.com:443/page/Neural%20network/#top') == \
+        'https://grokipedia.com/page/Neural_network'
+    assert canonical_url('/search?q=ai&a=1', 'https://grokipedia.com/') == 'https://grokipedia.com/search?a=1&q=ai'
+    assert canonical_url('http://localhost:8765/') == 'http://localhost:8765/'
+
+
+def test_merger_keeps_first_seen_order_and_prefers_trusted_sources():
+    merger = ResultMerger('https://grokipedia.com/')
+    assert merger.add('AI link', '/page/AI', source='links')
+    assert merger.add('ML', '/page/ML', 'Machine learning', source='links')
+    assert not merger.add('Artificial intelligence', 'https://grokipedia.com/page/AI#x', 'Snippet', source='json')
+    assert not merger.add('AI text', '/page/AI', 'Other', source='text')
+    assert '/page/ML/' in merger
+    assert merger.results() == [
+        {'title': 'Artificial intelligence', 'url': 'https://grokipedia.com/page/AI#x', 'snippet': 'Snippet'},
+        {'title': 'ML', 'url': 'https://grokipedia.com/page/ML', 'snippet': 'Machine learning'},
+    ]
+
+
+def test_snippet_callables_run_only_when_needed():
+    calls = []
+
+    def snippet():
+        calls.append(1)
+        return 'text'
+
+    merger = ResultMerger()
+    merger.add('A', 'https://grokipedia.com/page/A', snippet)
+    merger.add('A', 'https://grokipedia.com/page/A', snippet)
+    assert len(calls) == 1
+    assert len(merger) == 1
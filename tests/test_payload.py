@@ -0,0 +1,46 @@
+import json
+import os
+
+from grokipedia_payload import (FlightPayloadParser, article_from_payload, browser_article_from_payload,
+                                extract_payload, payload_is_complete)
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_rows_split_across_chunks_are_decoded_once_complete():
+    parser = FlightPayloadParser()
+    text = 'héllo'
+    stream = f'1:{json.dumps({"a": 1})}\n2:T{len(text.encode("utf-8")):x},{text}3:I["chunk"]\n'
+    assert parser.feed(stream[:5]) == []
+    assert parser.feed(stream[5:14]) == ['1']
+    assert parser.feed(stream[14:]) == ['2']
+    assert parser.rows == {'1': {'a': 1}, '2': text}
+    assert parser.resolve('$2') == text
+
+
+def flight_page(content):
+    record = {'slug': 'Mars', 'title': 'Mars', 'content': '$5'}
+    chunks = [f'4:{json.dumps({"page": record})}\n', f'5:T{len(content.encode("utf-8")):x},{content}']
+    pushes = ''.join(f'<script>self.__next_f.push({json.dumps([1, chunk])})</script>' for chunk in chunks)
+    return f'<html><body>{pushes}</body></html>'
+
+
+def test_links_resolve_against_the_scraper_base_url():
+    html = flight_page('# Mars\nSee [Phobos](Phobos) and [NASA](https://nasa.gov).')
+    page, parser = extract_payload(html)
+    assert payload_is_complete(page, parser)
+
+    article = article_from_payload(page, parser, 'http://127.0.0.1:8765/page/Mars', 'http://127.0.0.1:8765/')
+    assert article['content'].startswith('Mars\nSee Phobos and NASA.')
+    assert article['links'] == [{'text': 'Phobos', 'url': 'http://127.0.0.1:8765/page/Phobos'},
+                                {'text': 'NASA', 'url': 'https://nasa.gov'}]
+
+    browser_article = browser_article_from_payload(page, parser, 'u', 'http://127.0.0.1:8765/')
+    assert browser_article['sections'] == [{'level': 1, 'text': 'Mars', 'id': 'mars'}]
+
+
+def test_recorded_page_payload():
+    with open(os.path.join(PROJECT_DIR, 'grokpage.txt'), encoding='utf-8') as f:
+        page, parser = extract_payload(f.read())
+    assert payload_is_complete(page, parser)
+    assert page['title'] == 'Mars landing'
@@ -0,0 +1,59 @@
+from grokipedia_ratelimit import AIMDController, RateLimiter, TokenBucket
+
+
+def test_token_bucket_allows_a_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, burst=2)
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() == 0.0
+    assert 0.09 <= bucket.reserve() <= 0.1
+    assert 0.19 <= bucket.reserve() <= 0.2
+
+
+def test_token_bucket_pause_holds_requests():
+    bucket = TokenBucket(rate=100, burst=5)
+    bucket.pause(2)
+    assert 1.9 <= bucket.reserve() <= 2.0
+
+
+def test_aimd_halves_on_failure_once_per_cooldown():
+    controller = AIMDController(initial=8, cooldown=60)
+    for _ in range(3):
+        assert controller.try_acquire()
+        controller.release(failed=True)
+    assert int(controller.limit) == 4
+    assert controller.stats == {'increases': 0, 'decreases': 1, 'throttled': 3}
+
+
+def test_aimd_grows_by_one_per_window_of_fast_responses():
+    controller = AIMDController(initial=2, maximum=3)
+    for _ in range(10):
+        assert controller.try_acquire()
+        controller.release(latency=0.1)
+    assert int(controller.limit) == 3
+    assert controller.stats['increases'] == 1
+
+    controller.limit = 3.0
+    for _ in range(3):
+        controller.try_acquire()
+    assert not controller.try_acquire()
+
+
+def test_slow_responses_do_not_grow_the_limit():
+    controller = AIMDController(initial=2)
+    controller.try_acquire()
+    controller.release(latency=0.1)
+    for _ in range(10):
+        controller.try_acquire()
+        controller.release(latency=1.0)
+    assert int(controller.limit) == 2
+
+
+def test_rate_limiter_counts_failures_per_host():
+    limiter = RateLimiter(rate=None, adaptive=True, initial_concurrency=4)
+    with limiter.limit('https://grokipedia.com/page/A') as outcome:
+        outcome['status'] = 200
+    with limiter.limit('https://grokipedia.com/page/B') as outcome:
+        outcome['status'] = 503
+    stats = limiter.get_stats()
+    assert (stats['requests'], stats['failures']) == (2, 1)
+    assert stats['hosts']['grokipedia.com']['concurrency_limit'] == 2
@@ -0,0 +1,52 @@
+import requests
+
+from grokipedia_replay import FaultInjector, ReplayArchive, ReplayServer, archive_key
+
+
+def test_archive_key_ignores_host_and_query_order():
+    assert archive_key('get', 'https://grokipedia.com/search?q=ai&page=2') == \
+        archive_key('GET', 'http://127.0.0.1:8700/search?page=2&q=ai') == 'GET /search?page=2&q=ai'
+    assert archive_key('GET', 'https://grokipedia.com/page/Neural%20network') == 'GET /page/Neural network'
+
+
+def test_archive_key_digests_form_bodies_order_insensitively():
+    assert archive_key('POST', '/search', 'q=ai&x=1') == archive_key('POST', '/search', {'x': '1', 'q': 'ai'})
+    assert archive_key('POST', '/search', 'q=ai') != archive_key('POST', '/search', 'q=ml')
+    assert archive_key('GET', '/search', 'q=ai') == 'GET /search'
+
+
+def test_archive_skips_heads_304s_and_errors(tmp_path):
+    archive = ReplayArchive(str(tmp_path / 'replay.sqlite'))
+    assert archive.put('GET', 'https://grokipedia.com/page/A', 200, {'ETag': '"1"'}, 'page')
+    assert not archive.put('GET', 'https://grokipedia.com/page/A', 304, {}, '')
+    assert not archive.put('HEAD', 'https://grokipedia.com/page/A', 200, {}, '')
+    assert not archive.put('GET', 'https://grokipedia.com/page/A', 503, {}, 'down')
+    entry = archive.get('GET', 'http://stub/page/A')
+    assert (entry['status'], entry['body'], entry['headers']) == (200, b'page', {'ETag': '"1"'})
+    archive.close()
+
+
+def test_fault_injector_is_repeatable_with_a_seed():
+    first = FaultInjector(latency=0.1, jitter=0.2, error_rate=0.5, seed=1)
+    second = FaultInjector(latency=0.1, jitter=0.2, error_rate=0.5, seed=1)
+    plans = [first.plan() for _ in range(20)]
+    assert plans == [second.plan() for _ in range(20)]
+    assert all(0.1 <= delay <= 0.3 for delay, status in plans)
+    assert {status for delay, status in plans} == {None, 503}
+
+
+def test_replay_server_serves_recordings_and_304s(tmp_path):
+    archive = ReplayArchive(str(tmp_path / 'replay.sqlite'))
+    archive.put_page('https://grokipedia.com/page/A', '<html>A</html>')
+    archive.put('GET', 'https://grokipedia.com/page/B', 200, {'ETag': '"b"'}, 'B')
+    server = ReplayServer(archive, port=0)
+    base_url = server.start()
+    try:
+        assert requests.get(base_url + 'page/A', timeout=5).text == '<html>A</html>'
+        assert requests.get(base_url + 'page/B', headers={'If-None-Match': '"b"'}, timeout=5).status_code == 304
+        assert requests.get(base_url + 'page/C', timeout=5).status_code == 404
+        stats = requests.get(base_url + '_replay/stats', timeout=5).json()
+        assert (stats['served'], stats['not_modified'], stats['misses']) == (1, 1, 1)
+    finally:
+        server.stop()
+        archive.close()
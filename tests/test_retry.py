@@ -0,0 +1,53 @@
+import argparse
+import threading
+
+import pytest
+
+from grokipedia_retry import RetryPolicy, current_fetch_stats, parse_hedge, start_fetch_stats
+
+
+def test_parse_hedge():
+    assert parse_hedge('p95') == 'p95'
+    assert parse_hedge('0.25') == 0.25
+    for value in ('soon', '0', '-1'):
+        with pytest.raises(argparse.ArgumentTypeError):
+            parse_hedge(value)
+
+
+class FakeResponse:
+    def __init__(self, status_code, name=''):
+        self.status_code = status_code
+        self.name = name
+        self.closed = threading.Event()
+
+    def close(self):
+        self.closed.set()
+
+
+def test_retries_retryable_statuses():
+    statuses = iter([503, 429, 200])
+    policy = RetryPolicy(retries=2, backoff=0)
+    start_fetch_stats()
+    assert policy.call(lambda: FakeResponse(next(statuses))).status_code == 200
+    assert current_fetch_stats() == {'attempts': 3, 'retries': 2, 'hedged': 0}
+
+
+def test_hedge_answers_with_the_faster_request_and_closes_the_slower():
+    responses = []
+    release = threading.Event()
+
+    def send():
+        response = FakeResponse(200, 'slow' if not responses else 'fast')
+        responses.append(response)
+        if response.name == 'slow':
+            release.wait(5)
+        return response
+
+    policy = RetryPolicy(retries=0, hedge=0.05)
+    start_fetch_stats()
+    assert policy.call(send).name == 'fast'
+    assert current_fetch_stats()['hedged'] == 1
+
+    release.set()
+    assert responses[0].closed.wait(5)
+    assert not responses[1].closed.is_set()
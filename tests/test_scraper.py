@@ -0,0 +1,16 @@
+from types import SimpleNamespace
+
+from grokipedia_scraper import GrokipediaScraper
+
+
+def test_search_prints_a_label_per_get_strategy(monkeypatch, capsys):
+    scraper = GrokipediaScraper(base_url='http://stub.invalid/')
+    monkeypatch.setattr(scraper, '_request', lambda method, url, **kwargs: SimpleNamespace(status_code=404))
+    monkeypatch.setattr(scraper, '_known_strategy', lambda: True)
+
+    assert scraper.search_subject('neural network') == {'error': 'Could not find the requested subject'}
+    assert capsys.readouterr().err.splitlines() == [
+        'Trying search URL: http://stub.invalid/?q=neural%20network',
+        'Trying search endpoint: http://stub.invalid/search',
+        'Trying direct URL: http://stub.invalid/wiki/neural_network',
+    ]
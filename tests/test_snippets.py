@@ -0,0 +1,21 @@
+from bs4 import BeautifulSoup
+
+from grokipedia_snippets import SnippetIndex, cut_snippet
+
+
+def test_cut_snippet_removes_the_link_text():
+    text = 'before LINK after'
+    assert cut_snippet(text, (0, len(text)), (7, 11)) == 'before  after'
+    assert cut_snippet(text, (0, len(text)), (7, 11), window=4) == 'befo'
+
+
+def test_snippet_index_matches_parent_text_without_link():
+    soup = BeautifulSoup('<div><p>Read <a href="/page/AI">AI</a> for more.<script>x()</script></p>'
+                         '<a href="/page/Top">Top</a><!-- note --></div>', 'html.parser')
+    index = SnippetIndex(soup, window=200)
+    links = soup.find_all('a')
+    for link in links:
+        parent_text = link.parent.get_text()
+        expected = parent_text.replace(link.get_text(), '', 1).strip()
+        assert index.snippet(link) == expected[:200]
+    assert index.snippet(links[0]) == 'Read  for more.'
@@ -0,0 +1,24 @@
+import pytest
+
+import grokipedia_web_app
+from grokipedia_jobs import ScrapeJob
+
+
+@pytest.fixture
+def finished_job():
+    job = ScrapeJob('ai')
+    job.update('Searching...')
+    job.finish(result={'search_query': 'ai', 'results': []})
+    grokipedia_web_app.jobs.jobs[job.id] = job
+    yield job
+    grokipedia_web_app.jobs.remove(job.id)
+
+
+@pytest.mark.parametrize('last_event_id, first_id', [(None, 0), ('0', 1), ('-5', 0), ('bogus', 0)])
+def test_events_resume_after_last_event_id(finished_job, last_event_id, first_id):
+    headers = {'Last-Event-ID': last_event_id} if last_event_id is not None else {}
+    client = grokipedia_web_app.app.test_client()
+    response = client.get(f'/events/{finished_job.id}', headers=headers)
+    assert response.status_code == 200
+    ids = [int(line[4:]) for line in response.get_data(as_text=True).splitlines() if line.startswith('id: ')]
+    assert ids == list(range(first_id, 2))